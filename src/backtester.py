@@ -0,0 +1,328 @@
+import os
+import sys
+import csv
+import json
+import argparse
+import itertools
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path para importação dos módulos
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+
+# Importa os módulos do projeto
+from src.telegram.telegram_bot import TelegramBot
+from src.utils.idempotency import make_idempotency_key, selection_hash
+from src.utils.bet_history_manager import BetHistoryManager
+from src.utils.pnl_engine import PnlEngine, RESULT_CODES, bet_type_code, parse_amount
+
+# Regras de stake simuladas
+STAKING_RULES = ['fixed', 'percent', 'to_win']
+
+# Políticas de descarte de sinais duplicados
+DEDUP_POLICIES = ['none', 'message', 'selection']
+
+# Sinais preparados, compartilhados pelas tarefas de cada processo (ver init_worker)
+signals = None
+
+
+def load_messages(file_path):
+    """
+    Carrega as mensagens gravadas de um canal.
+
+    São aceitos um arquivo JSON com uma lista de mensagens, um arquivo JSONL (uma
+    mensagem por linha) ou a exportação de chat do Telegram Desktop (result.json).
+    Cada mensagem tem 'text', 'date' e, opcionalmente, 'id' e 'channel'.
+
+    Args:
+        file_path (str): Caminho do arquivo
+
+    Returns:
+        list: Mensagens no formato {'id', 'date', 'text', 'channel'}
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if file_path.lower().endswith('.jsonl'):
+            raw_messages = [json.loads(line) for line in f if line.strip()]
+            channel = ''
+        else:
+            data = json.load(f)
+            raw_messages = data['messages'] if isinstance(data, dict) else data
+            channel = str(data.get('id', '')) if isinstance(data, dict) else ''
+
+    messages = []
+    for raw in raw_messages:
+        text = raw.get('text', '')
+
+        # Na exportação do Telegram, textos com formatação são listas de trechos
+        if isinstance(text, list):
+            text = ''.join(part if isinstance(part, str) else part.get('text', '') for part in text)
+
+        messages.append({
+            'id': raw.get('id', raw.get('message_id')),
+            'date': str(raw.get('date', '')).replace('T', ' ')[:19],
+            'text': text,
+            'channel': str(raw.get('channel', channel))
+        })
+    return messages
+
+
+def load_results(file_path):
+    """
+    Carrega os resultados das corridas, no mesmo formato da importação de resultados
+    do histórico (CSV ou JSON com 'race_name', 'race_number', 'horse', 'result' e 'date').
+
+    O mesmo cavalo pode correr de novo na mesma corrida em outro dia: com a coluna 'date'
+    (AAAA-MM-DD), cada resultado vale apenas para os sinais desse dia. Linhas sem data
+    valem para os sinais de qualquer dia sem resultado próprio.
+
+    Args:
+        file_path (str): Caminho do arquivo
+
+    Returns:
+        dict: (dia ou None, seleção (ver BetHistoryManager.selection_key)) -> resultado
+    """
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        if file_path.lower().endswith('.json'):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+
+    return {
+        (str(row.get('date') or '').strip()[:10] or None, BetHistoryManager.selection_key(row)):
+            str(row.get('result', '')).strip().lower()
+        for row in rows
+    }
+
+
+def prepare_signals(messages, results):
+    """
+    Analisa as mensagens com TelegramBot.parse_bet_message e associa cada sinal ao seu resultado.
+
+    Os sinais são convertidos em vetores NumPy, em ordem cronológica, com as máscaras
+    das políticas de duplicidade já calculadas: assim as combinações de parâmetros
+    apenas filtram e multiplicam vetores.
+
+    Args:
+        messages (list): Mensagens retornadas por load_messages
+        results (dict): Resultados retornados por load_results
+
+    Returns:
+        dict: Vetores dos sinais com resultado e os totais de mensagens ignoradas
+    """
+    parser = TelegramBot(token='', chat_id='')
+    rows = []
+    ignored = 0
+    unsettled = 0
+
+    for message in sorted(messages, key=lambda message: message['date']):
+        bet_data = parser.parse_bet_message(message['text'])
+        if not bet_data or bet_type_code(bet_data['bet_type']) < 0:
+            ignored += 1
+            continue
+
+        # Resultado do dia da mensagem ou, na falta dele, resultado sem data
+        selection = BetHistoryManager.selection_key(bet_data)
+        result = results.get((message['date'][:10], selection), results.get((None, selection)))
+        if result not in RESULT_CODES:
+            unsettled += 1
+            continue
+
+        rows.append({
+            'timestamp': message['date'],
+            'odds': parse_amount(bet_data['odds']),
+            'bet_type': bet_type_code(bet_data['bet_type']),
+            'result': RESULT_CODES[result],
+            'channel': message['channel'],
+            'message_key': make_idempotency_key(message['id'], bet_data, message['channel']),
+            'selection_key': (message['date'][:10], selection_hash(bet_data))
+        })
+
+    # Primeira ocorrência de cada mensagem e de cada seleção no dia
+    seen_messages = set()
+    seen_selections = set()
+    first_message = []
+    first_selection = []
+    for row in rows:
+        first_message.append(row['message_key'] not in seen_messages)
+        first_selection.append(row['selection_key'] not in seen_selections)
+        seen_messages.add(row['message_key'])
+        seen_selections.add(row['selection_key'])
+
+    channel_names, channel_codes = np.unique(np.array([row['channel'] for row in rows], dtype=str),
+                                             return_inverse=True)
+
+    return {
+        'timestamps': np.array([row['timestamp'] for row in rows], dtype='U19'),
+        'odds': np.array([row['odds'] for row in rows], dtype=float),
+        'bet_types': np.array([row['bet_type'] for row in rows], dtype=int),
+        'results': np.array([row['result'] for row in rows], dtype=int),
+        'channels': channel_codes.astype(int),
+        'channel_names': channel_names.tolist(),
+        'dedup': {
+            'none': np.ones(len(rows), dtype=bool),
+            'message': np.array(first_message, dtype=bool),
+            'selection': np.array(first_selection, dtype=bool)
+        },
+        'ignored': ignored,
+        'unsettled': unsettled
+    }
+
+
+def parameter_grid(staking=('fixed',), stake=(1.0,), min_odds=(1.01,), max_odds=(1000.0,), dedup=('message',),
+                   bank=100.0):
+    """
+    Gera todas as combinações dos parâmetros simulados.
+
+    Args:
+        staking (sequence): Regras de stake ('fixed': stake fixo; 'percent': fração stake
+            da banca atual; 'to_win': stake para ganhar o valor stake)
+        stake (sequence): Valores de stake de cada regra
+        min_odds (sequence): Odds mínimas aceitas
+        max_odds (sequence): Odds máximas aceitas
+        dedup (sequence): Políticas de duplicidade ('none': todos os sinais; 'message':
+            descarta mensagens repetidas, como o bot; 'selection': uma aposta por seleção no dia)
+        bank (float): Banca inicial
+
+    Returns:
+        list: Parâmetros de cada simulação
+    """
+    return [
+        {'staking': rule, 'stake': value, 'min_odds': low, 'max_odds': high, 'dedup': policy, 'bank': bank}
+        for rule, value, low, high, policy in itertools.product(staking, stake, min_odds, max_odds, dedup)
+        if low <= high
+    ]
+
+
+def init_worker(prepared):
+    """Guarda os sinais preparados no processo, para não enviá-los a cada tarefa."""
+    global signals
+    signals = prepared
+
+
+def simulate(params, prepared=None):
+    """
+    Simula as apostas de uma combinação de parâmetros.
+
+    Args:
+        params (dict): Parâmetros gerados por parameter_grid
+        prepared (dict, optional): Sinais preparados (padrão: os do processo, ver init_worker)
+
+    Returns:
+        dict: Parâmetros e resultado (ver PnlEngine.report), com a banca final
+    """
+    if prepared is None:
+        prepared = signals
+    odds = prepared['odds']
+    selected = (prepared['dedup'][params['dedup']] & (odds >= params['min_odds']) & (odds <= params['max_odds']))
+    odds = odds[selected]
+    stakes = np.ones(len(odds))
+
+    def engine(stakes):
+        return PnlEngine(
+            prepared['timestamps'][selected], stakes, odds, prepared['results'][selected],
+            prepared['bet_types'][selected], prepared['channels'][selected], prepared['channel_names'],
+            np.full(len(odds), np.nan)
+        )
+
+    if params['staking'] == 'fixed':
+        stakes = stakes * params['stake']
+    elif params['staking'] == 'to_win':
+        stakes = params['stake'] / np.maximum(odds - 1, 0.01)
+    elif params['staking'] == 'percent':
+        # Com stake 1 o lucro de cada aposta é o retorno por unidade; a banca evolui
+        # multiplicando (1 + fração * lucro por unidade) a cada aposta
+        growth = 1 + params['stake'] * engine(stakes).profit
+        bank_before = params['bank'] * np.concatenate(([1.0], np.cumprod(np.maximum(growth, 0))[:-1]))
+        stakes = params['stake'] * bank_before
+    else:
+        raise ValueError(f"Regra de stake desconhecida: {params['staking']}")
+
+    report = engine(stakes).report()
+    report.pop('by_type')
+    report.update(params)
+    report['final_bank'] = round(params['bank'] + report['profit'], 2)
+    return report
+
+
+def run_backtest(prepared, grid, workers=None):
+    """
+    Simula todas as combinações de parâmetros, em paralelo em um pool de processos.
+
+    Args:
+        prepared (dict): Sinais retornados por prepare_signals
+        grid (list): Parâmetros retornados por parameter_grid
+        workers (int, optional): Número de processos (padrão: número de núcleos; 1 executa
+            no próprio processo)
+
+    Returns:
+        list: Resultados, do maior ao menor ROI
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(grid) == 1:
+        rows = [simulate(params, prepared) for params in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(prepared,)) as pool:
+            rows = list(pool.map(simulate, grid, chunksize=max(1, len(grid) // (workers * 4))))
+
+    return sorted(rows, key=lambda row: (row['roi'], row['profit']), reverse=True)
+
+
+def format_backtest_report(rows, prepared, top=None):
+    """Formata a tabela comparativa das simulações para exibição."""
+    lines = [
+        f"Sinais com resultado: {len(prepared['odds'])} "
+        f"(sem resultado: {prepared['unsettled']}, mensagens ignoradas: {prepared['ignored']})",
+        f"{'Stake':<16}{'Odds':<14}{'Duplicidade':<12}{'Apostas':>8}{'Apostado':>11}{'Lucro':>10}"
+        f"{'ROI':>9}{'Acerto':>9}{'Drawdown':>10}{'Banca':>10}"
+    ]
+    for row in rows[:top]:
+        staking = f"{row['staking']} {row['stake']:g}"
+        odds = f"{row['min_odds']:g}-{row['max_odds']:g}"
+        lines.append(
+            f"{staking:<16}{odds:<14}{row['dedup']:<12}{row['bets']:>8}{row['staked']:>11.2f}{row['profit']:>10.2f}"
+            f"{row['roi']:>8.2f}%{row['strike_rate']:>8.2f}%{row['max_drawdown']:>10.2f}{row['final_bank']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_list(value, cast=float):
+    """Converte uma lista separada por vírgulas (ex.: '1.5,2,3') em uma tupla."""
+    return tuple(cast(item.strip()) for item in value.split(',') if item.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest de canais de sinais sobre mensagens gravadas")
+    parser.add_argument('messages', help="Mensagens gravadas (JSON, JSONL ou exportação do Telegram Desktop)")
+    parser.add_argument('results', help="Resultados das corridas (CSV ou JSON)")
+    parser.add_argument('--staking', default='fixed', help=f"Regras de stake ({', '.join(STAKING_RULES)})")
+    parser.add_argument('--stake', default='1', help="Stake de cada regra (em 'percent', fração da banca)")
+    parser.add_argument('--min-odds', default='1.01')
+    parser.add_argument('--max-odds', default='1000')
+    parser.add_argument('--dedup', default='message', help=f"Políticas de duplicidade ({', '.join(DEDUP_POLICIES)})")
+    parser.add_argument('--bank', type=float, default=100.0, help="Banca inicial")
+    parser.add_argument('--workers', type=int, help="Número de processos (padrão: número de núcleos)")
+    parser.add_argument('--top', type=int, help="Exibe apenas as N melhores combinações")
+    args = parser.parse_args()
+
+    staking = parse_list(args.staking, str)
+    dedup = parse_list(args.dedup, str)
+    for value, allowed in ((staking, STAKING_RULES), (dedup, DEDUP_POLICIES)):
+        unknown = set(value) - set(allowed)
+        if unknown:
+            parser.error(f"valores desconhecidos: {', '.join(sorted(unknown))}")
+
+    start = datetime.now()
+    prepared = prepare_signals(load_messages(args.messages), load_results(args.results))
+    grid = parameter_grid(staking, parse_list(args.stake), parse_list(args.min_odds), parse_list(args.max_odds),
+                          dedup, args.bank)
+    rows = run_backtest(prepared, grid, args.workers)
+
+    print(format_backtest_report(rows, prepared, args.top))
+    print(f"{len(grid)} combinações em {(datetime.now() - start).total_seconds():.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
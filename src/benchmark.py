@@ -0,0 +1,269 @@
+import os
+import sys
+import time
+import random
+import argparse
+import subprocess
+from statistics import median
+from collections import Counter
+
+# Adiciona o diretório raiz ao path para importação dos módulos
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+
+# Importa os módulos do projeto
+from src.rpa.rpa_controller import RPAController
+from src.rpa.retry_policy import RetryPolicy, CircuitBreaker
+from src.rpa.mock_exchange import MockExchange, MockExchangeServer
+from src.utils.latency_tracer import percentile
+
+
+def run_rpa_benchmark(bets=100, engine='http', latency=0.0, latency_jitter=0.0, error_rate=0.0,
+                      odds_drift=0.0, odds_tolerance=0.0, retry_attempts=3, retry_base_delay=0.01,
+                      seed=42):
+    """
+    Executa apostas pelo RPAController.process_bet contra a simulação local da Bolsa de Apostas.
+
+    Args:
+        bets (int): Número de apostas
+        engine (str): Mecanismo de execução ('http' ou 'browser')
+        latency (float): Latência média da simulação em segundos
+        latency_jitter (float): Variação da latência em segundos
+        error_rate (float): Probabilidade de HTTP 503 por requisição
+        odds_drift (float): Deriva relativa das odds por aposta
+        odds_tolerance (float): Queda de odds aceita pela simulação
+        retry_attempts (int): Tentativas por operação
+        retry_base_delay (float): Espera antes da segunda tentativa em segundos
+        seed (int): Semente dos geradores aleatórios
+
+    Returns:
+        dict: Resultado com vazão, percentis de latência e modos de falha
+    """
+    exchange = MockExchange(
+        latency=latency,
+        latency_jitter=latency_jitter,
+        error_rate=error_rate,
+        odds_drift=odds_drift,
+        odds_tolerance=odds_tolerance,
+        seed=seed
+    )
+    card = exchange.market_card()
+    selections = [(market, runner) for market in card for runner in market['runners']]
+    rng = random.Random(seed)
+
+    with MockExchangeServer(exchange) as server:
+        controller = RPAController(
+            username='benchmark',
+            password='benchmark',
+            retry_policy=RetryPolicy(max_attempts=retry_attempts, base_delay=retry_base_delay),
+            circuit_breaker=CircuitBreaker(reset_timeout=1)
+        )
+        statuses = []
+        controller.bet_status_update.connect(statuses.append)
+        controller.configure_engine(engine, exchange_url=server.url)
+        controller.prefetch_markets()
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(bets):
+            market, runner = rng.choice(selections)
+            bet_data = {
+                'race_name': market['race_name'],
+                'race_number': market['race_number'],
+                'horse': runner['horse'],
+                'odds': str(runner['odds']),
+                'bet_type': 'Win'
+            }
+            bet_start = time.perf_counter()
+            controller.refresh_odds([bet_data])
+            controller.process_bet(bet_data)
+            latencies.append((time.perf_counter() - bet_start) * 1000)
+        elapsed = time.perf_counter() - start
+
+        if controller.http_client:
+            controller.http_client.close()
+
+    latencies.sort()
+    failures = Counter(status['status'] for status in statuses if status['status'] != 'Sucesso')
+    return {
+        'engine': controller.engine,
+        'bets': bets,
+        'success': sum(1 for status in statuses if status['status'] == 'Sucesso'),
+        'elapsed': elapsed,
+        'throughput': bets / elapsed if elapsed > 0 else 0,
+        'latency_ms': {p: percentile(latencies, p) for p in (50, 95, 99)},
+        'failures': dict(failures)
+    }
+
+
+def format_rpa_report(result):
+    """Formata o resultado do benchmark de RPA para exibição."""
+    lines = [
+        f"Mecanismo: {result['engine']}",
+        f"Apostas: {result['bets']} ({result['success']} com sucesso)",
+        f"Tempo total: {result['elapsed']:.3f}s",
+        f"Vazão: {result['throughput']:.1f} apostas/s",
+        "Latência (ms): " + ", ".join(f"p{p}={value:.2f}" for p, value in result['latency_ms'].items() if value is not None)
+    ]
+    if result['failures']:
+        lines.append("Falhas:")
+        for status, count in sorted(result['failures'].items(), key=lambda item: -item[1]):
+            lines.append(f"  {status}: {count}")
+    return "\n".join(lines)
+
+
+# Aplicações medidas pelo benchmark de inicialização: módulo e classe do controlador
+STARTUP_TARGETS = {
+    'main': ('src.main', 'MainController'),
+    'demo': ('src.demo', 'DemoApp')
+}
+
+# Script executado em um novo interpretador: cria o controlador, exibe a janela
+# e avisa quando ela foi exibida
+STARTUP_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from {module} import {cls}
+controller = {cls}()
+controller.main_window.show()
+controller.app.processEvents()
+print('WINDOW', flush=True)
+"""
+
+
+def parse_importtime(output):
+    """
+    Lê a saída de 'python -X importtime' e retorna o tempo acumulado das
+    importações do script e das feitas diretamente por elas (dois primeiros níveis).
+
+    Args:
+        output (str): Saída de erro do interpretador
+
+    Returns:
+        dict: Módulo -> tempo acumulado em milissegundos
+    """
+    imports = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        # O nível da importação é dado pela indentação do nome (2 espaços por nível)
+        if len(name) - len(name.lstrip()) > 3:
+            continue
+        imports[name.strip()] = int(cumulative) / 1000
+    return imports
+
+
+def run_startup_benchmark(target='main', runs=5, top=10):
+    """
+    Mede o tempo até a janela principal ser exibida, em novos interpretadores
+    (como em uma reinicialização após falha), e as importações mais caras.
+
+    Args:
+        target (str): Aplicação medida (ver STARTUP_TARGETS)
+        runs (int): Número de execuções
+        top (int): Número de importações listadas
+
+    Returns:
+        dict: Tempos até a janela (ms) e importações mais caras (mediana em ms)
+    """
+    module, cls = STARTUP_TARGETS[target]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = STARTUP_SCRIPT.format(root=root, module=module, cls=cls)
+
+    times = []
+    import_samples = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            cwd=root
+        )
+
+        # O tempo é medido até o aviso de janela exibida, não até o fim do processo
+        window_shown = False
+        for line in process.stdout:
+            if line.strip() == 'WINDOW':
+                times.append((time.perf_counter() - start) * 1000)
+                window_shown = True
+                break
+        _, errors = process.communicate()
+
+        if not window_shown:
+            raise RuntimeError(f"A janela não foi exibida (código {process.returncode}):\n{errors[-2000:]}")
+
+        for name, cumulative in parse_importtime(errors).items():
+            import_samples.setdefault(name, []).append(cumulative)
+
+    imports = sorted(((name, median(values)) for name, values in import_samples.items()),
+                     key=lambda item: -item[1])
+    return {
+        'target': target,
+        'runs': runs,
+        'time_to_window_ms': sorted(times),
+        'imports_ms': imports[:top]
+    }
+
+
+def format_startup_report(result):
+    """Formata o resultado do benchmark de inicialização para exibição."""
+    times = result['time_to_window_ms']
+    lines = [
+        f"Aplicação: {result['target']} ({result['runs']} execuções)",
+        f"Tempo até a janela (ms): mediana={median(times):.1f}, mín={times[0]:.1f}, máx={times[-1]:.1f}",
+        "Importações mais caras (ms, acumulado):"
+    ]
+    for name, cumulative in result['imports_ms']:
+        lines.append(f"  {cumulative:8.1f}  {name}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Bot de Apostas Automatizado")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rpa_parser = subparsers.add_parser('rpa', help="Executa apostas contra a simulação local da Bolsa de Apostas")
+    rpa_parser.add_argument('--bets', type=int, default=100)
+    rpa_parser.add_argument('--engine', choices=['http', 'browser'], default='http')
+    rpa_parser.add_argument('--latency', type=float, default=0.0)
+    rpa_parser.add_argument('--latency-jitter', type=float, default=0.0)
+    rpa_parser.add_argument('--error-rate', type=float, default=0.0)
+    rpa_parser.add_argument('--odds-drift', type=float, default=0.0)
+    rpa_parser.add_argument('--odds-tolerance', type=float, default=0.0)
+    rpa_parser.add_argument('--retry-attempts', type=int, default=3)
+    rpa_parser.add_argument('--retry-base-delay', type=float, default=0.01)
+    rpa_parser.add_argument('--seed', type=int, default=42)
+
+    startup_parser = subparsers.add_parser('startup', help="Mede o tempo até a janela principal ser exibida")
+    startup_parser.add_argument('--target', choices=sorted(STARTUP_TARGETS), default='main')
+    startup_parser.add_argument('--runs', type=int, default=5)
+    startup_parser.add_argument('--top', type=int, default=10)
+
+    args = parser.parse_args()
+
+    if args.command == 'rpa':
+        result = run_rpa_benchmark(
+            bets=args.bets,
+            engine=args.engine,
+            latency=args.latency,
+            latency_jitter=args.latency_jitter,
+            error_rate=args.error_rate,
+            odds_drift=args.odds_drift,
+            odds_tolerance=args.odds_tolerance,
+            retry_attempts=args.retry_attempts,
+            retry_base_delay=args.retry_base_delay,
+            seed=args.seed
+        )
+        print(format_rpa_report(result))
+    elif args.command == 'startup':
+        print(format_startup_report(run_startup_benchmark(args.target, args.runs, args.top)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+import sys
+import signal
+import asyncio
+import logging
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Adiciona o diretório raiz ao path para importação dos módulos
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+
+# Importa os módulos do projeto (sem Qt: o daemon roda em servidores sem interface gráfica)
+from src.rpa.bet_executor import BetExecutor, DUPLICATE_STATUS
+from src.rpa.bet_scheduler import BetScheduler
+from src.rpa.odds_refresher import OddsRefresher
+from src.utils.config_manager import ConfigManager
+from src.utils.bet_history_manager import BetHistoryManager
+from src.utils.pending_log import PendingBetLog
+from src.utils.event_bus import (EventBus, SignalReceived, BetQueued, BetPlaced, BetFailed, NotificationSent,
+                                 asyncio_wakeup, format_metrics)
+
+
+class BotDaemon:
+    """
+    Execução do bot sem interface gráfica, em um loop asyncio.
+    Liga o TelegramBot, a fila de apostas pendentes, a execução das apostas e o histórico
+    pelo mesmo barramento de eventos da interface gráfica, entregue no loop asyncio.
+    """
+    def __init__(self, config_manager, history_manager):
+        """
+        Inicializa o daemon.
+
+        Args:
+            config_manager (ConfigManager): Configurações do bot
+            history_manager (BetHistoryManager): Histórico de apostas
+        """
+        self.config_manager = config_manager
+        self.history_manager = history_manager
+        self.logger = logging.getLogger('BotApostas.daemon')
+
+        # Inicializa o executor de apostas
+        self.executor = BetExecutor.from_config(
+            self.config_manager,
+            log_callback=self.logger.info,
+            error_callback=self.logger.error,
+            status_callback=self.log_bet_status,
+            breaker_callback=lambda state: self.logger.warning(f"Disjuntor do site: {state}")
+        )
+
+        # Fila de apostas pendentes, ordenada pelo prazo de largada
+        self.bet_scheduler = BetScheduler(
+            min_lead_time=self.config_manager.get_rpa_config()['min_lead_time'],
+            expired_callback=self.expire_bet
+        )
+        self.pending_keys = set()
+
+        # Atualização das odds das apostas pendentes em segundo plano, fora da execução das apostas
+        self.odds_refresher = OddsRefresher(self.executor)
+
+        # Log das apostas aceitas e ainda não executadas, retomadas ao iniciar (ver resume_pending_bets)
+        self.pending_log = PendingBetLog(self.history_manager.pending_file_path)
+
+        # As apostas são executadas uma a uma, fora do loop (a execução é bloqueante)
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bet-executor')
+
+        # Barramento de eventos (as assinaturas são criadas em run, com o loop em execução)
+        self.event_bus = EventBus(error_callback=self.logger.error)
+        self.notification_tasks = set()
+
+        self.bet_available = None
+        self.stop_event = None
+        self.bot = None
+
+    def enqueue_bet(self, bet_data):
+        """
+        Adiciona uma aposta recebida do Telegram à fila de apostas pendentes.
+
+        Args:
+            bet_data (dict): Dados da aposta.
+        """
+        self.logger.info(f"Nova aposta recebida: {bet_data['race_name']} - Corrida {bet_data['race_number']} - Cavalo: {bet_data['horse']}")
+
+        # Apostas que não passaram por accept_signal são gravadas no log de apostas pendentes aqui
+        if not bet_data.get('pending_id'):
+            self.accept_signal(bet_data)
+
+        # Ignora apostas já registradas ou pendentes
+        idempotency_key = bet_data.get('idempotency_key')
+        if idempotency_key:
+            if self.history_manager.has_idempotency_key(idempotency_key) or idempotency_key in self.pending_keys:
+                self.logger.error(f"Aposta duplicada ignorada: {bet_data['race_name']} - {bet_data['horse']}")
+                self.pending_log.mark_done(bet_data)
+                return
+            self.pending_keys.add(idempotency_key)
+
+        self.bet_scheduler.push(bet_data)
+        self.odds_refresher.watch(self.bet_scheduler.pending_bets())
+        self.event_bus.publish(BetQueued(bet_data))
+        if self.bet_available:
+            self.bet_available.set()
+
+    def accept_signal(self, bet_data):
+        """
+        Grava uma aposta recebida no log de apostas pendentes, antes da publicação no
+        barramento: os sinais ainda na fila 'sinais' não se perdem numa falha.
+
+        Args:
+            bet_data (dict): Dados da aposta.
+        """
+        # O prazo é gravado junto: o horário de largada sozinho não identifica o dia
+        if bet_data.get('deadline') is None:
+            bet_data['deadline'] = self.bet_scheduler.compute_deadline(bet_data)
+        self.pending_log.append(bet_data)
+
+    def resume_pending_bets(self):
+        """
+        Recoloca na fila as apostas do log de apostas pendentes (aceitas e não executadas
+        antes de uma falha). As apostas cuja corrida já largou são registradas como expiradas.
+        """
+        resumed, expired = self.pending_log.recover(self.history_manager.idempotency_keys)
+        for bet_data in expired:
+            self.expire_bet(bet_data)
+
+        for bet_data in resumed:
+            self.bet_scheduler.push(bet_data)
+            if bet_data.get('idempotency_key'):
+                self.pending_keys.add(bet_data['idempotency_key'])
+        if resumed:
+            self.logger.info(f"{len(resumed)} apostas pendentes retomadas do log")
+            self.odds_refresher.watch(self.bet_scheduler.pending_bets())
+            self.bet_available.set()
+
+    def expire_bet(self, bet_data):
+        """
+        Registra uma aposta descartada por não poder mais ser realizada antes da largada.
+
+        Args:
+            bet_data (dict): Dados da aposta.
+        """
+        self.pending_keys.discard(bet_data.get('idempotency_key'))
+        self.logger.error(f"Aposta descartada (corrida já iniciada): {bet_data['race_name']} - Corrida {bet_data['race_number']} - Cavalo: {bet_data['horse']}")
+        self.history_manager.add_bet(bet_data, "Expirada")
+        self.pending_log.mark_done(bet_data)
+        self.event_bus.publish(BetFailed(bet_data, "Expirada"))
+
+    def log_bet_status(self, bet_status):
+        """Registra no log o status de uma aposta."""
+        self.logger.info(f"Status da aposta: {bet_status['race_name']} - {bet_status['horse']}: {bet_status['status']}")
+
+    async def process_pending(self):
+        """Executa, por ordem de prazo, todas as apostas pendentes."""
+        loop = asyncio.get_running_loop()
+
+        while len(self.bet_scheduler) > 0:
+            bet_data = self.bet_scheduler.pop_next()
+            if not bet_data:
+                continue
+            self.pending_keys.discard(bet_data.get('idempotency_key'))
+            self.odds_refresher.watch(self.bet_scheduler.pending_bets())
+
+            # As odds são conferidas no cache mantido pelo OddsRefresher, sem requisições antes da aposta
+            success = await loop.run_in_executor(self.worker, self.executor.process_bet, bet_data)
+
+            # Repetição de uma aposta já realizada: a original é que vai para o histórico e é notificada
+            if bet_data.get('status') == DUPLICATE_STATUS:
+                self.pending_log.mark_done(bet_data)
+                continue
+
+            # O histórico é gravado no loop, como a fila; a notificação é enviada pelo assinante do evento
+            status = bet_data.get('status') or ("Sucesso" if success else "Erro")
+            self.history_manager.add_bet(bet_data, status)
+            self.pending_log.mark_done(bet_data)
+            self.event_bus.publish(BetPlaced(bet_data, status) if success else BetFailed(bet_data, status))
+
+    def notify_result(self, event):
+        """Agenda no loop o envio da notificação do resultado de uma aposta."""
+        task = asyncio.get_running_loop().create_task(
+            self.send_notification(event.bet_data, isinstance(event, BetPlaced), event.status)
+        )
+        self.notification_tasks.add(task)
+        task.add_done_callback(self.notification_tasks.discard)
+
+    async def send_notification(self, bet_data, success, status):
+        """Envia pelo Telegram a notificação do resultado da aposta, se configurada."""
+        telegram_config = self.config_manager.get_telegram_config()
+        notification_id = telegram_config['notification_bet_id'] if success else telegram_config['notification_error_id']
+
+        if notification_id and self.bot and self.bot.is_running():
+            message = f"{'✅' if success else '❌'} Aposta {status}: {bet_data['race_name']} - {bet_data['horse']}"
+            sent = await self.bot.send_notification(message)
+            self.event_bus.publish(NotificationSent(message, sent))
+
+    def subscribe_events(self, loop):
+        """
+        Cria as assinaturas do barramento de eventos, entregues no loop informado.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Loop do daemon
+        """
+        wakeup = asyncio_wakeup(loop)
+
+        # Sinais do Telegram: com a fila cheia, quem publica aguarda sem limite de tempo (nenhum
+        # sinal é descartado); publicados no próprio loop, esvaziam a fila em vez de aguardar
+        self.event_bus.subscribe(SignalReceived, lambda event: self.enqueue_bet(event.bet_data),
+                                 name='sinais', max_size=500, overflow='block', block_timeout=None,
+                                 wakeup=wakeup, drain_thread=threading.get_ident())
+        # Notificações atrasadas perdem o sentido: com a fila cheia, as mais antigas são descartadas
+        self.event_bus.subscribe((BetPlaced, BetFailed), self.notify_result,
+                                 name='notificações', max_size=50, overflow='drop_oldest', wakeup=wakeup)
+        self.event_bus.subscribe(NotificationSent, self.log_notification,
+                                 name='log de notificações', max_size=200, overflow='drop_oldest', wakeup=wakeup)
+
+    def receive_signal(self, bet_data):
+        """Grava no log de apostas pendentes e publica no barramento de eventos um sinal recebido do Telegram."""
+        self.accept_signal(bet_data)
+        if not self.event_bus.publish(SignalReceived(bet_data)):
+            self.logger.error(f"Sinal descartado (fila de sinais indisponível): {bet_data['race_name']} - Corrida {bet_data['race_number']} - Cavalo: {bet_data['horse']}")
+
+    def log_notification(self, event):
+        """Registra no log o envio de uma notificação."""
+        if event.success:
+            self.logger.info(f"Notificação enviada: {event.message}")
+        else:
+            self.logger.error(f"Falha ao enviar notificação: {event.message}")
+
+    async def dispatch_loop(self):
+        """Aguarda apostas na fila e as executa até o daemon ser parado."""
+        while not self.stop_event.is_set():
+            await self.bet_available.wait()
+            self.bet_available.clear()
+            await self.process_pending()
+
+    def stop(self):
+        """Solicita a parada do daemon."""
+        if self.stop_event:
+            self.stop_event.set()
+            self.bet_available.set()
+
+    async def run(self, with_telegram=True):
+        """
+        Executa o daemon até receber SIGINT/SIGTERM.
+
+        Args:
+            with_telegram (bool): Inicia o bot do Telegram (False apenas para testes locais)
+
+        Returns:
+            int: Código de saída
+        """
+        loop = asyncio.get_running_loop()
+        self.bet_available = asyncio.Event()
+        self.stop_event = asyncio.Event()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Sem suporte a sinais no loop (ex.: Windows): encerra com Ctrl+C
+                pass
+
+        self.subscribe_events(loop)
+
+        # Pré-carrega os mercados do dia
+        self.executor.prefetch_markets()
+
+        # Retoma as apostas aceitas e não executadas antes de uma falha
+        self.resume_pending_bets()
+        self.odds_refresher.start()
+
+        if with_telegram:
+            # Importado sob demanda, como na interface gráfica
+            from src.telegram.telegram_bot import TelegramBot
+
+            telegram_config = self.config_manager.get_telegram_config()
+            self.bot = TelegramBot(
+                token=telegram_config['token'],
+                chat_id=telegram_config['chat_id'],
+                message_callback=self.receive_signal,
+                error_callback=self.logger.error
+            )
+            if not await self.bot.start():
+                self.logger.error("Falha ao iniciar o bot do Telegram.")
+                return 1
+            self.logger.info("Bot do Telegram iniciado. Monitorando mensagens...")
+
+        dispatcher = asyncio.create_task(self.dispatch_loop())
+        await self.stop_event.wait()
+        self.logger.info("Parando o daemon...")
+
+        await dispatcher
+
+        # Entrega os eventos restantes e aguarda as notificações em andamento
+        self.event_bus.drain_all()
+        if self.notification_tasks:
+            await asyncio.gather(*self.notification_tasks, return_exceptions=True)
+        if self.bot:
+            await self.bot.stop()
+
+        self.odds_refresher.stop()
+        self.worker.shutdown(wait=True)
+        self.pending_log.close()
+        self.executor.logout()
+        if self.executor.http_client:
+            self.executor.http_client.close()
+
+        self.logger.info(format_metrics(self.event_bus.metrics()))
+        self.logger.info("Daemon parado.")
+        return 0
+
+
+def apply_overrides(config_manager, args):
+    """
+    Aplica às configurações (em memória) os valores informados na linha de comando.
+
+    Args:
+        config_manager (ConfigManager): Configurações carregadas do config.json
+        args (argparse.Namespace): Argumentos da linha de comando
+    """
+    telegram_config = config_manager.get_telegram_config()
+    config_manager.set_telegram_config(
+        token=args.token or telegram_config['token'],
+        chat_id=args.chat_id or telegram_config['chat_id'],
+        notification_bet_id=telegram_config.get('notification_bet_id', ''),
+        notification_error_id=telegram_config.get('notification_error_id', '')
+    )
+
+    betting_config = config_manager.get_betting_config()
+    config_manager.set_betting_config(
+        username=args.username or betting_config['username'],
+        password=args.password or betting_config['password']
+    )
+
+    config_manager.set_rpa_config(
+        engine=args.engine,
+        exchange_url=args.exchange_url,
+        min_lead_time=args.min_lead_time
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot de Apostas Automatizado sem interface gráfica")
+    parser.add_argument('--config', help="Arquivo de configurações (padrão: config.json do projeto)")
+    parser.add_argument('--history', help="Arquivo de histórico (padrão: bet_history.json do projeto)")
+    parser.add_argument('--token', help="Token do bot do Telegram")
+    parser.add_argument('--chat-id', help="ID do chat monitorado")
+    parser.add_argument('--username', help="Usuário da Bolsa de Apostas")
+    parser.add_argument('--password', help="Senha da Bolsa de Apostas")
+    parser.add_argument('--engine', choices=['browser', 'http'], help="Mecanismo de execução das apostas")
+    parser.add_argument('--exchange-url', help="URL da API da Bolsa de Apostas (modo HTTP)")
+    parser.add_argument('--min-lead-time', type=float, help="Antecedência mínima antes da largada, em segundos")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=getattr(logging, args.log_level)
+    )
+
+    config_manager = ConfigManager(args.config)
+    apply_overrides(config_manager, args)
+    history_manager = BetHistoryManager.shared(args.history)
+
+    daemon = BotDaemon(config_manager, history_manager)
+    return asyncio.run(daemon.run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,12 +9,13 @@ sys.path.append('/home/ubuntu/BotApostasAutomatizado')
 
 # Importa os módulos do projeto
 from src.interface.main_window import MainWindow
-from src.telegram.telegram_worker import TelegramWorker
 from src.rpa.rpa_controller import RPAController
 from src.utils.config_manager import ConfigManager
 from src.utils.bet_history_manager import BetHistoryManager
 from src.utils.notification_system import NotificationSystem
 from src.interface.statistics_widget import StatisticsWidget
+from src.interface.history_table_model import HistoryTableModel
+from src.interface.history_notifier import HistoryNotifier
 
 class DemoApp:
     """
@@ -28,16 +29,29 @@ class DemoApp:
         # Inicializa a interface gráfica
         self.main_window = MainWindow()
         
+        # Inicializa os gerenciadores (instâncias únicas, compartilhadas pelos componentes)
+        self.config_manager = ConfigManager()
+        self.history_manager = BetHistoryManager.shared()
+        
+        # Inicializa o sistema de notificações
+        self.notification_system = NotificationSystem(self.main_window, config_manager=self.config_manager)
+        
         # Adiciona o widget de estatísticas à aba de estatísticas
-        self.stats_widget = StatisticsWidget()
+        self.stats_widget = StatisticsWidget(history_manager=self.history_manager)
         self.main_window.stats_tab.layout().addWidget(self.stats_widget)
+        self.stats_widget.error.connect(self.main_window.errors_log.append)
         
-        # Inicializa o sistema de notificações
-        self.notification_system = NotificationSystem(self.main_window)
+        # Liga a tabela de histórico ao modelo sobre o gerenciador de histórico
+        self.history_model = HistoryTableModel(self.history_manager)
+        self.main_window.history_table.setModel(self.history_model)
         
-        # Inicializa os gerenciadores
-        self.config_manager = ConfigManager()
-        self.history_manager = BetHistoryManager()
+        # Novas apostas atualizam a tabela e as estatísticas de forma incremental
+        self.history_notifier = HistoryNotifier(self.history_manager)
+        self.history_notifier.bet_added.connect(self.history_model.bet_appended)
+        self.history_notifier.bet_added.connect(self.stats_widget.on_bet_added)
+        self.history_notifier.history_cleared.connect(self.history_model.refresh)
+        self.history_notifier.history_cleared.connect(self.stats_widget.refresh_statistics)
+        self.history_notifier.history_settled.connect(self.stats_widget.refresh_statistics)
         
         # Inicializa o controlador RPA
         self.rpa_controller = RPAController()
@@ -113,48 +127,15 @@ class DemoApp:
     
     def load_history_to_ui(self):
         """Carrega o histórico de apostas para a interface."""
-        # Obtém o histórico
-        history = self.history_manager.get_history()
-        
-        # Limpa a tabela
-        self.main_window.history_table.setRowCount(0)
-        
-        # Preenche a tabela com o histórico
-        for i, bet in enumerate(history):
-            self.main_window.history_table.insertRow(i)
-            self.main_window.history_table.setItem(i, 0, QTableWidgetItem(bet['timestamp']))
-            self.main_window.history_table.setItem(i, 1, QTableWidgetItem(bet['race_name']))
-            self.main_window.history_table.setItem(i, 2, QTableWidgetItem(bet['race_number']))
-            self.main_window.history_table.setItem(i, 3, QTableWidgetItem(bet['horse']))
-            self.main_window.history_table.setItem(i, 4, QTableWidgetItem(bet['odds']))
-            self.main_window.history_table.setItem(i, 5, QTableWidgetItem(bet['status']))
+        self.history_model.refresh()
     
     def apply_filters(self):
         """Aplica os filtros de busca no histórico."""
-        # Obtém os filtros
-        filter_race = self.main_window.filter_race.text()
-        filter_horse = self.main_window.filter_horse.text()
-        filter_status = self.main_window.filter_status.text()
-        
-        # Obtém o histórico filtrado
-        filtered_history = self.history_manager.get_history(
-            filter_race=filter_race,
-            filter_horse=filter_horse,
-            filter_status=filter_status
+        self.history_model.set_filter(
+            filter_race=self.main_window.filter_race.text(),
+            filter_horse=self.main_window.filter_horse.text(),
+            filter_status=self.main_window.filter_status.text()
         )
-        
-        # Limpa a tabela
-        self.main_window.history_table.setRowCount(0)
-        
-        # Preenche a tabela com o histórico filtrado
-        for i, bet in enumerate(filtered_history):
-            self.main_window.history_table.insertRow(i)
-            self.main_window.history_table.setItem(i, 0, QTableWidgetItem(bet['timestamp']))
-            self.main_window.history_table.setItem(i, 1, QTableWidgetItem(bet['race_name']))
-            self.main_window.history_table.setItem(i, 2, QTableWidgetItem(bet['race_number']))
-            self.main_window.history_table.setItem(i, 3, QTableWidgetItem(bet['horse']))
-            self.main_window.history_table.setItem(i, 4, QTableWidgetItem(bet['odds']))
-            self.main_window.history_table.setItem(i, 5, QTableWidgetItem(bet['status']))
     
     def start_demo(self):
         """Inicia a demonstração."""
@@ -322,14 +303,8 @@ class DemoApp:
             self.main_window.telegram_log.append("Erro ao realizar aposta: Odds foram alteradas.")
             self.main_window.errors_log.append(f"Erro na aposta {bet_data['race_name']} - {bet_data['horse']}: Odds foram alteradas.")
         
-        # Adiciona ao histórico
+        # Adiciona ao histórico (a interface é atualizada pela notificação bet_added)
         self.history_manager.add_bet(bet_data, status)
-        
-        # Atualiza a interface
-        self.load_history_to_ui()
-        
-        # Atualiza as estatísticas
-        self.stats_widget.update_statistics()
     
     def run(self):
         """Executa a aplicação."""
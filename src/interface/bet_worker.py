@@ -0,0 +1,76 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class BetTask(QRunnable):
+    """Tarefa que executa uma aposta fora da thread da interface."""
+    def __init__(self, runner, execute, bet_data, args):
+        """
+        Inicializa a tarefa.
+
+        Args:
+            runner (BetRunner): Executor que recebe o resultado
+            execute (callable): Função que recebe os dados da aposta (e args) e retorna o resultado
+            bet_data (dict): Dados da aposta
+            args (tuple): Argumentos adicionais de execute
+        """
+        super().__init__()
+        self.runner = runner
+        self.execute = execute
+        self.bet_data = bet_data
+        self.args = args
+
+    def run(self):
+        try:
+            result = self.execute(self.bet_data, *self.args)
+        except Exception as e:
+            self.runner.error.emit(f"Erro ao executar aposta: {str(e)}")
+            result = False
+
+        # Emitido da thread da tarefa: entregue na thread da interface
+        self.runner.finished.emit(self.bet_data, result)
+
+
+class BetRunner(QObject):
+    """
+    Executa as apostas uma a uma em uma thread própria e entrega o resultado por sinal.
+    A espera entre novas tentativas e as requisições ao site não bloqueiam a interface.
+    """
+    finished = pyqtSignal(object, object)
+    error = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        """
+        Inicializa o executor.
+
+        Args:
+            parent (QObject, optional): Objeto pai
+        """
+        super().__init__(parent)
+        # Uma única thread: as apostas são executadas em ordem, sem concorrência no site
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.busy = False
+        self.finished.connect(self.on_finished)
+
+    def request(self, execute, bet_data, *args):
+        """
+        Executa uma aposta na thread de apostas.
+
+        Args:
+            execute (callable): Função que recebe os dados da aposta (e args) e retorna o resultado
+            bet_data (dict): Dados da aposta
+            *args: Argumentos adicionais de execute
+        """
+        self.busy = True
+        self.thread_pool.start(BetTask(self, execute, bet_data, args))
+
+    def is_busy(self):
+        """Verifica se há uma aposta em execução."""
+        return self.busy
+
+    def on_finished(self, bet_data, result):
+        self.busy = False
+
+    def wait(self, timeout=-1):
+        """Aguarda o fim da aposta em execução (usado ao encerrar a aplicação)."""
+        return self.thread_pool.waitForDone(timeout)
@@ -0,0 +1,38 @@
+import threading
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+
+class QtEventPump(QObject):
+    """
+    Entrega na thread do Qt (a thread em que o pump foi criado) os eventos do EventBus.
+
+    Cada rajada de eventos gera um único sinal enfileirado, e os eventos são entregues em
+    lotes de batch_size: o loop de eventos do Qt processa a interface entre um lote e outro.
+    """
+    wakeup = pyqtSignal(object)
+
+    def __init__(self, event_bus, parent=None):
+        super().__init__(parent)
+        self.event_bus = event_bus
+        # Sempre enfileirado, mesmo quando o evento é publicado na própria thread do Qt
+        self.wakeup.connect(self.drain, Qt.QueuedConnection)
+        self.thread_id = threading.get_ident()
+
+    def subscribe(self, event_types, handler, **options):
+        """
+        Assina tipos de evento com entrega na thread do Qt.
+
+        Args:
+            event_types (type or tuple): Classes de evento entregues ao handler
+            handler (callable): Função que recebe cada evento
+            **options: Opções da fila (ver Subscription)
+
+        Returns:
+            Subscription: Assinatura criada
+        """
+        return self.event_bus.subscribe(event_types, handler, wakeup=self.wakeup.emit, drain_thread=self.thread_id,
+                                        **options)
+
+    def drain(self, subscription):
+        """Entrega um lote de eventos da assinatura."""
+        subscription.drain_batch()
@@ -0,0 +1,18 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class HistoryNotifier(QObject):
+    """
+    Repassa as notificações do gerenciador de histórico como sinais Qt.
+    Os sinais podem ser emitidos de qualquer thread e são entregues na thread dos receptores.
+    """
+    bet_added = pyqtSignal(dict)
+    history_settled = pyqtSignal(int)
+    history_cleared = pyqtSignal()
+
+    def __init__(self, history_manager, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+        self.history_manager.subscribe(self.bet_added.emit)
+        self.history_manager.subscribe(self.history_settled.emit, event='settle')
+        self.history_manager.subscribe(self.history_cleared.emit, event='clear')
@@ -0,0 +1,143 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """
+    Modelo da tabela de histórico de apostas.
+    Lê os registros diretamente do gerenciador de histórico (mais recentes primeiro),
+    carregando as linhas por páginas à medida que a tabela é rolada.
+    """
+    COLUMNS = [
+        ("Data/Hora", 'timestamp'),
+        ("Corrida", 'race_name'),
+        ("Nº", 'race_number'),
+        ("Cavalo", 'horse'),
+        ("Odds", 'odds'),
+        ("Status", 'status')
+    ]
+    PAGE_SIZE = 500
+
+    def __init__(self, history_manager, parent=None):
+        """
+        Inicializa o modelo.
+
+        Args:
+            history_manager (BetHistoryManager): Gerenciador de histórico
+            parent (QObject, optional): Objeto pai
+        """
+        super().__init__(parent)
+        self.history_manager = history_manager
+        self.filters = None
+        self.records = None
+        self.loaded = 0
+        self.refresh()
+
+    def source_count(self):
+        """Retorna o número total de registros visíveis (carregados ou não)."""
+        if self.records is not None:
+            return len(self.records)
+        return len(self.history_manager.history)
+
+    def record(self, row):
+        """Retorna o registro exibido na linha informada."""
+        if self.records is not None:
+            return self.records[row]
+        history = self.history_manager.history
+        return history[len(history) - 1 - row]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return str(self.record(index.row()).get(self.COLUMNS[index.column()][1], ''))
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section][0]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.loaded < self.source_count()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, self.source_count() - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def refresh(self):
+        """Recarrega o modelo a partir do histórico, mantendo os filtros atuais."""
+        self.beginResetModel()
+        if self.filters:
+            self.records = self.history_manager.get_history(**self.filters)
+        else:
+            self.records = None
+        self.loaded = min(self.PAGE_SIZE, self.source_count())
+        self.endResetModel()
+
+    def set_filter(self, filter_race=None, filter_horse=None, filter_status=None):
+        """
+        Aplica filtros ao histórico exibido.
+
+        Args:
+            filter_race (str, optional): Filtro por nome da corrida.
+            filter_horse (str, optional): Filtro por nome do cavalo.
+            filter_status (str, optional): Filtro por status da aposta.
+        """
+        filters = {
+            'filter_race': filter_race,
+            'filter_horse': filter_horse,
+            'filter_status': filter_status
+        }
+        self.filters = filters if any(filters.values()) else None
+        self.refresh()
+
+    def matches_filter(self, record):
+        """Verifica se um registro atende aos filtros atuais."""
+        if not self.filters:
+            return True
+        checks = [
+            (self.filters['filter_race'], 'race_name'),
+            (self.filters['filter_horse'], 'horse'),
+            (self.filters['filter_status'], 'status')
+        ]
+        return all(not value or value.lower() in record.get(key, '').lower() for value, key in checks)
+
+    def bet_appended(self, record=None):
+        """
+        Insere no topo da tabela uma aposta recém-adicionada ao histórico,
+        sem recarregar as demais linhas.
+
+        Args:
+            record (dict, optional): Registro adicionado (padrão: o último do histórico)
+        """
+        if record is None:
+            if not self.history_manager.history:
+                return
+            record = self.history_manager.history[-1]
+
+        if self.records is not None:
+            if not self.matches_filter(record):
+                return
+            self.records.insert(0, record)
+
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.loaded += 1
+        self.endInsertRows()
@@ -0,0 +1,69 @@
+import sys
+from PyQt5.QtWidgets import QGroupBox, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
+
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.utils.latency_tracer import STAGES, STAGE_LABELS, add_trace_samples, collect_samples, summarize_samples
+
+class LatencyPanel(QGroupBox):
+    """
+    Painel com os percentis de latência (p50, p95 e p99) de cada etapa de uma aposta,
+    da data da mensagem no Telegram até a atualização de status.
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, parent=None):
+        super().__init__("Latência por Etapa (ms)", parent)
+
+        layout = QVBoxLayout(self)
+        self.latency_table = QTableWidget(0, 5)
+        self.latency_table.setHorizontalHeaderLabels(["Etapa", "Amostras", "p50", "p95", "p99"])
+        self.latency_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.latency_table)
+
+        # Sketches de quantis das durações, por etapa
+        self.samples = {}
+
+    def update_latency(self, history):
+        """
+        Recalcula o painel a partir de todo o histórico de apostas.
+
+        Args:
+            history (list): Registros do histórico com o campo 'trace'.
+        """
+        self.set_samples(collect_samples(history))
+
+    def set_samples(self, samples):
+        """
+        Substitui as amostras do painel (ex.: calculadas em segundo plano).
+
+        Args:
+            samples (dict): Etapa -> TDigest das durações
+        """
+        self.samples = samples
+        self.render()
+
+    def add_bet(self, bet_record):
+        """
+        Acrescenta ao painel o rastro de uma aposta recém-adicionada.
+
+        Args:
+            bet_record (dict): Registro da aposta.
+        """
+        if bet_record.get('trace'):
+            add_trace_samples(self.samples, bet_record['trace'])
+            self.render()
+
+    def render(self):
+        """Atualiza a tabela com os percentis das amostras atuais."""
+        stats = summarize_samples(self.samples, self.PERCENTILES)
+
+        # Mantém a ordem das etapas e deixa o total por último
+        stages = [stage for stage in STAGES + ['total'] if stage in stats]
+
+        self.latency_table.setRowCount(len(stages))
+        for i, stage in enumerate(stages):
+            self.latency_table.setItem(i, 0, QTableWidgetItem(STAGE_LABELS.get(stage, stage)))
+            self.latency_table.setItem(i, 1, QTableWidgetItem(str(stats[stage]['count'])))
+            for column, p in enumerate(self.PERCENTILES, start=2):
+                self.latency_table.setItem(i, column, QTableWidgetItem(f"{stats[stage][p]:.1f}"))
@@ -0,0 +1,100 @@
+import os
+import logging
+from logging.handlers import RotatingFileHandler
+from collections import deque
+from PyQt5.QtWidgets import QPlainTextEdit
+from PyQt5.QtCore import QTimer
+
+
+def create_file_logger(name, file_name, max_bytes=5 * 1024 * 1024, backup_count=5):
+    """
+    Cria (ou reutiliza) um logger que grava em arquivo com rotação por tamanho.
+
+    Args:
+        name (str): Nome do logger
+        file_name (str): Nome do arquivo dentro do diretório 'logs' do projeto
+        max_bytes (int): Tamanho máximo de cada arquivo antes da rotação
+        backup_count (int): Número de arquivos antigos mantidos
+
+    Returns:
+        logging.Logger: Logger configurado
+    """
+    logger = logging.getLogger(f"BotApostas.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    if not logger.handlers:
+        try:
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            log_dir = os.path.join(base_dir, 'logs')
+            os.makedirs(log_dir, exist_ok=True)
+
+            handler = RotatingFileHandler(
+                os.path.join(log_dir, file_name),
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger.addHandler(handler)
+        except Exception as e:
+            print(f"Erro ao abrir o arquivo de log {file_name}: {str(e)}")
+            logger.addHandler(logging.NullHandler())
+
+    return logger
+
+
+class LogView(QPlainTextEdit):
+    """
+    Área de log com capacidade limitada.
+    Mantém apenas as últimas linhas na tela, agrupa as inclusões em lotes por um
+    temporizador curto e grava o log completo em arquivo com rotação.
+    """
+    def __init__(self, capacity=2000, flush_interval=100, logger=None, parent=None):
+        """
+        Inicializa a área de log.
+
+        Args:
+            capacity (int): Número máximo de linhas mantidas na tela
+            flush_interval (int): Intervalo em milissegundos entre as atualizações da tela
+            logger (logging.Logger, optional): Logger que recebe todas as linhas
+            parent (QWidget, optional): Widget pai
+        """
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(capacity)
+        self.logger = logger
+
+        # Linhas aguardando a próxima atualização (as mais antigas são descartadas
+        # se chegarem mais linhas do que cabem na tela)
+        self.pending = deque(maxlen=capacity)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(flush_interval)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def append(self, text):
+        """
+        Adiciona uma linha ao log. Mantém a mesma assinatura de QTextEdit.append.
+
+        Args:
+            text (str): Texto a adicionar
+        """
+        text = str(text)
+        self.pending.append(text)
+
+        if self.logger:
+            self.logger.info(text)
+
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        """Exibe de uma só vez as linhas pendentes."""
+        if not self.pending:
+            return
+
+        text = "\n".join(self.pending)
+        self.pending.clear()
+        self.appendPlainText(text)
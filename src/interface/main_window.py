@@ -2,10 +2,15 @@ import sys
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QTextEdit, QLineEdit, 
                             QGroupBox, QFormLayout, QTableWidget, QTableWidgetItem, 
-                            QHeaderView, QSplitter, QMessageBox)
+                            QTableView, QHeaderView, QSplitter, QMessageBox, QDoubleSpinBox)
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QIcon
 
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.interface.latency_panel import LatencyPanel
+from src.interface.log_view import LogView, create_file_logger
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -44,6 +49,11 @@ class MainWindow(QMainWindow):
         
         # Barra de status
         self.statusBar().showMessage("Pronto para iniciar")
+        
+        # Indicador permanente da disponibilidade do site de apostas
+        self.breaker_label = QLabel()
+        self.statusBar().addPermanentWidget(self.breaker_label)
+        self.set_breaker_state("Fechado")
     
     def setup_dashboard(self):
         # Layout principal do dashboard
@@ -78,8 +88,7 @@ class MainWindow(QMainWindow):
         # Log de mensagens do Telegram
         telegram_group = QGroupBox("Log de Mensagens do Telegram")
         telegram_layout = QVBoxLayout()
-        self.telegram_log = QTextEdit()
-        self.telegram_log.setReadOnly(True)
+        self.telegram_log = LogView(logger=create_file_logger('telegram', 'telegram.log'))
         telegram_layout.addWidget(self.telegram_log)
         telegram_group.setLayout(telegram_layout)
         logs_history_splitter.addWidget(telegram_group)
@@ -87,9 +96,11 @@ class MainWindow(QMainWindow):
         # Histórico de apostas
         history_group = QGroupBox("Histórico de Apostas")
         history_layout = QVBoxLayout()
-        self.history_table = QTableWidget(0, 6)
-        self.history_table.setHorizontalHeaderLabels(["Data/Hora", "Corrida", "Nº", "Cavalo", "Odds", "Status"])
+        # O modelo (HistoryTableModel) é definido pelo controlador
+        self.history_table = QTableView()
         self.history_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.history_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.history_table.verticalHeader().setDefaultSectionSize(24)
         history_layout.addWidget(self.history_table)
         history_group.setLayout(history_layout)
         logs_history_splitter.addWidget(history_group)
@@ -97,8 +108,7 @@ class MainWindow(QMainWindow):
         # Log de erros
         errors_group = QGroupBox("Log de Erros")
         errors_layout = QVBoxLayout()
-        self.errors_log = QTextEdit()
-        self.errors_log.setReadOnly(True)
+        self.errors_log = LogView(logger=create_file_logger('errors', 'errors.log'))
         errors_layout.addWidget(self.errors_log)
         errors_group.setLayout(errors_layout)
         logs_history_splitter.addWidget(errors_group)
@@ -132,11 +142,16 @@ class MainWindow(QMainWindow):
         self.betting_username = QLineEdit()
         self.betting_password = QLineEdit()
         self.betting_password.setEchoMode(QLineEdit.Password)
+        self.betting_stake = QDoubleSpinBox()
+        self.betting_stake.setRange(0.01, 100000)
+        self.betting_stake.setDecimals(2)
+        self.betting_stake.setValue(1.0)
         self.test_betting_button = QPushButton("Testar Conexão")
         self.test_betting_button.clicked.connect(self.test_betting_connection)
         
         betting_form.addRow("Usuário:", self.betting_username)
         betting_form.addRow("Senha:", self.betting_password)
+        betting_form.addRow("Stake padrão:", self.betting_stake)
         betting_form.addRow("", self.test_betting_button)
         
         betting_group.setLayout(betting_form)
@@ -201,6 +216,41 @@ class MainWindow(QMainWindow):
         self.stats_table.setHorizontalHeaderLabels(["Métrica", "Hoje", "Esta Semana", "Este Mês"])
         self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         stats_layout.addWidget(self.stats_table)
+        
+        # Resultado financeiro das apostas liquidadas, no total, por canal e por tipo
+        pnl_group = QGroupBox("Resultado Financeiro (apostas liquidadas)")
+        pnl_layout = QVBoxLayout()
+        
+        self.import_settlements_button = QPushButton("Importar Resultados...")
+        pnl_layout.addWidget(self.import_settlements_button)
+        
+        self.pnl_table = QTableWidget(0, 7)
+        self.pnl_table.setHorizontalHeaderLabels(["Grupo", "Apostas", "Apostado", "Lucro", "ROI", "Acerto", "Drawdown Máx."])
+        self.pnl_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        pnl_layout.addWidget(self.pnl_table)
+        
+        pnl_group.setLayout(pnl_layout)
+        stats_layout.addWidget(pnl_group)
+        
+        # Painel de latência por etapa
+        self.latency_panel = LatencyPanel()
+        stats_layout.addWidget(self.latency_panel)
+    
+    def set_breaker_state(self, state):
+        """
+        Atualiza o indicador do disjuntor do site de apostas na barra de status.
+        
+        Args:
+            state (str): Estado do disjuntor (Fechado, Aberto ou Semiaberto).
+        """
+        descriptions = {
+            "Fechado": ("Bolsa de Apostas: disponível", "#4CAF50"),
+            "Aberto": ("Bolsa de Apostas: indisponível", "#F44336"),
+            "Semiaberto": ("Bolsa de Apostas: testando conexão", "#FF9800")
+        }
+        text, color = descriptions.get(state, (f"Bolsa de Apostas: {state}", "#000000"))
+        self.breaker_label.setText(text)
+        self.breaker_label.setStyleSheet(f"color: {color};")
     
     # Métodos de ação
     def start_automation(self):
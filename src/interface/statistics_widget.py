@@ -1,29 +1,71 @@
 import os
+import math
 import sys
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextEdit, QComboBox
-from PyQt5.QtCore import Qt, QTimer
+from datetime import datetime, timedelta
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextEdit,
+                            QComboBox, QDateEdit, QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt5.QtCore import Qt, QTimer, QDate, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import numpy as np
 
 # Importa os módulos do projeto
 sys.path.append('/home/ubuntu/BotApostasAutomatizado')
 from src.utils.bet_history_manager import BetHistoryManager
+from src.utils.history_aggregates import DailyAggregates, QUANTILE_PERCENTILES, top_groups
+from src.interface.statistics_worker import StatisticsRunner
 
 class StatisticsWidget(QWidget):
     """
     Widget avançado para exibição de estatísticas e gráficos.
+    Os erros do cálculo em segundo plano são emitidos pelo sinal error.
     """
-    def __init__(self, parent=None):
+    error = pyqtSignal(str)
+    
+    PIE_LABELS = ['Sucesso', 'Erro']
+    PIE_COLORS = ['#4CAF50', '#F44336']
+    MAX_BAR_DAYS = 7
+    REFRESH_INTERVAL = 2000  # Intervalo mínimo entre recálculos (ms)
+    QUANTILE_LABELS = {
+        'latency': 'Latência Total (ms)',
+        'odds': 'Odds',
+        'time_to_off': 'Antecedência da Largada (s)'
+    }
+    GROUP_LABELS = {
+        'race_name': 'Corrida',
+        'horse': 'Cavalo',
+        'bet_type': 'Tipo de Aposta'
+    }
+    GROUP_ORDERS = [('count', 'Mais apostas'), ('success_rate', 'Maior taxa de sucesso')]
+    TOP_GROUPS = 10
+    MIN_GROUP_BETS = 3  # Apostas mínimas para o grupo entrar na ordenação por taxa de sucesso
+    
+    def __init__(self, parent=None, history_manager=None):
         super().__init__(parent)
-        self.history_manager = BetHistoryManager()
+        self.history_manager = history_manager or BetHistoryManager.shared()
+        self.stats = None
+        
+        # Totais por dia, dos quais cada período é obtido sem percorrer o histórico
+        self.aggregates = None
+        
+        # Motor de resultado financeiro das apostas liquidadas
+        self.pnl_engine = None
+        
+        # Versão do histórico dos agregados atuais e da solicitação em andamento
+        self.aggregates_version = None
+        self.requested_version = None
+        
+        # Cálculo das estatísticas fora da thread da interface
+        self.statistics_runner = StatisticsRunner(parent=self)
+        self.statistics_runner.finished.connect(self.on_statistics_ready)
+        self.statistics_runner.error.connect(self.error)
+        
         self.setup_ui()
         
-        # Timer para atualização automática
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_statistics)
-        self.update_timer.start(30000)  # Atualiza a cada 30 segundos
+        # Limita os recálculos automáticos a um por intervalo
+        self.refresh_pending = False
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.on_refresh_timer)
     
     def setup_ui(self):
         # Layout principal
@@ -39,12 +81,23 @@ class StatisticsWidget(QWidget):
         period_layout = QHBoxLayout()
         period_label = QLabel("Período:")
         self.period_combo = QComboBox()
-        self.period_combo.addItems(["Hoje", "Últimos 7 dias", "Últimos 30 dias", "Todos"])
+        self.period_combo.addItems(["Hoje", "Últimos 7 dias", "Últimos 30 dias", "Todos", "Personalizado"])
         self.period_combo.setCurrentIndex(3)  # "Todos" por padrão
-        self.period_combo.currentIndexChanged.connect(self.update_statistics)
+        self.period_combo.currentIndexChanged.connect(self.show_period)
+        
+        # Intervalo de datas do período personalizado
+        self.start_date_edit = QDateEdit(QDate.currentDate().addDays(-30))
+        self.end_date_edit = QDateEdit(QDate.currentDate())
+        for date_edit in (self.start_date_edit, self.end_date_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd/MM/yyyy")
+            date_edit.setVisible(False)
+            date_edit.dateChanged.connect(self.show_period)
         
         period_layout.addWidget(period_label)
         period_layout.addWidget(self.period_combo)
+        period_layout.addWidget(self.start_date_edit)
+        period_layout.addWidget(self.end_date_edit)
         period_layout.addStretch()
         
         refresh_button = QPushButton("Atualizar")
@@ -53,131 +106,273 @@ class StatisticsWidget(QWidget):
         
         main_layout.addLayout(period_layout)
         
-        # Layout para gráficos
-        charts_layout = QHBoxLayout()
+        # Layout para gráficos (criados na primeira exibição, ver setup_charts)
+        self.charts_layout = QHBoxLayout()
+        self.pie_canvas = None
+        self.bar_canvas = None
+        main_layout.addLayout(self.charts_layout)
+        
+        # Resumo de estatísticas
+        self.stats_text = QTextEdit()
+        self.stats_text.setReadOnly(True)
+        self.stats_text.setMaximumHeight(150)
+        main_layout.addWidget(self.stats_text)
+        
+        # Ranking por corrida, cavalo ou tipo de aposta
+        groups_layout = QHBoxLayout()
+        self.group_field_combo = QComboBox()
+        for field, label in self.GROUP_LABELS.items():
+            self.group_field_combo.addItem(label, field)
+        self.group_order_combo = QComboBox()
+        for order, label in self.GROUP_ORDERS:
+            self.group_order_combo.addItem(label, order)
+        self.group_field_combo.currentIndexChanged.connect(self.update_groups_table)
+        self.group_order_combo.currentIndexChanged.connect(self.update_groups_table)
+        
+        groups_layout.addWidget(QLabel("Agrupar por:"))
+        groups_layout.addWidget(self.group_field_combo)
+        groups_layout.addWidget(QLabel("Ordenar por:"))
+        groups_layout.addWidget(self.group_order_combo)
+        groups_layout.addStretch()
+        main_layout.addLayout(groups_layout)
+        
+        self.groups_table = QTableWidget(0, 5)
+        self.groups_table.setHorizontalHeaderLabels(["Corrida", "Apostas", "Sucesso", "Taxa de Sucesso", "Odds Média"])
+        self.groups_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.groups_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        main_layout.addWidget(self.groups_table)
+    
+    def setup_charts(self):
+        """
+        Cria os gráficos com seus eixos, fatias, barras e rótulos.
+        As atualizações apenas alteram esses elementos, sem recriá-los.
+        
+        O matplotlib só é importado aqui, na primeira exibição do widget,
+        para não atrasar a abertura da janela principal.
+        """
+        if self.pie_canvas is not None:
+            return
+        
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
         
         # Gráfico de pizza para status das apostas
-        self.pie_figure = plt.figure(figsize=(5, 4))
+        self.pie_figure = Figure(figsize=(5, 4))
         self.pie_canvas = FigureCanvas(self.pie_figure)
         
         # Gráfico de barras para apostas por dia
-        self.bar_figure = plt.figure(figsize=(5, 4))
+        self.bar_figure = Figure(figsize=(5, 4))
         self.bar_canvas = FigureCanvas(self.bar_figure)
         
-        charts_layout.addWidget(self.pie_canvas)
-        charts_layout.addWidget(self.bar_canvas)
+        self.charts_layout.addWidget(self.pie_canvas)
+        self.charts_layout.addWidget(self.bar_canvas)
+        
+        # Assinaturas dos dados exibidos, para evitar redesenhos desnecessários
+        self.pie_signature = None
+        self.bar_signature = None
+        self.stats_html = None
+        
+        # Gráfico de pizza
+        self.pie_ax = self.pie_figure.add_subplot(111)
+        self.pie_wedges, self.pie_labels, self.pie_pct_texts = self.pie_ax.pie(
+            [1, 1], labels=self.PIE_LABELS, colors=self.PIE_COLORS, autopct='%1.1f%%', startangle=90
+        )
+        self.pie_ax.axis('equal')
+        self.pie_ax.set_title('Status das Apostas')
+        self.pie_empty_text = self.pie_ax.text(
+            0.5, 0.5, "Sem dados disponíveis", transform=self.pie_ax.transAxes,
+            horizontalalignment='center', verticalalignment='center', visible=False
+        )
+        
+        # Gráfico de barras com o número máximo de dias exibidos
+        self.bar_ax = self.bar_figure.add_subplot(111)
+        positions = range(self.MAX_BAR_DAYS)
+        self.bars = self.bar_ax.bar(positions, [0] * self.MAX_BAR_DAYS, color='#2196F3')
+        self.bar_value_texts = [
+            self.bar_ax.text(position, 0, '', ha='center', va='bottom') for position in positions
+        ]
+        self.bar_ax.set_xticks(list(positions))
+        self.bar_ax.set_title('Apostas por Dia')
+        self.bar_ax.set_xlabel('Data')
+        self.bar_ax.set_ylabel('Número de Apostas')
+        self.bar_empty_text = self.bar_ax.text(
+            0.5, 0.5, "Sem dados disponíveis", transform=self.bar_ax.transAxes,
+            horizontalalignment='center', verticalalignment='center', visible=False
+        )
+        self.bar_figure.tight_layout()
+    
+    def update_statistics(self):
+        """Recalcula os agregados por dia a partir de todo o histórico."""
+        # Calcula em segundo plano, sobre uma cópia do histórico
+        self.requested_version = self.history_manager.version
+        self.statistics_runner.request(self.compute_statistics, self.history_manager.snapshot())
+    
+    def compute_statistics(self, history):
+        """
+        Cria os agregados por dia (reaproveitando os gravados ao lado do histórico)
+        e o motor de resultado financeiro. Executado fora da thread da interface.
+        
+        Args:
+            history (tuple): Cópia do histórico.
+            
+        Returns:
+            tuple: (DailyAggregates, PnlEngine)
+        """
+        # Importado sob demanda: o NumPy não é necessário para abrir a janela
+        from src.utils.pnl_engine import PnlEngine
         
-        main_layout.addLayout(charts_layout)
+        aggregates = DailyAggregates.load_or_build(history, self.history_manager.aggregates_file_path)
         
-        # Resumo de estatísticas
-        self.stats_text = QTextEdit()
-        self.stats_text.setReadOnly(True)
-        self.stats_text.setMaximumHeight(150)
-        main_layout.addWidget(self.stats_text)
+        # Soma os sketches de quantis de cada mês aqui, e não na primeira exibição de um período
+        aggregates.period_sketches(aggregates.days)
         
-        # Inicializa os gráficos
-        self.update_statistics()
+        return aggregates, PnlEngine.from_history(history)
     
-    def update_statistics(self):
-        """Atualiza as estatísticas e gráficos."""
-        # Obtém o período selecionado
+    def on_statistics_ready(self, result):
+        """
+        Recebe os agregados calculados em segundo plano e exibe o período selecionado.
+        
+        Args:
+            result (tuple): (DailyAggregates, PnlEngine)
+        """
+        self.aggregates, self.pnl_engine = result
+        self.aggregates_version = self.requested_version
+        self.show_period()
+    
+    def period_range(self):
+        """
+        Retorna o intervalo de datas do período selecionado.
+        
+        Returns:
+            tuple: (primeiro dia, último dia) no formato AAAA-MM-DD; None indica sem limite.
+        """
         period_index = self.period_combo.currentIndex()
-        days_filter = None
         
         if period_index == 0:  # Hoje
-            days_filter = 1
+            return self.cutoff_day(1), None
         elif period_index == 1:  # Últimos 7 dias
-            days_filter = 7
+            return self.cutoff_day(7), None
         elif period_index == 2:  # Últimos 30 dias
-            days_filter = 30
+            return self.cutoff_day(30), None
+        elif period_index == 4:  # Personalizado
+            return (self.start_date_edit.date().toString('yyyy-MM-dd'),
+                    self.end_date_edit.date().toString('yyyy-MM-dd'))
+        return None, None
+    
+    def show_period(self):
+        """Exibe as estatísticas do período selecionado, somando os agregados por dia."""
+        custom = self.period_combo.currentIndex() == 4
+        self.start_date_edit.setVisible(custom)
+        self.end_date_edit.setVisible(custom)
+        
+        if self.aggregates is None:
+            self.update_statistics()
+            return
+        
+        start_day, end_day = self.period_range()
+        self.stats = self.aggregates.window(start_day, end_day, self.MAX_BAR_DAYS)
+        self.stats['pnl'] = self.pnl_engine.report(start_day, end_day)
+        self.render_statistics()
+    
+    def refresh_statistics(self):
+        """
+        Recalcula os agregados se o histórico mudou desde o último cálculo.
+        Não faz nada com o widget oculto e executa no máximo um recálculo por intervalo.
+        """
+        if not self.isVisible():
+            return
         
-        # Obtém as estatísticas
-        stats = self.calculate_statistics(days_filter)
+        version = self.history_manager.version
+        if version == self.aggregates_version:
+            # Os períodos relativos mudam na virada do dia
+            self.show_period()
+            return
         
-        # Atualiza o texto de estatísticas
-        self.update_stats_text(stats)
+        if self.statistics_runner.is_busy() and version == self.requested_version:
+            return
+        
+        if self.refresh_timer.isActive():
+            self.refresh_pending = True
+            return
+        
+        self.update_statistics()
+        self.refresh_timer.start()
+    
+    def on_refresh_timer(self):
+        """Executa o recálculo adiado pelo limite de frequência."""
+        if self.refresh_pending:
+            self.refresh_pending = False
+            self.refresh_statistics()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.setup_charts()
+        self.refresh_statistics()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+        self.refresh_pending = False
+    
+    def render_statistics(self):
+        """Exibe as estatísticas atuais no texto e nos gráficos."""
+        self.setup_charts()
+        
+        # Atualiza o texto de estatísticas e o ranking por grupo
+        self.update_stats_text(self.stats)
+        self.update_groups_table()
         
         # Atualiza os gráficos
-        self.update_pie_chart(stats)
-        self.update_bar_chart(stats)
+        self.update_pie_chart(self.stats)
+        self.update_bar_chart(self.stats)
+    
+    def on_bet_added(self, bet_record):
+        """
+        Acrescenta uma aposta recém-adicionada aos agregados por dia,
+        sem percorrer novamente todo o histórico.
+        
+        Args:
+            bet_record (dict): Registro da aposta.
+        """
+        # Sem agregados atualizados até a aposta anterior (ou com um cálculo em
+        # andamento que não inclui esta aposta), solicita um novo cálculo completo
+        version = self.history_manager.version
+        if self.aggregates_version != version - 1 or self.statistics_runner.is_busy():
+            self.refresh_statistics()
+            return
+        
+        # Os agregados são mantidos mesmo com o widget oculto; a exibição espera.
+        # A aposta nova ainda não foi liquidada: o resultado financeiro não muda
+        self.aggregates.add(bet_record)
+        self.aggregates_version = version
+        if self.isVisible():
+            self.show_period()
     
-    def calculate_statistics(self, days_filter=None):
+    @staticmethod
+    def cutoff_day(days_filter):
+        """Retorna a data mínima (AAAA-MM-DD) do período, ou '' se não houver filtro."""
+        if not days_filter:
+            return ''
+        cutoff_date = datetime.now() - timedelta(days=days_filter)
+        return cutoff_date.strftime('%Y-%m-%d')
+    
+    def calculate_statistics(self, days_filter=None, history=None):
         """
         Calcula estatísticas avançadas com base no histórico de apostas.
         
         Args:
             days_filter (int, optional): Filtro de dias para as estatísticas.
+            history (sequence, optional): Registros a considerar (padrão: o histórico completo).
             
         Returns:
             dict: Estatísticas calculadas.
         """
         # Obtém o histórico completo
-        history = self.history_manager.get_history()
-        
-        # Inicializa as estatísticas
-        stats = {
-            'total': 0,
-            'success': 0,
-            'error': 0,
-            'success_rate': 0,
-            'daily_bets': {},
-            'avg_odds': 0,
-            'total_odds': 0,
-            'races': set(),
-            'horses': set()
-        }
-        
-        # Filtra por período se necessário
-        if days_filter:
-            from datetime import datetime, timedelta
-            cutoff_date = datetime.now() - timedelta(days=days_filter)
-            cutoff_str = cutoff_date.strftime('%Y-%m-%d')
-            
-            history = [bet for bet in history if bet['timestamp'].split(' ')[0] >= cutoff_str]
-        
-        # Calcula as estatísticas
-        for bet in history:
-            stats['total'] += 1
-            
-            # Contagem por status
-            if 'Sucesso' in bet['status']:
-                stats['success'] += 1
-            elif 'Erro' in bet['status']:
-                stats['error'] += 1
-            
-            # Odds
-            try:
-                odds = float(bet['odds'].replace(',', '.'))
-                stats['total_odds'] += odds
-            except:
-                pass
-            
-            # Contagem por dia
-            day = bet['timestamp'].split(' ')[0]
-            if day in stats['daily_bets']:
-                stats['daily_bets'][day] += 1
-            else:
-                stats['daily_bets'][day] = 1
-            
-            # Corridas e cavalos únicos
-            stats['races'].add(bet['race_name'])
-            stats['horses'].add(bet['horse'])
-        
-        # Calcula médias e taxas
-        if stats['total'] > 0:
-            stats['success_rate'] = round((stats['success'] / stats['total']) * 100, 2)
-            stats['avg_odds'] = round(stats['total_odds'] / stats['total'], 2)
-        
-        # Ordena os dias para o gráfico de barras
-        stats['sorted_days'] = sorted(stats['daily_bets'].keys())
-        stats['daily_counts'] = [stats['daily_bets'][day] for day in stats['sorted_days']]
-        
-        # Limita a 7 dias para o gráfico de barras
-        if len(stats['sorted_days']) > 7:
-            stats['sorted_days'] = stats['sorted_days'][-7:]
-            stats['daily_counts'] = stats['daily_counts'][-7:]
+        if history is None:
+            history = self.history_manager.snapshot()
         
-        return stats
+        return DailyAggregates.from_history(history).window(self.cutoff_day(days_filter) or None,
+                                                            max_days=self.MAX_BAR_DAYS)
     
     def update_stats_text(self, stats):
         """Atualiza o texto de estatísticas."""
@@ -191,63 +386,121 @@ class StatisticsWidget(QWidget):
         <p><b>Cavalos Únicos:</b> {len(stats['horses'])}</p>
         """
         
+        # Resultado financeiro das apostas liquidadas no período
+        pnl = stats.get('pnl')
+        if pnl and pnl['bets']:
+            text += f"""
+        <h3>Resultado Financeiro</h3>
+        <p><b>Apostas Liquidadas:</b> {pnl['bets']} (acerto de {pnl['strike_rate']}%)</p>
+        <p><b>Apostado:</b> {pnl['staked']:.2f} | <b>Lucro:</b> {pnl['profit']:.2f} (ROI {pnl['roi']}%)</p>
+        <p><b>Drawdown Máximo:</b> {pnl['max_drawdown']:.2f}</p>
+        """
+            for channel, report in pnl['by_channel'].items():
+                text += f"<p><b>Canal {channel or '-'}:</b> lucro {report['profit']:.2f} (ROI {report['roi']}%)</p>"
+            for bet_type, report in pnl['by_type'].items():
+                text += f"<p><b>{bet_type}:</b> lucro {report['profit']:.2f} (ROI {report['roi']}%)</p>"
+        
+        # Percentis das métricas, no total e por canal (quando houver mais de um)
+        quantiles = stats.get('quantiles')
+        if quantiles:
+            header = " / ".join(f"p{p}" for p in QUANTILE_PERCENTILES)
+            text += f"<h3>Percentis ({header})</h3>"
+            for metric, label in self.QUANTILE_LABELS.items():
+                if metric not in quantiles:
+                    continue
+                text += f"<p><b>{label}:</b> {self.format_quantiles(quantiles[metric])}</p>"
+                by_channel = stats['channel_quantiles'][metric]
+                if len(by_channel) > 1:
+                    for channel, summary in by_channel.items():
+                        text += f"<p>&nbsp;&nbsp;Canal {channel or '-'}: {self.format_quantiles(summary)}</p>"
+        
+        if text == self.stats_html:
+            return
+        self.stats_html = text
         self.stats_text.setHtml(text)
     
-    def update_pie_chart(self, stats):
-        """Atualiza o gráfico de pizza."""
-        self.pie_figure.clear()
-        
-        # Verifica se há dados
-        if stats['total'] == 0:
-            ax = self.pie_figure.add_subplot(111)
-            ax.text(0.5, 0.5, "Sem dados disponíveis", 
-                    horizontalalignment='center', verticalalignment='center')
-            ax.axis('off')
-            self.pie_canvas.draw()
+    def update_groups_table(self):
+        """Exibe as corridas, cavalos ou tipos de aposta do período na ordem selecionada."""
+        if not self.stats:
             return
         
-        # Dados para o gráfico
-        labels = ['Sucesso', 'Erro']
-        sizes = [stats['success'], stats['error']]
-        colors = ['#4CAF50', '#F44336']
-        
-        # Cria o gráfico
-        ax = self.pie_figure.add_subplot(111)
-        ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-        ax.axis('equal')
-        ax.set_title('Status das Apostas')
-        
-        self.pie_canvas.draw()
+        field = self.group_field_combo.currentData()
+        order = self.group_order_combo.currentData()
+        min_bets = self.MIN_GROUP_BETS if order == 'success_rate' else 1
+        rows = top_groups(self.stats['groups'][field], self.TOP_GROUPS, order, min_bets)
+        
+        self.groups_table.setHorizontalHeaderItem(0, QTableWidgetItem(self.GROUP_LABELS[field]))
+        self.groups_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            values = [row['name'] or '-', row['count'], row['success'], f"{row['success_rate']}%", row['avg_odds']]
+            for column, value in enumerate(values):
+                self.groups_table.setItem(i, column, QTableWidgetItem(str(value)))
     
-    def update_bar_chart(self, stats):
-        """Atualiza o gráfico de barras."""
-        self.bar_figure.clear()
+    @staticmethod
+    def format_quantiles(summary):
+        """Formata os percentis de uma métrica (ex.: '2.10 / 5.50 / 12.00 (40 valores)')."""
+        values = " / ".join(f"{summary[p]:.2f}" for p in QUANTILE_PERCENTILES)
+        return f"{values} ({summary['count']:.0f} valores)"
+    
+    def update_pie_chart(self, stats):
+        """Atualiza as fatias do gráfico de pizza, se os totais mudaram."""
+        sizes = (stats['success'], stats['error'])
+        if sizes == self.pie_signature:
+            return
+        self.pie_signature = sizes
         
         # Verifica se há dados
-        if not stats['sorted_days']:
-            ax = self.bar_figure.add_subplot(111)
-            ax.text(0.5, 0.5, "Sem dados disponíveis", 
-                    horizontalalignment='center', verticalalignment='center')
-            ax.axis('off')
-            self.bar_canvas.draw()
+        total = sum(sizes)
+        has_data = total > 0
+        self.pie_empty_text.set_visible(not has_data)
+        for artist in self.pie_wedges + self.pie_labels + self.pie_pct_texts:
+            artist.set_visible(has_data)
+        
+        if has_data:
+            # Recalcula os ângulos e a posição dos rótulos, como em Axes.pie
+            theta1 = 90
+            for wedge, label, pct_text, size in zip(self.pie_wedges, self.pie_labels, self.pie_pct_texts, sizes):
+                fraction = size / total
+                theta2 = theta1 + 360 * fraction
+                wedge.set_theta1(theta1)
+                wedge.set_theta2(theta2)
+                
+                angle = math.radians((theta1 + theta2) / 2)
+                label.set_position((1.1 * math.cos(angle), 1.1 * math.sin(angle)))
+                label.set_horizontalalignment('left' if math.cos(angle) > 0 else 'right')
+                pct_text.set_position((0.6 * math.cos(angle), 0.6 * math.sin(angle)))
+                pct_text.set_text(f"{fraction * 100:.1f}%")
+                theta1 = theta2
+        
+        self.pie_canvas.draw_idle()
+    
+    def update_bar_chart(self, stats):
+        """Atualiza as alturas e rótulos do gráfico de barras, se os dados mudaram."""
+        signature = (tuple(stats['sorted_days']), tuple(stats['daily_counts']))
+        if signature == self.bar_signature:
             return
+        self.bar_signature = signature
         
-        # Formata as datas para exibição
-        display_days = [day.split('-')[2] + '/' + day.split('-')[1] for day in stats['sorted_days']]
-        
-        # Cria o gráfico
-        ax = self.bar_figure.add_subplot(111)
-        bars = ax.bar(display_days, stats['daily_counts'], color='#2196F3')
+        days = stats['sorted_days']
+        counts = stats['daily_counts']
+        self.bar_empty_text.set_visible(not days)
         
-        # Adiciona os valores acima das barras
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                    f'{height:.0f}', ha='center', va='bottom')
+        # Formata as datas para exibição
+        display_days = [day.split('-')[2] + '/' + day.split('-')[1] for day in days]
+        display_days += [''] * (self.MAX_BAR_DAYS - len(days))
+        
+        for i, (bar, value_text) in enumerate(zip(self.bars, self.bar_value_texts)):
+            visible = i < len(counts)
+            height = counts[i] if visible else 0
+            bar.set_height(height)
+            bar.set_visible(visible)
+            
+            # Valor acima da barra
+            value_text.set_position((bar.get_x() + bar.get_width() / 2., height + 0.1))
+            value_text.set_text(f'{height:.0f}')
+            value_text.set_visible(visible)
         
-        ax.set_title('Apostas por Dia')
-        ax.set_xlabel('Data')
-        ax.set_ylabel('Número de Apostas')
+        self.bar_ax.set_xticklabels(display_days)
+        self.bar_ax.set_ylim(0, max(counts, default=0) * 1.15 + 1)
         
-        self.bar_figure.tight_layout()
-        self.bar_canvas.draw()
+        self.bar_canvas.draw_idle()
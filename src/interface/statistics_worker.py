@@ -0,0 +1,102 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class StatisticsTask(QRunnable):
+    """
+    Tarefa que calcula estatísticas fora da thread da interface,
+    a partir de uma cópia imutável do histórico.
+    """
+    def __init__(self, runner, generation, compute, snapshot):
+        """
+        Inicializa a tarefa.
+
+        Args:
+            runner (StatisticsRunner): Executor que recebe o resultado
+            generation (int): Número da solicitação
+            compute (callable): Função que recebe a cópia do histórico e retorna o resultado
+            snapshot (tuple): Cópia do histórico
+        """
+        super().__init__()
+        self.runner = runner
+        self.generation = generation
+        self.compute = compute
+        self.snapshot = snapshot
+
+    def run(self):
+        # Não calcula nada se uma solicitação mais nova já substituiu esta
+        if self.runner.is_superseded(self.generation):
+            return
+
+        try:
+            result = self.compute(self.snapshot)
+        except Exception as e:
+            self.runner.task_failed.emit(self.generation, str(e))
+            return
+
+        self.runner.task_finished.emit(self.generation, result)
+
+
+class StatisticsRunner(QObject):
+    """
+    Executa cálculos de estatísticas no QThreadPool e entrega o resultado por sinal.
+    Cada nova solicitação cancela a anterior: tarefas ainda na fila não chegam a
+    calcular e resultados de solicitações antigas são descartados.
+    """
+    # Sinais públicos, emitidos na thread da interface
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    # Sinais internos, emitidos pelas tarefas
+    task_finished = pyqtSignal(int, object)
+    task_failed = pyqtSignal(int, str)
+
+    def __init__(self, thread_pool=None, parent=None):
+        """
+        Inicializa o executor.
+
+        Args:
+            thread_pool (QThreadPool, optional): Pool de threads (padrão: o pool global)
+            parent (QObject, optional): Objeto pai
+        """
+        super().__init__(parent)
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self.generation = 0
+        self.busy = False
+        self.task_finished.connect(self.on_task_finished)
+        self.task_failed.connect(self.on_task_failed)
+
+    def request(self, compute, history):
+        """
+        Solicita um novo cálculo, substituindo o que estiver em andamento.
+
+        Args:
+            compute (callable): Função que recebe a cópia do histórico e retorna o resultado
+            history (list): Histórico atual (é copiado antes de ir para outra thread)
+
+        Returns:
+            int: Número da solicitação
+        """
+        self.generation += 1
+        self.busy = True
+        self.thread_pool.start(StatisticsTask(self, self.generation, compute, tuple(history)))
+        return self.generation
+
+    def is_superseded(self, generation):
+        """Verifica se uma solicitação já foi substituída por outra mais nova."""
+        return generation != self.generation
+
+    def is_busy(self):
+        """Verifica se há um cálculo ainda sem resultado."""
+        return self.busy
+
+    def on_task_finished(self, generation, result):
+        if self.is_superseded(generation):
+            return
+        self.busy = False
+        self.finished.emit(result)
+
+    def on_task_failed(self, generation, message):
+        if self.is_superseded(generation):
+            return
+        self.busy = False
+        self.error.emit(f"Erro ao calcular estatísticas: {message}")
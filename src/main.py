@@ -1,17 +1,28 @@
 import sys
 import os
-import asyncio
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTableWidgetItem, QMessageBox
-from PyQt5.QtCore import QThread, pyqtSignal, pyqtSlot, Qt
+from PyQt5.QtWidgets import QApplication, QMainWindow, QTableWidgetItem, QMessageBox, QFileDialog
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, pyqtSlot, Qt
 from datetime import datetime
 
 # Importa os módulos do projeto
 sys.path.append('/home/ubuntu/BotApostasAutomatizado')
 from src.interface.main_window import MainWindow
-from src.telegram.telegram_worker import TelegramWorker
+from src.interface.history_table_model import HistoryTableModel
+from src.interface.history_notifier import HistoryNotifier
+from src.interface.statistics_worker import StatisticsRunner
+from src.interface.event_pump import QtEventPump
+from src.interface.bet_worker import BetRunner
 from src.rpa.rpa_controller import RPAController
+from src.rpa.bet_executor import DUPLICATE_STATUS
+from src.rpa.bet_scheduler import BetScheduler
+from src.rpa.odds_refresher import OddsRefresher
+from src.rpa.retry_policy import RetryPolicy, CircuitBreaker
 from src.utils.config_manager import ConfigManager
 from src.utils.bet_history_manager import BetHistoryManager
+from src.utils.pending_log import PendingBetLog
+from src.utils.latency_tracer import collect_samples
+from src.utils.event_bus import (EventBus, SignalReceived, BetQueued, BetPlaced, BetFailed, NotificationSent,
+                                 format_metrics)
 
 class MainController:
     """
@@ -24,18 +35,100 @@ class MainController:
         
         # Inicializa os gerenciadores
         self.config_manager = ConfigManager()
-        self.history_manager = BetHistoryManager()
+        self.history_manager = BetHistoryManager.shared()
         
         # Inicializa a interface gráfica
         self.main_window = MainWindow()
         
+        # Liga a tabela de histórico ao modelo sobre o gerenciador de histórico
+        self.history_model = HistoryTableModel(self.history_manager)
+        self.main_window.history_table.setModel(self.history_model)
+        
+        # Notificação única de novas apostas, consumida pela tabela e pelas estatísticas
+        self.statistics = None
+        self.statistics_runner = StatisticsRunner()
+        self.statistics_runner.finished.connect(self.on_statistics_ready)
+        self.statistics_runner.error.connect(self.main_window.errors_log.append)
+        self.history_notifier = HistoryNotifier(self.history_manager)
+        self.history_notifier.bet_added.connect(self.history_model.bet_appended)
+        self.history_notifier.bet_added.connect(self.on_bet_added)
+        self.history_notifier.history_settled.connect(self.load_statistics)
+        self.history_notifier.history_cleared.connect(self.load_history_to_ui)
+        
+        # Barramento de eventos da automação: cada assinante tem uma fila limitada,
+        # entregue em lotes na thread da interface
+        self.event_bus = EventBus(error_callback=self.main_window.errors_log.append)
+        self.event_pump = QtEventPump(self.event_bus)
+        
+        # Sinais do Telegram: com a fila cheia, a thread do Telegram aguarda, sem limite de tempo,
+        # até a interface esvaziar a fila (nenhum sinal é descartado)
+        self.event_pump.subscribe(SignalReceived, lambda event: self.enqueue_bet(event.bet_data),
+                                  name='sinais', max_size=500, overflow='block', block_timeout=None)
+        # Apenas a última aposta enfileirada interessa à barra de status
+        self.event_pump.subscribe(BetQueued, self.show_queued_bet, name='barra de status', max_size=1)
+        # Notificações atrasadas perdem o sentido: com a fila cheia, as mais antigas são descartadas
+        self.event_pump.subscribe((BetPlaced, BetFailed), self.send_result_notification,
+                                  name='notificações', max_size=50, overflow='drop_oldest')
+        
         # Inicializa o controlador RPA
-        self.rpa_controller = RPAController()
+        rpa_config = self.config_manager.get_rpa_config()
+        betting_config = self.config_manager.get_betting_config()
+        self.rpa_controller = RPAController(
+            market_cache_ttl=rpa_config['market_cache_ttl'],
+            retry_policy=RetryPolicy(
+                max_attempts=rpa_config['retry_max_attempts'],
+                base_delay=rpa_config['retry_base_delay'],
+                max_delay=rpa_config['retry_max_delay']
+            ),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=rpa_config['breaker_failure_threshold'],
+                reset_timeout=rpa_config['breaker_reset_timeout']
+            ),
+            odds_max_age=rpa_config['odds_max_age'],
+            max_odds_drop=rpa_config['max_odds_drop'],
+            min_odds=rpa_config['min_odds'],
+            stake=betting_config['stake']
+        )
         
         # Conecta os sinais do RPA Controller
         self.rpa_controller.log_message.connect(self.main_window.telegram_log.append)
         self.rpa_controller.error_message.connect(self.main_window.errors_log.append)
         self.rpa_controller.bet_status_update.connect(self.update_bet_status)
+        self.rpa_controller.breaker_state_changed.connect(self.main_window.set_breaker_state)
+        
+        # Define o mecanismo de execução (navegador ou HTTP)
+        self.rpa_controller.configure_engine(
+            rpa_config['engine'],
+            exchange_url=rpa_config['exchange_url'],
+            timeout=rpa_config['http_timeout'],
+            pool_size=rpa_config['http_pool_size']
+        )
+        
+        # Atualização das odds das apostas pendentes em segundo plano (iniciada com a automação)
+        self.odds_refresher = OddsRefresher(self.rpa_controller)
+        
+        # Inicializa o escalonador de apostas pendentes
+        self.bet_scheduler = BetScheduler(
+            min_lead_time=rpa_config['min_lead_time'],
+            expired_callback=self.expire_bet
+        )
+        
+        # Timer para despachar as apostas pendentes uma a uma
+        self.dispatch_timer = QTimer()
+        self.dispatch_timer.setSingleShot(True)
+        self.dispatch_timer.timeout.connect(self.dispatch_next_bet)
+        
+        # As apostas são executadas fora da thread da interface (novas tentativas e requisições
+        # ao site não congelam a janela); o resultado é gravado na thread da interface
+        self.bet_runner = BetRunner()
+        self.bet_runner.finished.connect(self.record_bet_result)
+        self.bet_runner.error.connect(self.main_window.errors_log.append)
+        
+        # Chaves de idempotência das apostas na fila
+        self.pending_keys = set()
+        
+        # Log das apostas aceitas e ainda não executadas, retomadas ao iniciar a automação
+        self.pending_log = PendingBetLog(self.history_manager.pending_file_path)
         
         # Inicializa o worker do Telegram (mas não inicia ainda)
         self.telegram_worker = None
@@ -63,6 +156,9 @@ class MainController:
         
         # Filtros de estatísticas
         self.main_window.apply_filter_button.clicked.connect(self.apply_filters)
+        
+        # Importação dos resultados das apostas
+        self.main_window.import_settlements_button.clicked.connect(self.import_settlements)
     
     def load_config_to_ui(self):
         """Carrega as configurações do gerenciador para a interface."""
@@ -77,6 +173,7 @@ class MainController:
         betting_config = self.config_manager.get_betting_config()
         self.main_window.betting_username.setText(betting_config['username'])
         self.main_window.betting_password.setText(betting_config['password'])
+        self.main_window.betting_stake.setValue(float(betting_config['stake']))
     
     def save_config(self):
         """Salva as configurações da interface para o gerenciador."""
@@ -91,7 +188,8 @@ class MainController:
         # Configurações da Bolsa de Apostas
         self.config_manager.set_betting_config(
             username=self.main_window.betting_username.text(),
-            password=self.main_window.betting_password.text()
+            password=self.main_window.betting_password.text(),
+            stake=self.main_window.betting_stake.value()
         )
         
         # Salva as configurações
@@ -104,32 +202,78 @@ class MainController:
     
     def load_history_to_ui(self):
         """Carrega o histórico de apostas para a interface."""
-        # Obtém o histórico
-        history = self.history_manager.get_history()
-        
-        # Limpa a tabela
-        self.main_window.history_table.setRowCount(0)
-        
-        # Preenche a tabela com o histórico
-        for i, bet in enumerate(history):
-            self.main_window.history_table.insertRow(i)
-            self.main_window.history_table.setItem(i, 0, QTableWidgetItem(bet['timestamp']))
-            self.main_window.history_table.setItem(i, 1, QTableWidgetItem(bet['race_name']))
-            self.main_window.history_table.setItem(i, 2, QTableWidgetItem(bet['race_number']))
-            self.main_window.history_table.setItem(i, 3, QTableWidgetItem(bet['horse']))
-            self.main_window.history_table.setItem(i, 4, QTableWidgetItem(bet['odds']))
-            self.main_window.history_table.setItem(i, 5, QTableWidgetItem(bet['status']))
+        # Recarrega o modelo da tabela
+        self.history_model.refresh()
         
         # Carrega as estatísticas
         self.load_statistics()
     
     def load_statistics(self):
-        """Carrega as estatísticas para a interface."""
-        # Obtém as estatísticas
-        stats = self.history_manager.get_statistics()
+        """Carrega as estatísticas para a interface, calculando-as em segundo plano."""
+        self.statistics_runner.request(self.compute_statistics, self.history_manager.snapshot())
+    
+    def compute_statistics(self, history):
+        """
+        Calcula as estatísticas, as amostras de latência e o resultado financeiro
+        sobre uma cópia do histórico. Executado fora da thread da interface.
+        
+        Args:
+            history (tuple): Cópia do histórico.
+            
+        Returns:
+            tuple: (estatísticas, amostras de latência por etapa, resultado financeiro)
+        """
+        # Importado sob demanda: o NumPy não é necessário para abrir a janela
+        from src.utils.pnl_engine import PnlEngine
+        
+        pnl = PnlEngine.from_history(history).report()
+        return self.history_manager.get_statistics(history), collect_samples(history), pnl
+    
+    def on_statistics_ready(self, result):
+        """
+        Exibe as estatísticas calculadas em segundo plano.
+        
+        Args:
+            result (tuple): (estatísticas, amostras de latência por etapa, resultado financeiro)
+        """
+        self.statistics, samples, pnl = result
+        self.render_statistics()
+        self.render_pnl(pnl)
+        self.main_window.latency_panel.set_samples(samples)
+    
+    def render_pnl(self, pnl):
+        """
+        Exibe o resultado financeiro no total, por canal e por tipo de aposta.
+        
+        Args:
+            pnl (dict): Relatório de PnlEngine.report
+        """
+        rows = [("Total", pnl)]
+        rows += [(f"Canal {channel or '-'}", report) for channel, report in pnl['by_channel'].items()]
+        rows += [(f"Tipo {bet_type}", report) for bet_type, report in pnl['by_type'].items()]
+        
+        self.main_window.pnl_table.setRowCount(len(rows))
+        for i, (group, report) in enumerate(rows):
+            values = [group, report['bets'], f"{report['staked']:.2f}", f"{report['profit']:.2f}",
+                      f"{report['roi']}%", f"{report['strike_rate']}%", f"{report['max_drawdown']:.2f}"]
+            for column, value in enumerate(values):
+                self.main_window.pnl_table.setItem(i, column, QTableWidgetItem(str(value)))
+    
+    def import_settlements(self):
+        """Importa um arquivo com os resultados das apostas (CSV ou JSON)."""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self.main_window, "Importar Resultados", "", "Resultados (*.csv *.json)"
+        )
+        if not file_path:
+            return
         
-        # Limpa a tabela
-        self.main_window.stats_table.setRowCount(0)
+        # As estatísticas são recalculadas pela notificação history_settled
+        settled = self.history_manager.import_settlements(file_path)
+        self.main_window.statusBar().showMessage(f"{settled} apostas liquidadas")
+    
+    def render_statistics(self):
+        """Exibe na tabela as estatísticas atuais."""
+        stats = self.statistics
         
         # Adiciona as estatísticas na tabela
         metrics = [
@@ -139,39 +283,36 @@ class MainController:
             ("Taxa de Sucesso", f"{stats['success_rate']}%", "0%", "0%")  # Simplificado
         ]
         
+        self.main_window.stats_table.setRowCount(len(metrics))
         for i, (metric, today, week, month) in enumerate(metrics):
-            self.main_window.stats_table.insertRow(i)
             self.main_window.stats_table.setItem(i, 0, QTableWidgetItem(str(metric)))
             self.main_window.stats_table.setItem(i, 1, QTableWidgetItem(str(today)))
             self.main_window.stats_table.setItem(i, 2, QTableWidgetItem(str(week)))
             self.main_window.stats_table.setItem(i, 3, QTableWidgetItem(str(month)))
     
+    def on_bet_added(self, bet_record):
+        """
+        Atualiza as estatísticas de forma incremental quando uma aposta é adicionada ao histórico.
+        
+        Args:
+            bet_record (dict): Registro da aposta.
+        """
+        # Um cálculo em andamento não inclui esta aposta: solicita outro
+        if self.statistics is None or self.statistics_runner.is_busy():
+            self.load_statistics()
+            return
+        
+        self.history_manager.update_statistics(self.statistics, bet_record)
+        self.render_statistics()
+        self.main_window.latency_panel.add_bet(bet_record)
+    
     def apply_filters(self):
         """Aplica os filtros de busca no histórico."""
-        # Obtém os filtros
-        filter_race = self.main_window.filter_race.text()
-        filter_horse = self.main_window.filter_horse.text()
-        filter_status = self.main_window.filter_status.text()
-        
-        # Obtém o histórico filtrado
-        filtered_history = self.history_manager.get_history(
-            filter_race=filter_race,
-            filter_horse=filter_horse,
-            filter_status=filter_status
+        self.history_model.set_filter(
+            filter_race=self.main_window.filter_race.text(),
+            filter_horse=self.main_window.filter_horse.text(),
+            filter_status=self.main_window.filter_status.text()
         )
-        
-        # Limpa a tabela
-        self.main_window.history_table.setRowCount(0)
-        
-        # Preenche a tabela com o histórico filtrado
-        for i, bet in enumerate(filtered_history):
-            self.main_window.history_table.insertRow(i)
-            self.main_window.history_table.setItem(i, 0, QTableWidgetItem(bet['timestamp']))
-            self.main_window.history_table.setItem(i, 1, QTableWidgetItem(bet['race_name']))
-            self.main_window.history_table.setItem(i, 2, QTableWidgetItem(bet['race_number']))
-            self.main_window.history_table.setItem(i, 3, QTableWidgetItem(bet['horse']))
-            self.main_window.history_table.setItem(i, 4, QTableWidgetItem(bet['odds']))
-            self.main_window.history_table.setItem(i, 5, QTableWidgetItem(bet['status']))
     
     def start_automation(self):
         """Inicia a automação."""
@@ -192,17 +333,28 @@ class MainController:
             username=betting_config['username'],
             password=betting_config['password']
         )
+        self.rpa_controller.stake = betting_config['stake']
+        
+        # Pré-carrega os mercados do dia
+        self.rpa_controller.prefetch_markets()
+        
+        # Retoma as apostas aceitas e não executadas antes de uma falha
+        self.resume_pending_bets()
+        self.odds_refresher.start()
         
         # Cria e inicia o worker do Telegram
+        # (importado sob demanda: a biblioteca do Telegram é a dependência mais pesada da inicialização)
+        from src.telegram.telegram_worker import TelegramWorker
         self.telegram_worker = TelegramWorker(
             token=telegram_config['token'],
-            chat_id=telegram_config['chat_id']
+            chat_id=telegram_config['chat_id'],
+            event_bus=self.event_bus,
+            accept_callback=self.accept_signal
         )
         
-        # Conecta os sinais do worker
+        # Conecta os sinais do worker (as apostas recebidas chegam pelo barramento de eventos)
         self.telegram_worker.log_message.connect(self.main_window.telegram_log.append)
         self.telegram_worker.error_message.connect(self.main_window.errors_log.append)
-        self.telegram_worker.message_received.connect(self.process_bet)
         
         # Inicia o worker
         self.telegram_worker.start()
@@ -220,11 +372,20 @@ class MainController:
             self.telegram_worker.stop()
             self.telegram_worker = None
         
+        # Descarta as apostas pendentes
+        self.dispatch_timer.stop()
+        self.bet_scheduler.clear()
+        self.pending_keys.clear()
+        self.pending_log.clear()
+        self.odds_refresher.watch([])
+        self.odds_refresher.stop()
+        
         # Atualiza a interface
         self.main_window.start_button.setEnabled(True)
         self.main_window.stop_button.setEnabled(False)
         self.main_window.statusBar().showMessage("Automação parada")
         self.main_window.telegram_log.append("Automação parada.")
+        self.main_window.telegram_log.append(format_metrics(self.event_bus.metrics()))
     
     def show_browser(self):
         """Mostra o navegador."""
@@ -269,9 +430,9 @@ class MainController:
             QMessageBox.warning(self.main_window, "Erro", "Falha ao conectar com a Bolsa de Apostas.")
             self.main_window.statusBar().showMessage("Falha ao testar conexão com a Bolsa de Apostas")
     
-    def process_bet(self, bet_data):
+    def enqueue_bet(self, bet_data):
         """
-        Processa uma aposta recebida do Telegram.
+        Adiciona uma aposta recebida do Telegram à fila de apostas pendentes.
         
         Args:
             bet_data (dict): Dados da aposta.
@@ -280,46 +441,182 @@ class MainController:
         log_message = f"Nova aposta recebida: {bet_data['race_name']} - Corrida {bet_data['race_number']} - Cavalo: {bet_data['horse']}"
         self.main_window.telegram_log.append(log_message)
         
-        # Processa a aposta com o RPA Controller
-        success = self.rpa_controller.process_bet(bet_data)
+        # Apostas que não passaram por accept_signal são gravadas no log de apostas pendentes aqui
+        if not bet_data.get('pending_id'):
+            self.accept_signal(bet_data)
         
-        # Adiciona ao histórico
-        status = "Sucesso" if success else "Erro"
-        self.history_manager.add_bet(bet_data, status)
+        # Ignora apostas já registradas
+        if self.is_duplicate(bet_data):
+            self.pending_log.mark_done(bet_data)
+            return
         
-        # Atualiza a interface
-        self.load_history_to_ui()
+        # Agenda a aposta pelo prazo de largada
+        self.bet_scheduler.push(bet_data)
+        self.odds_refresher.watch(self.bet_scheduler.pending_bets())
+        if bet_data.get('idempotency_key'):
+            self.pending_keys.add(bet_data['idempotency_key'])
+        self.event_bus.publish(BetQueued(bet_data))
         
-        # Envia notificação se configurado
+        # O despacho é adiado para que apostas recebidas em rajada sejam ordenadas antes da execução
+        if not self.dispatch_timer.isActive():
+            self.dispatch_timer.start(0)
+    
+    def accept_signal(self, bet_data):
+        """
+        Grava uma aposta recebida no log de apostas pendentes, na thread do Telegram, antes
+        da publicação no barramento: os sinais ainda na fila 'sinais' não se perdem numa falha.
+        
+        Args:
+            bet_data (dict): Dados da aposta.
+        """
+        # O prazo é gravado junto: o horário de largada sozinho não identifica o dia
+        if bet_data.get('deadline') is None:
+            bet_data['deadline'] = self.bet_scheduler.compute_deadline(bet_data)
+        self.pending_log.append(bet_data)
+    
+    def resume_pending_bets(self):
+        """
+        Recoloca na fila as apostas do log de apostas pendentes (aceitas e não executadas
+        antes de uma falha). As apostas cuja corrida já largou são registradas como expiradas.
+        """
+        resumed, expired = self.pending_log.recover(self.history_manager.idempotency_keys)
+        for bet_data in expired:
+            self.expire_bet(bet_data)
+        
+        if not resumed:
+            return
+        
+        for bet_data in resumed:
+            self.bet_scheduler.push(bet_data)
+            if bet_data.get('idempotency_key'):
+                self.pending_keys.add(bet_data['idempotency_key'])
+        self.main_window.telegram_log.append(f"{len(resumed)} apostas pendentes retomadas do log")
+        self.odds_refresher.watch(self.bet_scheduler.pending_bets())
+        
+        if not self.dispatch_timer.isActive():
+            self.dispatch_timer.start(0)
+    
+    def is_duplicate(self, bet_data):
+        """
+        Verifica se a aposta já foi registrada no histórico ou está pendente.
+        
+        Args:
+            bet_data (dict): Dados da aposta.
+            
+        Returns:
+            bool: True se a aposta é duplicada.
+        """
+        idempotency_key = bet_data.get('idempotency_key')
+        if not idempotency_key:
+            return False
+        
+        if self.history_manager.has_idempotency_key(idempotency_key) or idempotency_key in self.pending_keys:
+            self.main_window.errors_log.append(f"Aposta duplicada ignorada: {bet_data['race_name']} - {bet_data['horse']}")
+            return True
+        
+        return False
+    
+    def dispatch_next_bet(self):
+        """Envia para a thread de apostas a aposta pendente de prazo mais próximo."""
+        # Uma aposta por vez: a próxima é despachada quando o resultado chegar
+        if self.bet_runner.is_busy():
+            return
+        
+        bet_data = self.bet_scheduler.pop_next()
+        if bet_data:
+            self.pending_keys.discard(bet_data.get('idempotency_key'))
+            self.odds_refresher.watch(self.bet_scheduler.pending_bets())
+            
+            # As odds são conferidas no cache mantido pelo OddsRefresher, sem requisições antes da aposta
+            self.bet_runner.request(self.rpa_controller.process_bet, bet_data)
+        elif len(self.bet_scheduler) > 0:
+            # Apostas vencidas descartadas: reagenda para as seguintes
+            self.dispatch_timer.start(0)
+    
+    def expire_bet(self, bet_data):
+        """
+        Registra uma aposta descartada por não poder mais ser realizada antes da largada.
+        
+        Args:
+            bet_data (dict): Dados da aposta.
+        """
+        self.pending_keys.discard(bet_data.get('idempotency_key'))
+        self.main_window.errors_log.append(f"Aposta descartada (corrida já iniciada): {bet_data['race_name']} - Corrida {bet_data['race_number']} - Cavalo: {bet_data['horse']}")
+        self.history_manager.add_bet(bet_data, "Expirada")
+        self.pending_log.mark_done(bet_data)
+        self.event_bus.publish(BetFailed(bet_data, "Expirada"))
+    
+    def record_bet_result(self, bet_data, success):
+        """
+        Grava o resultado de uma aposta executada e despacha a próxima (na thread da interface).
+        
+        Args:
+            bet_data (dict): Dados da aposta.
+            success (bool): True se a aposta foi realizada com sucesso.
+        """
+        # Repetição de uma aposta já realizada (recebida enquanto a original era executada):
+        # a original é que vai para o histórico e gera a notificação
+        if bet_data.get('status') == DUPLICATE_STATUS:
+            self.pending_log.mark_done(bet_data)
+        else:
+            # Adiciona ao histórico com o status final do executor, como 'Erro - Odds alteradas'
+            # (a interface é atualizada pela notificação bet_added)
+            status = bet_data.get('status') or ("Sucesso" if success else "Erro")
+            self.history_manager.add_bet(bet_data, status)
+            self.pending_log.mark_done(bet_data)
+            
+            # A notificação é enviada pelo assinante do evento
+            self.event_bus.publish(BetPlaced(bet_data, status) if success else BetFailed(bet_data, status))
+        
+        # Reagenda enquanto houver apostas pendentes
+        if len(self.bet_scheduler) > 0 and not self.dispatch_timer.isActive():
+            self.dispatch_timer.start(0)
+    
+    def send_result_notification(self, event):
+        """
+        Envia pelo Telegram a notificação do resultado de uma aposta, se configurada.
+        
+        Args:
+            event (BetPlaced or BetFailed): Evento do resultado da aposta.
+        """
+        success = isinstance(event, BetPlaced)
         telegram_config = self.config_manager.get_telegram_config()
         notification_id = telegram_config['notification_bet_id'] if success else telegram_config['notification_error_id']
         
         if notification_id and self.telegram_worker:
-            notification_message = f"{'✅' if success else '❌'} Aposta {status}: {bet_data['race_name']} - {bet_data['horse']}"
-            asyncio.run(self.telegram_worker.send_notification(notification_message))
+            notification_message = f"{'✅' if success else '❌'} Aposta {event.status}: {event.bet_data['race_name']} - {event.bet_data['horse']}"
+            import asyncio
+            sent = asyncio.run(self.telegram_worker.send_notification(notification_message))
+            self.event_bus.publish(NotificationSent(notification_message, sent))
+    
+    def show_queued_bet(self, event):
+        """Exibe na barra de status a última aposta enfileirada e o número de apostas pendentes."""
+        self.main_window.statusBar().showMessage(
+            f"Aposta na fila: {event.bet_data['race_name']} - {event.bet_data['horse']} ({len(self.bet_scheduler)} pendentes)"
+        )
     
     def update_bet_status(self, bet_status):
         """
         Atualiza o status de uma aposta na interface.
+        A linha da tabela é inserida quando a aposta é gravada no histórico.
         
         Args:
             bet_status (dict): Status da aposta.
         """
-        # Adiciona uma nova linha na tabela de histórico
-        row = self.main_window.history_table.rowCount()
-        self.main_window.history_table.insertRow(row)
-        
-        self.main_window.history_table.setItem(row, 0, QTableWidgetItem(bet_status['timestamp']))
-        self.main_window.history_table.setItem(row, 1, QTableWidgetItem(bet_status['race_name']))
-        self.main_window.history_table.setItem(row, 2, QTableWidgetItem(bet_status['race_number']))
-        self.main_window.history_table.setItem(row, 3, QTableWidgetItem(bet_status['horse']))
-        self.main_window.history_table.setItem(row, 4, QTableWidgetItem(bet_status['odds']))
-        self.main_window.history_table.setItem(row, 5, QTableWidgetItem(bet_status['status']))
+        self.main_window.statusBar().showMessage(
+            f"Última aposta: {bet_status['race_name']} - {bet_status['horse']} ({bet_status['status']})"
+        )
     
     def run(self):
         """Executa a aplicação."""
         self.main_window.show()
-        return self.app.exec_()
+        exit_code = self.app.exec_()
+        
+        # Aguarda a aposta em execução e grava seu resultado antes de sair
+        self.odds_refresher.stop()
+        self.bet_runner.wait()
+        self.app.processEvents()
+        return exit_code
 
 
 if __name__ == "__main__":
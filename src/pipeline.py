@@ -0,0 +1,473 @@
+import sys
+import time
+import queue
+import signal
+import asyncio
+import logging
+import argparse
+import multiprocessing
+
+# Adiciona o diretório raiz ao path para importação dos módulos
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+
+# Importa os módulos do projeto (sem Qt: a interface só é importada com --ui, no processo principal)
+from src.rpa.bet_executor import BetExecutor, DUPLICATE_STATUS
+from src.rpa.bet_scheduler import BetScheduler
+from src.rpa.odds_refresher import OddsRefresher
+from src.utils.config_manager import ConfigManager
+from src.utils.bet_history_manager import BetHistoryManager
+from src.utils.idempotency import selection_hash
+from src.utils.latency_tracer import STAGES, mark_stage
+
+# Campos dos sinais trafegados entre os processos, na ordem da tupla (ver encode_signal)
+SIGNAL_FIELDS = ('race_name', 'race_number', 'horse', 'odds', 'bet_type', 'stake', 'channel', 'off_time',
+                 'message_id', 'idempotency_key', 'deadline')
+
+# Tipos das mensagens enviadas ao processo de monitoramento
+MSG_RESULT, MSG_LOG, MSG_ERROR, MSG_STOPPED = range(4)
+
+# Marca de fim da fila de sinais de um processo de execução
+STOP = None
+
+
+def encode_signal(bet_data):
+    """
+    Codifica os dados de uma aposta em uma tupla compacta para as filas entre processos.
+
+    Os valores seguem a ordem de SIGNAL_FIELDS (None para os ausentes), seguidos do rastro
+    de latência na ordem de STAGES. Sem os nomes dos campos, a mensagem serializada tem
+    cerca de metade do tamanho do dicionário. Os instantes do rastro vêm do relógio
+    monotônico, que é o mesmo em todos os processos da máquina.
+
+    Args:
+        bet_data (dict): Dados da aposta
+
+    Returns:
+        tuple: (valores dos campos, instantes do rastro)
+    """
+    trace = bet_data.get('trace') or {}
+    return (tuple(bet_data.get(field) for field in SIGNAL_FIELDS),
+            tuple(trace.get(stage) for stage in STAGES))
+
+
+def decode_signal(message):
+    """
+    Recria os dados de uma aposta a partir de encode_signal.
+
+    Args:
+        message (tuple): Tupla retornada por encode_signal
+
+    Returns:
+        dict: Dados da aposta (apenas os campos presentes)
+    """
+    values, trace = message
+    bet_data = {field: value for field, value in zip(SIGNAL_FIELDS, values) if value is not None}
+    trace = {stage: value for stage, value in zip(STAGES, trace) if value is not None}
+    if trace:
+        bet_data['trace'] = trace
+    return bet_data
+
+
+def route_signal(bet_data, workers):
+    """
+    Escolhe o processo de execução de uma aposta.
+    A mesma seleção vai sempre para o mesmo processo, que já tem o mercado em cache.
+
+    Returns:
+        int: Índice do processo de execução
+    """
+    return int(selection_hash(bet_data), 16) % workers
+
+
+class SignalRouter:
+    """
+    Distribui os sinais recebidos pelo processo de ingestão entre os processos de execução,
+    ignorando as apostas já registradas no histórico ou já enviadas.
+    """
+    def __init__(self, signal_queues, monitor_queue, known_keys=()):
+        self.signal_queues = signal_queues
+        self.monitor_queue = monitor_queue
+        self.sent_keys = set(known_keys)
+        self.routed = 0
+
+    def __call__(self, bet_data):
+        idempotency_key = bet_data.get('idempotency_key')
+        if idempotency_key:
+            if idempotency_key in self.sent_keys:
+                self.monitor_queue.put((MSG_ERROR, 'ingestão', f"Aposta duplicada ignorada: {bet_data['race_name']} - {bet_data['horse']}"))
+                return
+            self.sent_keys.add(idempotency_key)
+
+        self.signal_queues[route_signal(bet_data, len(self.signal_queues))].put(encode_signal(bet_data))
+        self.routed += 1
+
+    def close(self):
+        """Envia a marca de fim a todos os processos de execução."""
+        for signal_queue in self.signal_queues:
+            signal_queue.put(STOP)
+
+
+def ignore_interrupts():
+    """Nos processos filhos, o encerramento é coordenado pelo processo principal."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def ingest_process(config_path, history_path, signal_queues, monitor_queue, stop_event, replay=None,
+                   replay_interval=0.0):
+    """
+    Processo de ingestão: recebe os sinais do Telegram (ou de mensagens gravadas) e os
+    distribui entre os processos de execução.
+
+    Args:
+        config_path (str): Arquivo de configurações
+        history_path (str): Arquivo de histórico (apenas lido, para ignorar apostas já registradas)
+        signal_queues (list): Fila de sinais de cada processo de execução
+        monitor_queue (Queue): Fila do processo de monitoramento
+        stop_event (Event): Sinaliza o encerramento
+        replay (str, optional): Mensagens gravadas enviadas no lugar do Telegram (ver backtester.load_messages)
+        replay_interval (float): Intervalo, em segundos, entre as mensagens gravadas
+    """
+    ignore_interrupts()
+    known_keys = BetHistoryManager(history_path).idempotency_keys
+    router = SignalRouter(signal_queues, monitor_queue, known_keys)
+
+    try:
+        if replay:
+            replay_messages(replay, router, stop_event, replay_interval)
+        else:
+            asyncio.run(run_telegram(ConfigManager(config_path), router, monitor_queue, stop_event))
+    except Exception as e:
+        monitor_queue.put((MSG_ERROR, 'ingestão', f"Erro na ingestão de sinais: {str(e)}"))
+    finally:
+        monitor_queue.put((MSG_LOG, 'ingestão', f"Ingestão encerrada: {router.routed} sinais distribuídos"))
+        router.close()
+
+
+def replay_messages(file_path, router, stop_event, interval=0.0):
+    """Envia ao roteador os sinais de mensagens gravadas, como se chegassem do Telegram."""
+    # Importados sob demanda: apenas o modo de reprodução os utiliza
+    from src.backtester import load_messages
+    from src.telegram.telegram_bot import TelegramBot
+    from src.utils.idempotency import make_idempotency_key
+
+    parser = TelegramBot(token='', chat_id='')
+    for message in load_messages(file_path):
+        if stop_event.is_set():
+            break
+
+        bet_data = parser.parse_bet_message(message['text'])
+        if not bet_data:
+            continue
+        mark_stage(bet_data, 'parsed')
+        bet_data['message_id'] = message['id']
+        bet_data['channel'] = message['channel']
+        bet_data['idempotency_key'] = make_idempotency_key(message['id'], bet_data, message['channel'])
+        router(bet_data)
+
+        if interval:
+            time.sleep(interval)
+
+
+async def run_telegram(config_manager, router, monitor_queue, stop_event):
+    """Executa o bot do Telegram até o encerramento do pipeline."""
+    from src.telegram.telegram_bot import TelegramBot
+
+    telegram_config = config_manager.get_telegram_config()
+    bot = TelegramBot(
+        token=telegram_config['token'],
+        chat_id=telegram_config['chat_id'],
+        message_callback=router,
+        error_callback=lambda message: monitor_queue.put((MSG_ERROR, 'ingestão', message))
+    )
+    if not await bot.start():
+        monitor_queue.put((MSG_ERROR, 'ingestão', "Falha ao iniciar o bot do Telegram."))
+        return
+    monitor_queue.put((MSG_LOG, 'ingestão', "Bot do Telegram iniciado. Monitorando mensagens..."))
+
+    while not stop_event.is_set():
+        await asyncio.sleep(0.2)
+    await bot.stop()
+
+
+def execution_process(worker_id, config_path, signal_queue, monitor_queue):
+    """
+    Processo de execução: realiza, por ordem de prazo, as apostas recebidas na sua fila.
+
+    As apostas já recebidas são executadas mesmo após a marca de fim (STOP), exceto as
+    que perderem o prazo, registradas como expiradas.
+
+    Args:
+        worker_id (int): Número do processo de execução
+        config_path (str): Arquivo de configurações
+        signal_queue (Queue): Fila de sinais deste processo
+        monitor_queue (Queue): Fila do processo de monitoramento
+    """
+    ignore_interrupts()
+    name = f"execução {worker_id}"
+    config_manager = ConfigManager(config_path)
+
+    try:
+        executor = BetExecutor.from_config(
+            config_manager,
+            log_callback=lambda message: monitor_queue.put((MSG_LOG, name, message)),
+            error_callback=lambda message: monitor_queue.put((MSG_ERROR, name, message))
+        )
+        bet_scheduler = BetScheduler(
+            min_lead_time=config_manager.get_rpa_config()['min_lead_time'],
+            expired_callback=lambda bet_data: monitor_queue.put((MSG_RESULT, name, encode_signal(bet_data), "Expirada"))
+        )
+        executor.prefetch_markets()
+
+        # Odds das apostas pendentes atualizadas em segundo plano, fora da execução das apostas
+        odds_refresher = OddsRefresher(executor)
+        odds_refresher.start()
+
+        stopping = False
+        while not stopping or len(bet_scheduler) > 0:
+            # Aguarda sinais apenas sem apostas pendentes; os que já chegaram entram todos na fila de prazos
+            block = not stopping and len(bet_scheduler) == 0
+            while not stopping:
+                try:
+                    message = signal_queue.get(block=block)
+                except queue.Empty:
+                    break
+                block = False
+                if message is STOP:
+                    stopping = True
+                else:
+                    bet_scheduler.push(decode_signal(message))
+
+            bet_data = bet_scheduler.pop_next()
+            odds_refresher.watch(bet_scheduler.pending_bets())
+            if not bet_data:
+                continue
+
+            success = executor.process_bet(bet_data)
+            # O status final do executor (como 'Erro - Odds alteradas') é gravado no histórico
+            status = bet_data.get('status') or ("Sucesso" if success else "Erro")
+            monitor_queue.put((MSG_RESULT, name, encode_signal(bet_data), status))
+
+        odds_refresher.stop()
+        executor.logout()
+        if executor.http_client:
+            executor.http_client.close()
+    except Exception as e:
+        monitor_queue.put((MSG_ERROR, name, f"Erro no processo de execução: {str(e)}"))
+    finally:
+        monitor_queue.put((MSG_STOPPED, name))
+
+
+class Pipeline:
+    """
+    Execução do bot em vários processos: um processo de ingestão (Telegram), N processos
+    de execução das apostas e o processo principal, que grava o histórico e exibe o
+    monitoramento (log ou interface gráfica).
+
+    Os processos são ligados por filas do multiprocessing com mensagens compactas
+    (ver encode_signal). A execução das apostas não disputa o GIL com a interface, com
+    a gravação do histórico nem com o recebimento das mensagens.
+    """
+    def __init__(self, config_path=None, history_path=None, workers=2, replay=None, replay_interval=0.0):
+        """
+        Inicializa o pipeline.
+
+        Args:
+            config_path (str, optional): Arquivo de configurações
+            history_path (str, optional): Arquivo de histórico
+            workers (int): Número de processos de execução
+            replay (str, optional): Mensagens gravadas enviadas no lugar do Telegram
+            replay_interval (float): Intervalo, em segundos, entre as mensagens gravadas
+        """
+        self.config_path = config_path
+        self.history_manager = BetHistoryManager.shared(history_path)
+        self.workers = workers
+        self.replay = replay
+        self.replay_interval = replay_interval
+
+        # 'spawn': os filhos não herdam threads nem o estado do Qt do processo principal
+        self.context = multiprocessing.get_context('spawn')
+        self.monitor_queue = self.context.Queue()
+        self.signal_queues = [self.context.Queue() for _ in range(workers)]
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.running_workers = 0
+        self.results = 0
+
+        self.log_callback = print
+        self.error_callback = print
+
+    def start(self):
+        """Inicia os processos de ingestão e de execução."""
+        self.processes = [
+            self.context.Process(target=execution_process, name=f"execucao-{worker_id}",
+                                 args=(worker_id, self.config_path, signal_queue, self.monitor_queue))
+            for worker_id, signal_queue in enumerate(self.signal_queues)
+        ]
+        self.processes.append(self.context.Process(
+            target=ingest_process, name='ingestao',
+            args=(self.config_path, self.history_manager.history_file_path, self.signal_queues,
+                  self.monitor_queue, self.stop_event, self.replay, self.replay_interval)
+        ))
+        for process in self.processes:
+            process.start()
+        self.running_workers = self.workers
+
+    def stop(self):
+        """Solicita o encerramento: a ingestão para e os processos de execução terminam as apostas pendentes."""
+        self.stop_event.set()
+
+    def is_running(self):
+        return self.running_workers > 0
+
+    def handle(self, message):
+        """
+        Trata uma mensagem dos processos filhos.
+
+        Args:
+            message (tuple): Mensagem da fila de monitoramento
+        """
+        kind, source = message[0], message[1]
+
+        if kind == MSG_RESULT:
+            bet_data = decode_signal(message[2])
+            status = message[3]
+            self.results += 1
+            # Repetição de uma aposta já realizada: apenas a original é gravada
+            if status == DUPLICATE_STATUS:
+                self.log_callback(f"[{source}] Aposta duplicada ignorada: {bet_data['race_name']} - {bet_data['horse']}")
+                return
+            self.history_manager.add_bet(bet_data, status)
+            log = self.log_callback if status == "Sucesso" else self.error_callback
+            log(f"[{source}] Aposta {status}: {bet_data['race_name']} - {bet_data['horse']}")
+        elif kind == MSG_LOG:
+            self.log_callback(f"[{source}] {message[2]}")
+        elif kind == MSG_ERROR:
+            self.error_callback(f"[{source}] {message[2]}")
+        elif kind == MSG_STOPPED:
+            self.running_workers -= 1
+            self.log_callback(f"[{source}] Processo encerrado")
+
+    def poll(self, timeout=0.0):
+        """
+        Trata as mensagens disponíveis na fila de monitoramento.
+
+        Args:
+            timeout (float): Espera máxima pela primeira mensagem, em segundos
+
+        Returns:
+            int: Número de mensagens tratadas
+        """
+        handled = 0
+        try:
+            message = self.monitor_queue.get(timeout=timeout) if timeout else self.monitor_queue.get_nowait()
+            while True:
+                self.handle(message)
+                handled += 1
+                message = self.monitor_queue.get_nowait()
+        except queue.Empty:
+            pass
+        return handled
+
+    def join(self):
+        """Aguarda o fim dos processos filhos."""
+        for process in self.processes:
+            process.join()
+
+    def run_monitor(self):
+        """
+        Monitoramento sem interface gráfica: grava o histórico e registra no log até
+        todos os processos de execução terminarem.
+
+        Returns:
+            int: Código de saída
+        """
+        while self.is_running() and any(process.is_alive() for process in self.processes):
+            self.poll(timeout=0.5)
+        self.poll()
+        self.join()
+        return 0
+
+    def run_ui(self):
+        """
+        Monitoramento pela interface gráfica: a tabela de histórico, o log e as
+        estatísticas são atualizados no processo principal, sem atrasar as apostas.
+
+        Returns:
+            int: Código de saída
+        """
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtCore import QTimer
+        from src.interface.main_window import MainWindow
+        from src.interface.history_table_model import HistoryTableModel
+        from src.interface.history_notifier import HistoryNotifier
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        main_window = MainWindow()
+        history_model = HistoryTableModel(self.history_manager)
+        main_window.history_table.setModel(history_model)
+        history_notifier = HistoryNotifier(self.history_manager)
+        history_notifier.bet_added.connect(history_model.bet_appended)
+        history_notifier.bet_added.connect(main_window.latency_panel.add_bet)
+
+        self.log_callback = main_window.telegram_log.append
+        self.error_callback = main_window.errors_log.append
+
+        # A automação é controlada pelo pipeline
+        main_window.start_button.setEnabled(False)
+        main_window.stop_button.setEnabled(True)
+        main_window.stop_button.clicked.connect(self.stop)
+        main_window.statusBar().showMessage(f"Pipeline em execução: {self.workers} processos de execução")
+
+        # O timer continua ativo após o encerramento: é ele que permite ao Python tratar os sinais
+        def poll():
+            self.poll()
+            if not self.is_running() and main_window.stop_button.isEnabled():
+                main_window.stop_button.setEnabled(False)
+                main_window.statusBar().showMessage("Pipeline encerrado")
+
+        timer = QTimer()
+        timer.timeout.connect(poll)
+        timer.start(50)
+        app.aboutToQuit.connect(self.stop)
+
+        # SIGINT/SIGTERM fecham a interface (e, com ela, o pipeline)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: app.quit())
+
+        main_window.show()
+        code = app.exec_()
+
+        # Grava os resultados das apostas pendentes antes de sair
+        self.run_monitor()
+        return code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot de Apostas Automatizado em vários processos")
+    parser.add_argument('--config', help="Arquivo de configurações (padrão: config.json do projeto)")
+    parser.add_argument('--history', help="Arquivo de histórico (padrão: bet_history.json do projeto)")
+    parser.add_argument('--workers', type=int, default=2, help="Número de processos de execução")
+    parser.add_argument('--replay', help="Mensagens gravadas enviadas no lugar do Telegram (JSON, JSONL ou exportação)")
+    parser.add_argument('--replay-interval', type=float, default=0.0, help="Intervalo entre as mensagens gravadas, em segundos")
+    parser.add_argument('--ui', action='store_true', help="Exibe a interface gráfica no processo principal")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=getattr(logging, args.log_level)
+    )
+    logger = logging.getLogger('BotApostas.pipeline')
+
+    pipeline = Pipeline(args.config, args.history, args.workers, args.replay, args.replay_interval)
+    pipeline.log_callback = logger.info
+    pipeline.error_callback = logger.error
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: pipeline.stop())
+
+    pipeline.start()
+    return pipeline.run_ui() if args.ui else pipeline.run_monitor()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
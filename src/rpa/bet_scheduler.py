@@ -0,0 +1,114 @@
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+
+# Um horário de largada que já passou há mais que este intervalo (em segundos) é do dia
+# seguinte (ex.: corrida às 00:15 anunciada às 23:50)
+OFF_TIME_ROLLOVER = 6 * 3600
+
+
+def parse_off_time(off_time, now=None):
+    """
+    Converte o horário de largada da corrida (HH:MM) em timestamp.
+
+    Args:
+        off_time (str): Horário de largada no formato HH:MM (ou HHhMM)
+        now (datetime, optional): Data de referência (padrão: agora)
+
+    Returns:
+        float: Timestamp da largada no dia de referência (ou no dia seguinte, se o horário
+            já passou há mais de OFF_TIME_ROLLOVER) ou None se o formato for inválido
+    """
+    if not off_time:
+        return None
+
+    try:
+        hour, minute = str(off_time).strip().lower().replace('h', ':').split(':')[:2]
+        now = now or datetime.now()
+        off = now.replace(hour=int(hour), minute=int(minute or 0), second=0, microsecond=0)
+        if (now - off).total_seconds() > OFF_TIME_ROLLOVER:
+            off += timedelta(days=1)
+        return off.timestamp()
+    except (ValueError, TypeError):
+        return None
+
+
+class BetScheduler:
+    """
+    Fila de prioridade das apostas pendentes.
+    As apostas são executadas por ordem de prazo (earliest-deadline-first), onde o prazo
+    é o horário de largada menos a antecedência mínima para realizar a aposta.
+    Apostas sem horário de largada são executadas depois, por ordem de chegada.
+    """
+    def __init__(self, min_lead_time=5, expired_callback=None, clock=time.time):
+        """
+        Inicializa o escalonador.
+
+        Args:
+            min_lead_time (float): Antecedência mínima, em segundos, antes da largada
+            expired_callback (callable): Função chamada com as apostas descartadas por prazo
+            clock (callable): Relógio usado para comparar os prazos
+        """
+        self.min_lead_time = min_lead_time
+        self.expired_callback = expired_callback
+        self.clock = clock
+        self.queue = []
+        self.counter = itertools.count()
+
+    def compute_deadline(self, bet_data):
+        """
+        Calcula o prazo limite para realizar a aposta.
+
+        Returns:
+            float: Timestamp do prazo ou None se a aposta não tiver horário de largada
+        """
+        off_timestamp = parse_off_time(bet_data.get('off_time'), datetime.fromtimestamp(self.clock()))
+        if off_timestamp is None:
+            return None
+        return off_timestamp - self.min_lead_time
+
+    def push(self, bet_data):
+        """
+        Adiciona uma aposta à fila.
+        O prazo calculado é gravado em bet_data['deadline'].
+
+        Returns:
+            float: Prazo da aposta ou None se não houver
+        """
+        deadline = bet_data.get('deadline')
+        if deadline is None:
+            deadline = self.compute_deadline(bet_data)
+            bet_data['deadline'] = deadline
+
+        priority = deadline if deadline is not None else float('inf')
+        heapq.heappush(self.queue, (priority, next(self.counter), bet_data))
+        return deadline
+
+    def pop_next(self):
+        """
+        Retira a próxima aposta ainda executável dentro do prazo.
+        As apostas cujo prazo já passou são descartadas e repassadas ao expired_callback.
+
+        Returns:
+            dict: Dados da aposta ou None se a fila estiver vazia
+        """
+        while self.queue:
+            deadline, _, bet_data = heapq.heappop(self.queue)
+            if deadline <= self.clock():
+                if self.expired_callback:
+                    self.expired_callback(bet_data)
+                continue
+            return bet_data
+        return None
+
+    def pending_bets(self):
+        """Retorna as apostas pendentes (sem ordem definida)."""
+        return [bet_data for _, _, bet_data in self.queue]
+
+    def clear(self):
+        """Remove todas as apostas pendentes."""
+        self.queue = []
+
+    def __len__(self):
+        return len(self.queue)
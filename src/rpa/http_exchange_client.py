@@ -0,0 +1,140 @@
+import sys
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.rpa.retry_policy import TransientRPAError
+
+
+class ExchangeError(Exception):
+    """Erro retornado pela Bolsa de Apostas que não deve ser repetido (ex.: odds alteradas)."""
+
+
+class HttpExchangeClient:
+    """
+    Cliente HTTP da Bolsa de Apostas.
+    Realiza as operações por requisições diretas à API do site, sem navegador,
+    reaproveitando as conexões (keep-alive) de uma sessão com pool.
+    """
+    def __init__(self, base_url, timeout=5, pool_size=4):
+        """
+        Inicializa o cliente.
+
+        Args:
+            base_url (str): URL base da API (ex.: http://127.0.0.1:8765)
+            timeout (float): Tempo limite de cada requisição em segundos
+            pool_size (int): Número máximo de conexões mantidas abertas
+        """
+        if requests is None:
+            raise ImportError("O pacote 'requests' é necessário para o modo HTTP.")
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, **kwargs):
+        """
+        Executa uma requisição à API.
+
+        Returns:
+            Corpo da resposta decodificado de JSON
+
+        Raises:
+            TransientRPAError: Em falhas de conexão, timeout, erro 5xx ou 429
+            ExchangeError: Em erros 4xx retornados pela API
+        """
+        headers = kwargs.pop('headers', {})
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+
+        try:
+            response = self.session.request(method, self.base_url + path, headers=headers,
+                                            timeout=self.timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientRPAError(f"Falha de conexão: {str(e)}")
+
+        if response.status_code >= 500 or response.status_code == 429:
+            raise TransientRPAError(f"Site indisponível (HTTP {response.status_code})")
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+
+        if response.status_code >= 400:
+            if response.status_code == 401:
+                self.token = None
+            raise ExchangeError(body.get('error') or f"HTTP {response.status_code}")
+
+        return body
+
+    def ping(self):
+        """Verifica se a API está acessível."""
+        self.request('GET', '/api/ping')
+        return True
+
+    def login(self, username, password):
+        """Faz login e guarda o token da sessão."""
+        body = self.request('POST', '/api/login', json={'username': username, 'password': password})
+        self.token = body['token']
+        return True
+
+    def logout(self):
+        """Encerra a sessão na API."""
+        if self.token:
+            self.request('POST', '/api/logout')
+            self.token = None
+        return True
+
+    def fetch_race_card(self):
+        """
+        Obtém a programação de corridas do dia.
+
+        Returns:
+            list: Corridas no formato aceito por MarketCache.load_race_card
+        """
+        return self.request('GET', '/api/markets')['markets']
+
+    def fetch_odds(self, market_id):
+        """
+        Obtém as odds atuais das seleções de um mercado.
+
+        Returns:
+            dict: ID da seleção -> odds
+        """
+        return self.request('GET', f'/api/markets/{market_id}/odds')['odds']
+
+    def place_bet(self, market, bet_data):
+        """
+        Realiza uma aposta.
+
+        Args:
+            market (dict): Entrada do cache de mercados com 'market_id' e 'selection_id'
+            bet_data (dict): Dados da aposta
+
+        Returns:
+            dict: Confirmação da aposta retornada pela API
+        """
+        payload = {
+            'market_id': market['market_id'],
+            'selection_id': market['selection_id'],
+            'odds': bet_data['odds'],
+            'stake': bet_data.get('stake'),
+            'bet_type': bet_data['bet_type'],
+            'idempotency_key': bet_data.get('idempotency_key')
+        }
+        return self.request('POST', '/api/bets', json=payload)
+
+    def close(self):
+        """Fecha as conexões da sessão."""
+        self.session.close()
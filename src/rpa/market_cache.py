@@ -0,0 +1,123 @@
+import re
+import time
+import unicodedata
+
+
+def normalize_name(name):
+    """
+    Normaliza um nome de corrida ou cavalo para uso como chave de cache.
+    Remove acentos, pontuação e espaços repetidos, e converte para minúsculas.
+
+    Args:
+        name (str): Nome a ser normalizado
+
+    Returns:
+        str: Nome normalizado
+    """
+    text = unicodedata.normalize('NFKD', str(name or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    return ' '.join(text.split())
+
+
+class MarketCache:
+    """
+    Cache do catálogo de mercados da Bolsa de Apostas.
+    Mapeia (corrida, número da corrida, cavalo) para o ID da seleção e o
+    localizador da página, evitando a navegação de busca a cada aposta.
+    """
+    def __init__(self, ttl=900, clock=time.monotonic):
+        """
+        Inicializa o cache de mercados.
+
+        Args:
+            ttl (float): Tempo de validade das entradas em segundos
+            clock (callable): Relógio monotônico usado para expirar as entradas
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = {}
+
+    @staticmethod
+    def make_key(race_name, race_number, horse):
+        """Monta a chave normalizada de uma seleção."""
+        return (normalize_name(race_name), str(race_number).strip(), normalize_name(horse))
+
+    def store(self, race_name, race_number, horse, selection_id=None, market_id=None, locator=None):
+        """
+        Armazena uma seleção no cache.
+
+        Returns:
+            dict: Entrada armazenada
+        """
+        entry = {
+            'market_id': market_id,
+            'selection_id': selection_id,
+            'locator': locator,
+            'expires_at': self.clock() + self.ttl
+        }
+        self.entries[self.make_key(race_name, race_number, horse)] = entry
+        return entry
+
+    def load_race_card(self, race_card):
+        """
+        Carrega no cache a programação de corridas do dia.
+
+        Args:
+            race_card (list): Lista de corridas, cada uma com 'race_name', 'race_number',
+                'market_id', 'locator' e 'runners' (lista com 'horse', 'selection_id' e 'locator')
+
+        Returns:
+            int: Número de seleções carregadas
+        """
+        count = 0
+        for race in race_card:
+            for runner in race.get('runners', []):
+                self.store(
+                    race['race_name'],
+                    race['race_number'],
+                    runner['horse'],
+                    selection_id=runner.get('selection_id'),
+                    market_id=race.get('market_id'),
+                    locator=runner.get('locator') or race.get('locator')
+                )
+                count += 1
+        return count
+
+    def lookup(self, race_name, race_number, horse):
+        """
+        Busca uma seleção no cache.
+
+        Returns:
+            dict: Entrada encontrada ou None se não existir ou estiver expirada
+        """
+        key = self.make_key(race_name, race_number, horse)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        if entry['expires_at'] <= self.clock():
+            del self.entries[key]
+            return None
+
+        return entry
+
+    def purge_expired(self):
+        """
+        Remove as entradas expiradas.
+
+        Returns:
+            int: Número de entradas removidas
+        """
+        now = self.clock()
+        expired = [key for key, entry in self.entries.items() if entry['expires_at'] <= now]
+        for key in expired:
+            del self.entries[key]
+        return len(expired)
+
+    def invalidate(self):
+        """Remove todas as entradas do cache."""
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,340 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import itertools
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class MockExchange:
+    """
+    Simulação local da Bolsa de Apostas para testes e benchmarks.
+    Mantém a programação de corridas, as odds (com deriva aleatória), as sessões e as apostas,
+    e injeta latência e erros transitórios conforme configurado.
+    """
+    COURSES = ['Chelmsford City', 'Ascot', 'Newmarket', 'Doncaster', 'Kempton', 'Lingfield']
+
+    def __init__(self, markets=None, latency=0.0, latency_jitter=0.0, error_rate=0.0,
+                 odds_drift=0.0, odds_tolerance=0.0, seed=None):
+        """
+        Inicializa a simulação.
+
+        Args:
+            markets (list, optional): Programação no formato de /api/markets (padrão: gerada)
+            latency (float): Latência média de cada resposta em segundos
+            latency_jitter (float): Variação máxima da latência em segundos
+            error_rate (float): Probabilidade (0 a 1) de responder HTTP 503
+            odds_drift (float): Variação relativa máxima das odds a cada aposta recebida
+            odds_tolerance (float): Queda relativa das odds aceita antes de rejeitar a aposta
+            seed (int, optional): Semente do gerador aleatório
+        """
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.odds_drift = odds_drift
+        self.odds_tolerance = odds_tolerance
+        self.lock = threading.Lock()
+        self.token_counter = itertools.count(1)
+        self.tokens = set()
+        self.bets = []
+        self.bets_by_key = {}
+        self.markets = markets if markets is not None else self.generate_markets()
+
+        # Odds atuais por seleção
+        self.odds = {}
+        for market in self.markets:
+            for runner in market['runners']:
+                self.odds[runner['selection_id']] = float(runner.get('odds', 2.0))
+
+    def generate_markets(self, races_per_course=6, runners_per_race=8):
+        """Gera uma programação de corridas fictícia."""
+        markets = []
+        selection_ids = itertools.count(1001)
+        for course_index, course in enumerate(self.COURSES):
+            for race_number in range(1, races_per_course + 1):
+                market_id = f"1.{course_index + 1}{race_number:02d}"
+                markets.append({
+                    'race_name': course,
+                    'race_number': str(race_number),
+                    'market_id': market_id,
+                    'locator': f"/corridas/{market_id}",
+                    'runners': [
+                        {
+                            'horse': f"{course} Runner {race_number}-{runner}",
+                            'selection_id': next(selection_ids),
+                            'odds': round(self.random.uniform(1.5, 15.0), 2)
+                        }
+                        for runner in range(1, runners_per_race + 1)
+                    ]
+                })
+        return markets
+
+    def simulate_conditions(self):
+        """
+        Aplica a latência e sorteia um erro transitório.
+
+        Returns:
+            bool: True se a requisição deve falhar com HTTP 503
+        """
+        delay = self.latency + self.random.uniform(-self.latency_jitter, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+        return self.random.random() < self.error_rate
+
+    def login(self, username, password):
+        """Cria uma sessão e retorna o token, ou None se as credenciais forem inválidas."""
+        if not username or not password:
+            return None
+        token = f"token-{next(self.token_counter)}"
+        with self.lock:
+            self.tokens.add(token)
+        return token
+
+    def logout(self, token):
+        """Encerra uma sessão."""
+        with self.lock:
+            self.tokens.discard(token)
+
+    def is_authorized(self, token):
+        """Verifica se o token pertence a uma sessão ativa."""
+        return token in self.tokens
+
+    def market_card(self):
+        """Retorna a programação com as odds atuais."""
+        with self.lock:
+            return [
+                dict(market, runners=[dict(runner, odds=self.odds[runner['selection_id']]) for runner in market['runners']])
+                for market in self.markets
+            ]
+
+    def market_odds(self, market_id):
+        """Retorna as odds atuais das seleções de um mercado, ou None se não existir."""
+        with self.lock:
+            for market in self.markets:
+                if market['market_id'] == market_id:
+                    return {str(runner['selection_id']): self.odds[runner['selection_id']] for runner in market['runners']}
+        return None
+
+    def place_bet(self, payload):
+        """
+        Registra uma aposta.
+
+        Returns:
+            tuple: (status HTTP, corpo da resposta)
+        """
+        with self.lock:
+            # Repetições com a mesma chave de idempotência retornam a aposta original
+            idempotency_key = payload.get('idempotency_key')
+            if idempotency_key and idempotency_key in self.bets_by_key:
+                bet = self.bets_by_key[idempotency_key]
+                return 200, {'bet_id': bet['bet_id'], 'status': 'placed', 'matched_odds': bet['matched_odds'], 'duplicate': True}
+
+            selection_id = payload.get('selection_id')
+            if selection_id not in self.odds:
+                return 404, {'error': 'Seleção não encontrada'}
+
+            # Aplica a deriva das odds
+            if self.odds_drift:
+                drift = self.random.uniform(-self.odds_drift, self.odds_drift)
+                self.odds[selection_id] = round(max(1.01, self.odds[selection_id] * (1 + drift)), 2)
+
+            try:
+                requested = float(str(payload.get('odds')).replace(',', '.'))
+            except ValueError:
+                return 400, {'error': 'Odds inválidas'}
+
+            current = self.odds[selection_id]
+            if current < requested * (1 - self.odds_tolerance):
+                return 409, {'error': 'Odds alteradas', 'current_odds': current}
+
+            bet = dict(payload, bet_id=len(self.bets) + 1, matched_odds=current, status='placed')
+            self.bets.append(bet)
+            if idempotency_key:
+                self.bets_by_key[idempotency_key] = bet
+            return 200, {'bet_id': bet['bet_id'], 'status': 'placed', 'matched_odds': current}
+
+
+class MockExchangeHandler(BaseHTTPRequestHandler):
+    """Atende as páginas e os endpoints da simulação da Bolsa de Apostas."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    exchange = None
+
+    def send_body(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, status, body):
+        self.send_body(status, json.dumps(body).encode(), 'application/json')
+
+    def send_html(self, status, title, content):
+        page = f"<html><head><title>{escape(title)}</title></head><body><h1>{escape(title)}</h1>{content}</body></html>"
+        self.send_body(status, page.encode(), 'text/html; charset=utf-8')
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = self.rfile.read(length) if length else b''
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            return json.loads(data or b'{}')
+        return {key: values[0] for key, values in parse_qs(data.decode()).items()}
+
+    def token(self):
+        authorization = self.headers.get('Authorization', '')
+        if authorization.startswith('Bearer '):
+            return authorization[len('Bearer '):]
+        return None
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if self.exchange.simulate_conditions():
+            return self.send_json(503, {'error': 'Serviço indisponível'})
+
+        if path == '/api/ping':
+            self.send_json(200, {'status': 'ok'})
+        elif path == '/api/markets':
+            self.send_json(200, {'markets': self.exchange.market_card()})
+        elif path.startswith('/api/markets/') and path.endswith('/odds'):
+            odds = self.exchange.market_odds(path.split('/')[3])
+            if odds is None:
+                self.send_json(404, {'error': 'Mercado não encontrado'})
+            else:
+                self.send_json(200, {'odds': odds})
+        elif path == '/login':
+            self.send_html(200, 'Login', '<form method="post" action="/login">'
+                                         '<input name="username"><input name="password" type="password">'
+                                         '<button type="submit">Entrar</button></form>')
+        elif path == '/corridas':
+            items = ''.join(
+                f'<li><a href="{escape(market.get("locator") or "/corridas/" + market["market_id"])}">{escape(market["race_name"])} - Corrida {escape(market["race_number"])}</a></li>'
+                for market in self.exchange.market_card()
+            )
+            self.send_html(200, 'Corridas', f'<ul>{items}</ul>')
+        elif path.startswith('/corridas/'):
+            market_id = path.split('/')[2]
+            market = next((m for m in self.exchange.market_card() if m['market_id'] == market_id), None)
+            if market is None:
+                return self.send_html(404, 'Mercado não encontrado', '')
+            rows = ''.join(
+                f'<form method="post" action="/apostar"><input type="hidden" name="market_id" value="{escape(market_id)}">'
+                f'<input type="hidden" name="selection_id" value="{runner["selection_id"]}">'
+                f'{escape(runner["horse"])} @ <input name="odds" value="{runner["odds"]}">'
+                f'<input type="hidden" name="bet_type" value="Win"><button type="submit">Apostar</button></form>'
+                for runner in market['runners']
+            )
+            self.send_html(200, f'{market["race_name"]} - Corrida {market["race_number"]}', rows)
+        else:
+            self.send_json(404, {'error': 'Não encontrado'})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self.read_body()
+        if self.exchange.simulate_conditions():
+            return self.send_json(503, {'error': 'Serviço indisponível'})
+
+        if path in ('/api/login', '/login'):
+            token = self.exchange.login(body.get('username'), body.get('password'))
+            if token is None:
+                self.send_json(401, {'error': 'Credenciais inválidas'})
+            else:
+                self.send_json(200, {'token': token})
+        elif path == '/api/logout':
+            self.exchange.logout(self.token())
+            self.send_json(200, {'status': 'ok'})
+        elif path == '/api/bets':
+            if not self.exchange.is_authorized(self.token()):
+                return self.send_json(401, {'error': 'Não autorizado'})
+            status, response = self.exchange.place_bet(body)
+            self.send_json(status, response)
+        elif path == '/apostar':
+            if 'selection_id' in body:
+                body['selection_id'] = int(body['selection_id'])
+            status, response = self.exchange.place_bet(body)
+            self.send_html(status, 'Aposta realizada' if status == 200 else 'Erro na aposta', escape(json.dumps(response)))
+        else:
+            self.send_json(404, {'error': 'Não encontrado'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockExchangeServer:
+    """Servidor HTTP local da simulação da Bolsa de Apostas, executado em segundo plano."""
+    def __init__(self, exchange=None, host='127.0.0.1', port=0):
+        """
+        Inicializa o servidor.
+
+        Args:
+            exchange (MockExchange, optional): Simulação a servir (padrão: sem latência nem erros)
+            host (str): Endereço de escuta
+            port (int): Porta de escuta (0 escolhe uma porta livre)
+        """
+        self.exchange = exchange or MockExchange()
+        handler = type('BoundMockExchangeHandler', (MockExchangeHandler,), {'exchange': self.exchange})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """URL base do servidor."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Inicia o servidor em uma thread de segundo plano."""
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Para o servidor."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação local da Bolsa de Apostas")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Latência média em segundos")
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help="Variação da latência em segundos")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probabilidade de HTTP 503")
+    parser.add_argument('--odds-drift', type=float, default=0.0, help="Deriva relativa das odds por aposta")
+    parser.add_argument('--odds-tolerance', type=float, default=0.0, help="Queda de odds aceita")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    exchange = MockExchange(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        odds_drift=args.odds_drift,
+        odds_tolerance=args.odds_tolerance,
+        seed=args.seed
+    )
+    server = MockExchangeServer(exchange, host=args.host, port=args.port)
+    print(f"Simulação da Bolsa de Apostas em {server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
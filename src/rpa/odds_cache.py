@@ -0,0 +1,78 @@
+import time
+
+
+def parse_odds(value):
+    """
+    Converte odds recebidas como texto (ex.: '@ 4,50') em número.
+
+    Returns:
+        float: Odds ou None se o valor for inválido
+    """
+    try:
+        return float(str(value).replace('@', '').replace(',', '.').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def minimum_acceptable_odds(signal_odds, max_odds_drop=0.1, min_odds=1.01):
+    """
+    Calcula as menores odds aceitas para uma aposta.
+
+    Args:
+        signal_odds (float): Odds informadas no sinal
+        max_odds_drop (float): Queda relativa máxima aceita em relação ao sinal (0 a 1)
+        min_odds (float): Odds mínimas absolutas
+
+    Returns:
+        float: Menores odds aceitas
+    """
+    return max(min_odds, signal_odds * (1 - max_odds_drop))
+
+
+class OddsCache:
+    """
+    Cache das odds atuais dos mercados com apostas pendentes.
+    As odds de um mercado são consideradas desatualizadas após max_age segundos.
+    """
+    def __init__(self, max_age=10, clock=time.monotonic):
+        """
+        Inicializa o cache de odds.
+
+        Args:
+            max_age (float): Validade das odds de um mercado em segundos
+            clock (callable): Relógio monotônico
+        """
+        self.max_age = max_age
+        self.clock = clock
+        self.markets = {}
+
+    def update(self, market_id, odds_by_selection):
+        """
+        Atualiza as odds de um mercado.
+
+        Args:
+            market_id (str): ID do mercado
+            odds_by_selection (dict): ID da seleção -> odds
+        """
+        odds = {str(selection_id): parse_odds(value) for selection_id, value in odds_by_selection.items()}
+        self.markets[market_id] = (self.clock(), odds)
+
+    def is_stale(self, market_id):
+        """Verifica se as odds do mercado estão ausentes ou desatualizadas."""
+        entry = self.markets.get(market_id)
+        return entry is None or self.clock() - entry[0] >= self.max_age
+
+    def get(self, market_id, selection_id):
+        """
+        Obtém as odds atuais de uma seleção.
+
+        Returns:
+            float: Odds ou None se não houver valor atualizado
+        """
+        if self.is_stale(market_id):
+            return None
+        return self.markets[market_id][1].get(str(selection_id))
+
+    def invalidate(self):
+        """Remove todas as odds do cache."""
+        self.markets.clear()
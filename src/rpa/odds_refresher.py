@@ -0,0 +1,72 @@
+import threading
+
+
+class OddsRefresher:
+    """
+    Atualiza em segundo plano o cache de odds dos mercados das apostas pendentes.
+
+    A atualização fica fora do caminho de execução das apostas: antes de cada aposta,
+    BetExecutor.check_odds apenas consulta o cache, sem requisições ao site. As apostas
+    acompanhadas são informadas por watch sempre que a fila de apostas pendentes muda.
+    """
+    def __init__(self, executor, interval=None):
+        """
+        Inicializa o atualizador.
+
+        Args:
+            executor (BetExecutor): Executor cujo cache de odds é atualizado
+            interval (float, optional): Intervalo, em segundos, entre as verificações
+                (padrão: metade da validade do cache de odds)
+        """
+        self.executor = executor
+        self.interval = interval or executor.odds_cache.max_age / 2
+        self.lock = threading.Lock()
+        self.bets = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def watch(self, bets):
+        """
+        Define as apostas pendentes cujos mercados são atualizados.
+
+        Args:
+            bets (list): Apostas pendentes (a lista é copiada)
+        """
+        with self.lock:
+            self.bets = list(bets)
+
+    def refresh_once(self):
+        """
+        Atualiza os mercados com odds ausentes ou desatualizadas das apostas acompanhadas.
+
+        Returns:
+            int: Número de mercados atualizados
+        """
+        with self.lock:
+            bets = self.bets
+        if not bets:
+            return 0
+        return self.executor.refresh_odds(bets)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                self.executor.error(f"Erro ao atualizar odds: {str(e)}")
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        """Inicia a atualização em uma thread própria."""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name='odds-refresher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Para a atualização e aguarda a requisição em andamento."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,187 @@
+import random
+import time
+import threading
+
+
+class TransientRPAError(Exception):
+    """Falha transitória do site de apostas (timeout, indisponibilidade) que pode ser repetida."""
+
+
+class CircuitOpenError(Exception):
+    """Tentativa bloqueada porque o circuito está aberto (site considerado fora do ar)."""
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para as operações no site de apostas.
+    Após um número de falhas transitórias consecutivas o circuito abre e as tentativas
+    são bloqueadas até o fim do tempo de espera, quando uma única tentativa de teste é liberada.
+    As demais tentativas continuam bloqueadas até o resultado do teste.
+    """
+    CLOSED = 'Fechado'
+    OPEN = 'Aberto'
+    HALF_OPEN = 'Semiaberto'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, state_callback=None, clock=time.monotonic):
+        """
+        Inicializa o disjuntor.
+
+        Args:
+            failure_threshold (int): Falhas consecutivas necessárias para abrir o circuito
+            reset_timeout (float): Tempo, em segundos, até liberar uma tentativa de teste
+            state_callback (callable): Função chamada com o novo estado a cada mudança
+            clock (callable): Relógio monotônico
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state_callback = state_callback
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        # Tentativa de teste em andamento (estado semiaberto)
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def set_state(self, state):
+        """Altera o estado do circuito e notifica a mudança."""
+        if state == self.state:
+            return
+
+        self.state = state
+        if self.state_callback:
+            self.state_callback(state)
+
+    def allow_request(self):
+        """
+        Verifica se uma tentativa pode ser feita.
+
+        Returns:
+            bool: True se a tentativa está liberada, False se o circuito está aberto
+                ou se a tentativa de teste ainda não terminou
+        """
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.set_state(self.HALF_OPEN)
+                self.probe_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self.probe_in_flight:
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """Registra uma tentativa bem-sucedida e fecha o circuito."""
+        with self.lock:
+            self.failures = 0
+            self.probe_in_flight = False
+            self.set_state(self.CLOSED)
+
+    def record_failure(self):
+        """Registra uma falha transitória e abre o circuito se o limite for atingido."""
+        with self.lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                self.set_state(self.OPEN)
+
+    def release_probe(self):
+        """
+        Libera a tentativa de teste que terminou com um erro não transitório
+        (o circuito continua semiaberto e a próxima tentativa é o novo teste).
+        """
+        with self.lock:
+            self.probe_in_flight = False
+
+
+class RetryPolicy:
+    """
+    Política de novas tentativas com backoff exponencial e jitter.
+    Apenas falhas transitórias (TransientRPAError) são repetidas.
+    """
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=5.0, jitter=0.5,
+                 sleep=time.sleep, clock=time.time):
+        """
+        Inicializa a política.
+
+        Args:
+            max_attempts (int): Número máximo de tentativas
+            base_delay (float): Espera, em segundos, antes da segunda tentativa
+            max_delay (float): Espera máxima entre tentativas
+            jitter (float): Fração aleatória (0 a 1) subtraída de cada espera
+            sleep (callable): Função usada para aguardar
+            clock (callable): Relógio usado para comparar com o prazo da aposta
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.sleep = sleep
+        self.clock = clock
+
+    def compute_delay(self, attempt):
+        """
+        Calcula a espera após a tentativa informada.
+
+        Args:
+            attempt (int): Número da tentativa que falhou (a partir de 1)
+
+        Returns:
+            float: Espera em segundos
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def run(self, operation, deadline=None, breaker=None, retry_callback=None):
+        """
+        Executa a operação aplicando a política.
+
+        Args:
+            operation (callable): Operação a ser executada (sem argumentos)
+            deadline (float, optional): Timestamp limite; não há nova tentativa se a espera ultrapassá-lo
+            breaker (CircuitBreaker, optional): Disjuntor consultado antes de cada tentativa
+            retry_callback (callable, optional): Função chamada com (tentativa, espera, erro) antes de repetir
+
+        Returns:
+            O retorno da operação
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+            TransientRPAError: Se as tentativas se esgotarem ou o prazo não permitir nova tentativa
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+
+            if breaker and not breaker.allow_request():
+                raise CircuitOpenError("Site de apostas indisponível")
+
+            try:
+                result = operation()
+            except TransientRPAError as e:
+                if breaker:
+                    breaker.record_failure()
+
+                if attempt >= self.max_attempts:
+                    raise
+
+                delay = self.compute_delay(attempt)
+                if deadline is not None and self.clock() + delay >= deadline:
+                    raise
+
+                if retry_callback:
+                    retry_callback(attempt, delay, e)
+                self.sleep(delay)
+                continue
+            except Exception:
+                if breaker:
+                    breaker.release_probe()
+                raise
+
+            if breaker:
+                breaker.record_success()
+            return result
@@ -1,225 +1,38 @@
 import sys
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
-from datetime import datetime
+from PyQt5.QtCore import QObject, pyqtSignal
 
-class RPAController(QObject):
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.rpa.bet_executor import BetExecutor
+
+class RPAController(QObject, BetExecutor):
     """
     Controlador para operações de RPA (Robotic Process Automation).
     Esta classe gerencia a automação de apostas no site da Bolsa de Apostas.
+    A execução fica em BetExecutor; aqui os eventos são emitidos como sinais Qt
+    para a interface gráfica.
     """
     log_message = pyqtSignal(str)
     error_message = pyqtSignal(str)
     bet_status_update = pyqtSignal(dict)
-    
-    def __init__(self, username=None, password=None):
-        super().__init__()
-        self.username = username
-        self.password = password
-        self.browser_visible = False
-        self.is_logged_in = False
-    
-    def set_credentials(self, username, password):
-        """Define as credenciais de login para o site de apostas."""
-        self.username = username
-        self.password = password
-    
-    def process_bet(self, bet_data):
-        """
-        Processa uma aposta recebida.
-        
-        Args:
-            bet_data (dict): Dados da aposta a ser processada
-            
-        Returns:
-            bool: True se a aposta foi processada com sucesso, False caso contrário
-        """
-        try:
-            # Aqui seria implementada a lógica real de automação RPA
-            # Por enquanto, apenas simulamos o processamento
-            
-            self.log_message.emit(f"Processando aposta: {bet_data['race_name']} - Corrida {bet_data['race_number']} - Cavalo: {bet_data['horse']}")
-            
-            # Simula o login se necessário
-            if not self.is_logged_in:
-                success = self.login()
-                if not success:
-                    self.error_message.emit("Falha ao fazer login. Não foi possível processar a aposta.")
-                    
-                    # Atualiza o status da aposta
-                    bet_status = {
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'race_name': bet_data['race_name'],
-                        'race_number': bet_data['race_number'],
-                        'horse': bet_data['horse'],
-                        'odds': bet_data['odds'],
-                        'status': 'Erro - Falha no login'
-                    }
-                    self.bet_status_update.emit(bet_status)
-                    return False
-            
-            # Simula a navegação até a página de apostas
-            self.log_message.emit(f"Navegando para a página de apostas de corridas de cavalos...")
-            
-            # Simula a busca pela corrida
-            self.log_message.emit(f"Buscando corrida: {bet_data['race_name']} - Número {bet_data['race_number']}...")
-            
-            # Simula a busca pelo cavalo
-            self.log_message.emit(f"Buscando cavalo: {bet_data['horse']}...")
-            
-            # Simula a realização da aposta
-            self.log_message.emit(f"Realizando aposta {bet_data['bet_type']} com odds {bet_data['odds']}...")
-            
-            # Simula o sucesso da aposta
-            self.log_message.emit(f"Aposta realizada com sucesso!")
-            
-            # Atualiza o status da aposta
-            bet_status = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'race_name': bet_data['race_name'],
-                'race_number': bet_data['race_number'],
-                'horse': bet_data['horse'],
-                'odds': bet_data['odds'],
-                'status': 'Sucesso'
-            }
-            self.bet_status_update.emit(bet_status)
-            
-            return True
-            
-        except Exception as e:
-            error_message = f"Erro ao processar aposta: {str(e)}"
-            self.error_message.emit(error_message)
-            
-            # Atualiza o status da aposta
-            bet_status = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'race_name': bet_data['race_name'],
-                'race_number': bet_data['race_number'],
-                'horse': bet_data['horse'],
-                'odds': bet_data['odds'],
-                'status': f'Erro - {str(e)}'
-            }
-            self.bet_status_update.emit(bet_status)
-            
-            return False
-    
-    def login(self):
-        """
-        Realiza login no site de apostas.
-        
-        Returns:
-            bool: True se o login foi bem-sucedido, False caso contrário
-        """
-        try:
-            if not self.username or not self.password:
-                self.error_message.emit("Credenciais não configuradas.")
-                return False
-            
-            # Aqui seria implementada a lógica real de login
-            # Por enquanto, apenas simulamos o login
-            
-            self.log_message.emit(f"Fazendo login com usuário: {self.username}...")
-            
-            # Simula o sucesso do login
-            self.is_logged_in = True
-            self.log_message.emit("Login realizado com sucesso!")
-            
-            return True
-            
-        except Exception as e:
-            error_message = f"Erro ao fazer login: {str(e)}"
-            self.error_message.emit(error_message)
-            self.is_logged_in = False
-            return False
-    
-    def logout(self):
-        """
-        Realiza logout do site de apostas.
-        
-        Returns:
-            bool: True se o logout foi bem-sucedido, False caso contrário
-        """
-        try:
-            if not self.is_logged_in:
-                return True
-            
-            # Aqui seria implementada a lógica real de logout
-            # Por enquanto, apenas simulamos o logout
-            
-            self.log_message.emit("Fazendo logout...")
-            
-            # Simula o sucesso do logout
-            self.is_logged_in = False
-            self.log_message.emit("Logout realizado com sucesso!")
-            
-            return True
-            
-        except Exception as e:
-            error_message = f"Erro ao fazer logout: {str(e)}"
-            self.error_message.emit(error_message)
-            return False
-    
-    def show_browser(self):
-        """
-        Torna o navegador visível para o usuário.
-        
-        Returns:
-            bool: True se a operação foi bem-sucedida, False caso contrário
-        """
-        try:
-            # Aqui seria implementada a lógica real para mostrar o navegador
-            # Por enquanto, apenas simulamos a operação
-            
-            self.browser_visible = True
-            self.log_message.emit("Navegador agora está visível.")
-            
-            return True
-            
-        except Exception as e:
-            error_message = f"Erro ao mostrar navegador: {str(e)}"
-            self.error_message.emit(error_message)
-            return False
-    
-    def hide_browser(self):
-        """
-        Torna o navegador invisível para o usuário.
-        
-        Returns:
-            bool: True se a operação foi bem-sucedida, False caso contrário
-        """
-        try:
-            # Aqui seria implementada a lógica real para esconder o navegador
-            # Por enquanto, apenas simulamos a operação
-            
-            self.browser_visible = False
-            self.log_message.emit("Navegador agora está invisível.")
-            
-            return True
-            
-        except Exception as e:
-            error_message = f"Erro ao esconder navegador: {str(e)}"
-            self.error_message.emit(error_message)
-            return False
-    
-    def test_connection(self):
-        """
-        Testa a conexão com o site de apostas.
-        
-        Returns:
-            bool: True se a conexão foi bem-sucedida, False caso contrário
-        """
-        try:
-            # Aqui seria implementada a lógica real para testar a conexão
-            # Por enquanto, apenas simulamos o teste
-            
-            self.log_message.emit("Testando conexão com o site de apostas...")
-            
-            # Simula o sucesso do teste
-            self.log_message.emit("Conexão com o site de apostas estabelecida com sucesso!")
-            
-            return True
-            
-        except Exception as e:
-            error_message = f"Erro ao testar conexão: {str(e)}"
-            self.error_message.emit(error_message)
-            return False
+    breaker_state_changed = pyqtSignal(str)
+    
+    def __init__(self, username=None, password=None, market_cache_ttl=900, retry_policy=None, circuit_breaker=None,
+                 odds_max_age=10, max_odds_drop=0.1, min_odds=1.01, stake=1.0):
+        QObject.__init__(self)
+        BetExecutor.__init__(
+            self,
+            username=username,
+            password=password,
+            market_cache_ttl=market_cache_ttl,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            odds_max_age=odds_max_age,
+            max_odds_drop=max_odds_drop,
+            min_odds=min_odds,
+            stake=stake,
+            log_callback=self.log_message.emit,
+            error_callback=self.error_message.emit,
+            status_callback=self.bet_status_update.emit,
+            breaker_callback=self.breaker_state_changed.emit
+        )
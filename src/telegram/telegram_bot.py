@@ -1,8 +1,16 @@
 import os
+import re
+import sys
+import time
 import logging
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackContext
 
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.utils.latency_tracer import mark_stage, monotonic_from_wall
+from src.utils.idempotency import make_idempotency_key
+
 class TelegramBot:
     def __init__(self, token, chat_id, message_callback=None, error_callback=None):
         """
@@ -38,6 +46,8 @@ class TelegramBot:
     
     async def handle_message(self, update: Update, context: CallbackContext) -> None:
         """Processa mensagens recebidas."""
+        received_at = time.monotonic()
+        
         # Verifica se a mensagem veio do chat monitorado
         if str(update.effective_chat.id) != self.chat_id:
             return
@@ -48,6 +58,18 @@ class TelegramBot:
         if "Nome da Corrida:" in message_text and "Cavalo:" in message_text:
             bet_data = self.parse_bet_message(message_text)
             
+            # Registra o rastro de latência desde a data da mensagem
+            if bet_data:
+                if update.message.date:
+                    mark_stage(bet_data, 'telegram', monotonic_from_wall(update.message.date.timestamp()))
+                mark_stage(bet_data, 'handle_message', received_at)
+                mark_stage(bet_data, 'parsed')
+                
+                # Identifica a aposta de forma única para evitar duplicidade
+                bet_data['message_id'] = update.message.message_id
+                bet_data['channel'] = self.chat_id
+                bet_data['idempotency_key'] = make_idempotency_key(update.message.message_id, bet_data, self.chat_id)
+            
             if bet_data and self.message_callback:
                 self.message_callback(bet_data)
                 
@@ -94,6 +116,22 @@ class TelegramBot:
                 bet_type_line = message_text.split("Tipo:")[1].split("\n")[0].strip()
                 bet_data["bet_type"] = bet_type_line
             
+            # Extrai o horário de largada (opcional)
+            if "Horário:" in message_text:
+                off_time_line = message_text.split("Horário:")[1].split("\n")[0].strip()
+                bet_data["off_time"] = off_time_line
+            
+            # Extrai o stake (opcional; sem ele é usado o stake padrão da configuração)
+            if "Stake:" in message_text:
+                stake_line = message_text.split("Stake:")[1].split("\n")[0].strip()
+                # Usa o primeiro número da linha ('2 unidades', '10u', 'R$ 10'); um stake
+                # inválido não descarta a aposta, que segue com o stake padrão
+                stake_match = re.search(r"\d+(?:[.,]\d+)?", stake_line)
+                if stake_match:
+                    bet_data["stake"] = float(stake_match.group().replace(",", "."))
+                elif self.error_callback:
+                    self.error_callback(f"Stake inválido ignorado, usando o stake padrão: {stake_line}")
+            
             # Verifica se todos os campos necessários foram extraídos
             required_fields = ["race_name", "race_number", "horse", "odds", "bet_type"]
             if all(field in bet_data for field in required_fields):
@@ -7,6 +7,7 @@ from datetime import datetime
 # Importa os módulos do projeto
 sys.path.append('/home/ubuntu/BotApostasAutomatizado')
 from src.telegram.telegram_bot import TelegramBot
+from src.utils.event_bus import SignalReceived
 
 class TelegramWorker(QThread):
     """
@@ -16,16 +17,28 @@ class TelegramWorker(QThread):
     log_message = pyqtSignal(str)
     error_message = pyqtSignal(str)
     
-    def __init__(self, token, chat_id):
+    def __init__(self, token, chat_id, event_bus=None, accept_callback=None):
         super().__init__()
         self.token = token
         self.chat_id = chat_id
+        # Com um barramento de eventos, as apostas são publicadas nele em vez de emitidas como sinal
+        self.event_bus = event_bus
+        # Chamada com cada aposta recebida, nesta thread, antes da publicação (ex.: log de apostas pendentes)
+        self.accept_callback = accept_callback
         self.running = False
         self.bot = None
         
     def message_callback(self, bet_data):
         """Callback para mensagens recebidas do Telegram."""
-        self.message_received.emit(bet_data)
+        if self.accept_callback:
+            self.accept_callback(bet_data)
+        
+        if self.event_bus:
+            if not self.event_bus.publish(SignalReceived(bet_data)):
+                self.error_message.emit(f"Sinal descartado (fila de sinais indisponível): {bet_data['race_name']} - Corrida {bet_data['race_number']} - Cavalo: {bet_data['horse']}")
+                return
+        else:
+            self.message_received.emit(bet_data)
         self.log_message.emit(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Nova aposta recebida: {bet_data['race_name']} - {bet_data['horse']}")
     
     def error_callback(self, error_message):
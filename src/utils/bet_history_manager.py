@@ -1,12 +1,55 @@
 import os
+import sys
+import csv
 import json
+import threading
 from datetime import datetime
 
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.utils.latency_tracer import trace_offsets
+
+# Resultados de liquidação aceitos: vitória, colocação (apostas Place e E/W), derrota e aposta anulada
+SETTLEMENT_RESULTS = ['won', 'placed', 'lost', 'void']
+
 class BetHistoryManager:
     """
     Gerenciador de histórico de apostas para o Bot de Apostas Automatizado.
     Responsável por salvar e carregar o histórico de apostas realizadas.
+    
+    Use BetHistoryManager.shared() para obter a instância única de cada arquivo no
+    processo: o histórico é carregado uma só vez e todos os componentes veem as
+    mesmas apostas. As operações são protegidas por um lock e podem ser feitas
+    de várias threads.
     """
+    # Instâncias compartilhadas, por caminho do arquivo de histórico
+    _instances = {}
+    _instances_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, history_file_path=None):
+        """
+        Retorna a instância compartilhada do histórico de um arquivo, criando-a na primeira chamada.
+        
+        Args:
+            history_file_path (str, optional): Caminho para o arquivo de histórico.
+                Se não for fornecido, será usado o caminho padrão.
+                
+        Returns:
+            BetHistoryManager: Instância única para o arquivo.
+        """
+        key = os.path.abspath(history_file_path or cls.default_history_path())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+    
+    @staticmethod
+    def default_history_path():
+        """Retorna o caminho padrão do arquivo de histórico (bet_history.json na raiz do projeto)."""
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return os.path.join(base_dir, 'bet_history.json')
+    
     def __init__(self, history_file_path=None):
         """
         Inicializa o gerenciador de histórico.
@@ -17,13 +60,71 @@ class BetHistoryManager:
         """
         if history_file_path is None:
             # Define o caminho padrão para o arquivo de histórico
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            self.history_file_path = os.path.join(base_dir, 'bet_history.json')
+            self.history_file_path = self.default_history_path()
         else:
             self.history_file_path = history_file_path
         
+        # Agregados por dia do histórico, gravados ao lado dele (ver DailyAggregates.load_or_build)
+        self.aggregates_file_path = os.path.splitext(self.history_file_path)[0] + '.aggregates.json'
+        
+        # Log das apostas aceitas e ainda não executadas (ver PendingBetLog), separado do histórico
+        self.pending_file_path = os.path.splitext(self.history_file_path)[0] + '.pending.jsonl'
+        
+        # Protege o histórico contra escritas e leituras simultâneas de várias threads
+        self.lock = threading.RLock()
+        
         # Carrega o histórico
         self.history = self.load_history()
+        
+        # Chaves de idempotência das apostas já registradas
+        self.idempotency_keys = {bet['idempotency_key'] for bet in self.history if bet.get('idempotency_key')}
+        
+        # Versão do histórico, incrementada a cada alteração
+        self.version = 0
+        
+        # Funções notificadas a cada alteração, por evento ('append', 'settle' e 'clear')
+        self.listeners = {'append': [], 'settle': [], 'clear': []}
+    
+    def subscribe(self, callback, event='append'):
+        """
+        Registra uma função a ser notificada das alterações do histórico.
+        As funções são chamadas na thread que fez a alteração, fora do lock.
+        
+        Args:
+            callback (callable): Função notificada. No evento 'append' recebe o
+                registro da aposta adicionada; no evento 'settle', o número de apostas
+                liquidadas; no evento 'clear', nenhum argumento.
+            event (str): 'append' (aposta adicionada), 'settle' (resultados importados)
+                ou 'clear' (histórico limpo).
+        """
+        with self.lock:
+            if callback not in self.listeners[event]:
+                self.listeners[event].append(callback)
+    
+    def unsubscribe(self, callback, event='append'):
+        """Remove uma função registrada com subscribe."""
+        with self.lock:
+            if callback in self.listeners[event]:
+                self.listeners[event].remove(callback)
+    
+    def notify(self, event, *args):
+        """Chama as funções registradas para um evento."""
+        with self.lock:
+            callbacks = list(self.listeners[event])
+        for callback in callbacks:
+            callback(*args)
+    
+    def snapshot(self):
+        """
+        Retorna uma cópia imutável do histórico, para leitura em outra thread.
+        Os registros não são copiados: o gerenciador nunca os altera depois de gravados
+        (a liquidação substitui o registro inteiro).
+        
+        Returns:
+            tuple: Registros do histórico, do mais antigo ao mais recente.
+        """
+        with self.lock:
+            return tuple(self.history)
     
     def load_history(self):
         """
@@ -50,8 +151,9 @@ class BetHistoryManager:
             bool: True se o histórico foi salvo com sucesso, False caso contrário.
         """
         try:
-            with open(self.history_file_path, 'w') as f:
-                json.dump(self.history, f, indent=4)
+            with self.lock:
+                with open(self.history_file_path, 'w') as f:
+                    json.dump(self.history, f, indent=4)
             return True
         except Exception as e:
             print(f"Erro ao salvar histórico: {str(e)}")
@@ -66,29 +168,199 @@ class BetHistoryManager:
             status (str): Status da aposta (Sucesso, Erro, etc.).
             
         Returns:
-            bool: True se a aposta foi adicionada com sucesso, False caso contrário.
+            bool: True se a aposta foi adicionada com sucesso, False caso contrário
+                (inclusive quando a chave de idempotência já está registrada).
         """
         try:
-            # Cria o registro da aposta
-            bet_record = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'race_name': bet_data.get('race_name', ''),
-                'race_number': bet_data.get('race_number', ''),
-                'horse': bet_data.get('horse', ''),
-                'odds': bet_data.get('odds', ''),
-                'bet_type': bet_data.get('bet_type', ''),
-                'status': status
-            }
+            with self.lock:
+                saved, bet_record = self.append_record(bet_data, status)
             
-            # Adiciona ao histórico
-            self.history.append(bet_record)
+            # Notifica os interessados
+            if bet_record:
+                self.notify('append', bet_record)
             
-            # Salva o histórico
-            return self.save_history()
+            return saved
         except Exception as e:
             print(f"Erro ao adicionar aposta ao histórico: {str(e)}")
             return False
     
+    def append_record(self, bet_data, status):
+        """
+        Cria o registro da aposta, adiciona-o ao histórico e salva o arquivo.
+        Deve ser chamado com o lock adquirido.
+        
+        Returns:
+            tuple: (True se o arquivo foi salvo, registro adicionado ou None se a aposta for duplicada)
+        """
+        # Rejeita apostas já registradas
+        idempotency_key = bet_data.get('idempotency_key')
+        if self.has_idempotency_key(idempotency_key):
+            print(f"Aposta duplicada ignorada: {idempotency_key}")
+            return False, None
+        
+        # Cria o registro da aposta
+        bet_record = {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'race_name': bet_data.get('race_name', ''),
+            'race_number': bet_data.get('race_number', ''),
+            'horse': bet_data.get('horse', ''),
+            'odds': bet_data.get('odds', ''),
+            'bet_type': bet_data.get('bet_type', ''),
+            'stake': bet_data.get('stake', ''),
+            'channel': bet_data.get('channel', ''),
+            'status': status
+        }
+        
+        if idempotency_key:
+            bet_record['idempotency_key'] = idempotency_key
+            self.idempotency_keys.add(idempotency_key)
+        
+        # Grava o horário de largada, se houver
+        if bet_data.get('off_time'):
+            bet_record['off_time'] = bet_data['off_time']
+        
+        # Grava o rastro de latência, se houver
+        if bet_data.get('trace'):
+            bet_record['trace'] = trace_offsets(bet_data['trace'])
+        
+        # Adiciona ao histórico
+        self.history.append(bet_record)
+        self.version += 1
+        
+        # Salva o histórico
+        saved = self.save_history()
+        
+        return saved, bet_record
+    
+    def import_settlements(self, file_path):
+        """
+        Importa os resultados das apostas de um arquivo CSV ou JSON.
+        
+        Cada linha (ou objeto, no JSON) deve conter 'result' (won, placed, lost ou void) e
+        identificar a aposta pela 'idempotency_key' ou por 'race_name', 'race_number' e 'horse'.
+        O campo 'returns' (retorno total recebido) é opcional; sem ele, o retorno é calculado
+        pelas odds e pelo stake. Apenas apostas realizadas com sucesso são liquidadas.
+        
+        Pela seleção, apenas apostas ainda não liquidadas são consideradas e, se a linha
+        tiver 'date' (AAAA-MM-DD), apenas as apostas desse dia. Linhas inválidas são
+        ignoradas uma a uma, antes de qualquer alteração do histórico.
+        
+        Args:
+            file_path (str): Caminho do arquivo (.json ou .csv).
+            
+        Returns:
+            int: Número de apostas liquidadas.
+        """
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                if file_path.lower().endswith('.json'):
+                    rows = json.load(f)
+                else:
+                    rows = list(csv.DictReader(f))
+            
+            settled_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            with self.lock:
+                # Posições das apostas realizadas, pela chave de idempotência e pela seleção
+                by_key = {}
+                by_selection = {}
+                for index, bet in enumerate(self.history):
+                    if 'Sucesso' not in bet['status']:
+                        continue
+                    if bet.get('idempotency_key'):
+                        by_key[bet['idempotency_key']] = index
+                    by_selection.setdefault(self.selection_key(bet), []).append(index)
+                
+                # Valida todas as linhas antes de alterar qualquer registro
+                settlements = {}
+                for row in rows:
+                    try:
+                        settlement, date = self.parse_settlement(row)
+                    except (ValueError, TypeError, AttributeError) as e:
+                        print(f"Liquidação inválida ignorada ({str(e)}): {row}")
+                        continue
+                    settlement['settled_at'] = settled_at
+                    
+                    if row.get('idempotency_key'):
+                        indexes = [by_key[row['idempotency_key']]] if row['idempotency_key'] in by_key else []
+                    else:
+                        # Sem a chave, a seleção não identifica o dia: apenas apostas ainda
+                        # não liquidadas (e do dia informado, se houver) são consideradas
+                        indexes = [
+                            index for index in by_selection.get(self.selection_key(row), [])
+                            if 'result' not in self.history[index] and index not in settlements
+                            and (date is None or self.history[index]['timestamp'][:10] == date)
+                        ]
+                    
+                    for index in indexes:
+                        settlements[index] = settlement
+                
+                # O registro é substituído, não alterado: as cópias entregues por
+                # snapshot a outras threads continuam com os valores anteriores
+                for index, settlement in settlements.items():
+                    self.history[index] = {**self.history[index], **settlement}
+                settled = len(settlements)
+                
+                if settled:
+                    self.version += 1
+                    self.save_history()
+            
+            # Notifica os interessados
+            if settled:
+                self.notify('settle', settled)
+            
+            return settled
+        except Exception as e:
+            print(f"Erro ao importar resultados: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def parse_settlement(row):
+        """
+        Valida uma linha do arquivo de resultados.
+        
+        Args:
+            row (dict): Linha do arquivo.
+            
+        Returns:
+            tuple: (campos da liquidação ('result' e, se informado, 'returns'), dia AAAA-MM-DD ou None)
+            
+        Raises:
+            ValueError: Se o resultado, o retorno ou a data forem inválidos.
+        """
+        result = str(row.get('result', '')).strip().lower()
+        if result not in SETTLEMENT_RESULTS:
+            raise ValueError(f"resultado inválido '{result}'")
+        
+        settlement = {'result': result}
+        if str(row.get('returns', '')).strip():
+            settlement['returns'] = float(str(row['returns']).replace(',', '.'))
+        
+        date = str(row.get('date') or '').strip() or None
+        if date:
+            date = datetime.strptime(date[:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+        
+        return settlement, date
+    
+    @staticmethod
+    def selection_key(bet):
+        """Identifica a seleção de uma aposta (corrida, número da corrida e cavalo)."""
+        return (str(bet.get('race_name', '')).strip().lower(),
+                str(bet.get('race_number', '')).strip(),
+                str(bet.get('horse', '')).strip().lower())
+    
+    def has_idempotency_key(self, idempotency_key):
+        """
+        Verifica se uma aposta com a chave de idempotência já foi registrada.
+        
+        Args:
+            idempotency_key (str): Chave de idempotência.
+            
+        Returns:
+            bool: True se a chave já existe no histórico.
+        """
+        return bool(idempotency_key) and idempotency_key in self.idempotency_keys
+    
     def get_history(self, limit=None, filter_race=None, filter_horse=None, filter_status=None):
         """
         Obtém o histórico de apostas com opções de filtragem.
@@ -103,7 +375,7 @@ class BetHistoryManager:
             list: Histórico filtrado.
         """
         # Aplica os filtros
-        filtered_history = self.history
+        filtered_history = self.snapshot()
         
         if filter_race:
             filtered_history = [bet for bet in filtered_history if filter_race.lower() in bet['race_name'].lower()]
@@ -123,17 +395,51 @@ class BetHistoryManager:
         
         return filtered_history
     
-    def get_statistics(self):
+    @staticmethod
+    def update_statistics(stats, bet_record):
+        """
+        Atualiza de forma incremental as estatísticas calculadas por get_statistics
+        com uma aposta recém-adicionada.
+        
+        Args:
+            stats (dict): Estatísticas retornadas por get_statistics (alteradas no lugar).
+            bet_record (dict): Registro da aposta adicionada agora.
+            
+        Returns:
+            dict: As estatísticas atualizadas.
+        """
+        stats['total'] += 1
+        if 'Sucesso' in bet_record['status']:
+            stats['success'] += 1
+        elif 'Erro' in bet_record['status']:
+            stats['error'] += 1
+        
+        # A aposta é de agora: conta em todos os períodos
+        stats['today'] += 1
+        stats['this_week'] += 1
+        stats['this_month'] += 1
+        
+        stats['success_rate'] = round((stats['success'] / stats['total']) * 100, 2)
+        return stats
+    
+    def get_statistics(self, history=None):
         """
         Calcula estatísticas sobre as apostas realizadas.
         
+        Args:
+            history (sequence, optional): Registros a considerar (padrão: todo o histórico).
+                Permite calcular as estatísticas sobre uma cópia, fora da thread da interface.
+        
         Returns:
             dict: Estatísticas das apostas.
         """
+        if history is None:
+            history = self.snapshot()
+        
         try:
             # Inicializa as estatísticas
             stats = {
-                'total': len(self.history),
+                'total': len(history),
                 'success': 0,
                 'error': 0,
                 'today': 0,
@@ -146,7 +452,7 @@ class BetHistoryManager:
             today = now.strftime('%Y-%m-%d')
             
             # Calcula as estatísticas
-            for bet in self.history:
+            for bet in history:
                 # Contagem por status
                 if 'Sucesso' in bet['status']:
                     stats['success'] += 1
@@ -195,8 +501,15 @@ class BetHistoryManager:
             bool: True se o histórico foi limpo com sucesso, False caso contrário.
         """
         try:
-            self.history = []
-            return self.save_history()
+            with self.lock:
+                self.history = []
+                self.idempotency_keys = set()
+                self.version += 1
+                saved = self.save_history()
+            
+            # Notifica os interessados
+            self.notify('clear')
+            return saved
         except Exception as e:
             print(f"Erro ao limpar histórico: {str(e)}")
             return False
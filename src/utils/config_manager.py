@@ -32,7 +32,24 @@ class ConfigManager:
             },
             'betting': {
                 'username': '',
-                'password': ''
+                'password': '',
+                'stake': 1.0
+            },
+            'rpa': {
+                'market_cache_ttl': 900,
+                'min_lead_time': 5,
+                'retry_max_attempts': 3,
+                'retry_base_delay': 0.5,
+                'retry_max_delay': 5.0,
+                'breaker_failure_threshold': 5,
+                'breaker_reset_timeout': 30,
+                'engine': 'browser',
+                'exchange_url': '',
+                'http_timeout': 5,
+                'http_pool_size': 4,
+                'odds_max_age': 10,
+                'max_odds_drop': 0.1,
+                'min_odds': 1.01
             },
             'app': {
                 'auto_start': False,
@@ -103,22 +120,66 @@ class ConfigManager:
     def get_betting_config(self):
         """
         Obtém as configurações da Bolsa de Apostas.
+        Chaves ausentes no arquivo são preenchidas com os valores padrão.
         
         Returns:
             dict: Configurações da Bolsa de Apostas.
         """
-        return self.config['betting']
+        betting_config = self.config.setdefault('betting', {})
+        for key, value in self.default_config['betting'].items():
+            betting_config.setdefault(key, value)
+        return betting_config
     
-    def set_betting_config(self, username, password):
+    def set_betting_config(self, username, password, stake=None):
         """
         Define as configurações da Bolsa de Apostas.
         
         Args:
             username (str): Nome de usuário para login.
             password (str): Senha para login.
+            stake (float, optional): Stake padrão das apostas (em E/W, o valor de cada parte).
+        """
+        betting_config = self.get_betting_config()
+        betting_config['username'] = username
+        betting_config['password'] = password
+        
+        if stake is not None:
+            betting_config['stake'] = stake
+    
+    def get_rpa_config(self):
+        """
+        Obtém as configurações do RPA.
+        Chaves ausentes no arquivo são preenchidas com os valores padrão.
+        
+        Returns:
+            dict: Configurações do RPA.
         """
-        self.config['betting']['username'] = username
-        self.config['betting']['password'] = password
+        rpa_config = self.config.setdefault('rpa', {})
+        for key, value in self.default_config['rpa'].items():
+            rpa_config.setdefault(key, value)
+        return rpa_config
+    
+    def set_rpa_config(self, **values):
+        """
+        Define as configurações do RPA.
+        
+        Args:
+            **values: Valores a alterar, com as mesmas chaves da seção 'rpa' padrão
+                (market_cache_ttl, min_lead_time, retry_max_attempts, retry_base_delay,
+                retry_max_delay, breaker_failure_threshold, breaker_reset_timeout, engine,
+                exchange_url, http_timeout, http_pool_size, odds_max_age, max_odds_drop, min_odds).
+        
+        Raises:
+            KeyError: Se alguma chave não existir na configuração padrão.
+        """
+        rpa_config = self.get_rpa_config()
+        
+        for key, value in values.items():
+            if key not in self.default_config['rpa']:
+                raise KeyError(f"Configuração de RPA desconhecida: {key}")
+            
+            if value is not None:
+                rpa_config[key] = value
     
     def get_app_config(self):
         """
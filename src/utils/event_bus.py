@@ -0,0 +1,341 @@
+import time
+import threading
+from collections import deque
+
+# Políticas aplicadas quando a fila de um assinante está cheia:
+# 'drop_oldest' descarta o evento mais antigo da fila, 'drop_newest' descarta o evento
+# publicado e 'block' faz quem publica aguardar espaço na fila (até block_timeout, se
+# definido; esgotado o tempo, o evento é descartado)
+OVERFLOW_POLICIES = ['drop_oldest', 'drop_newest', 'block']
+
+
+class Event:
+    """Evento publicado no EventBus. Guarda o instante da publicação."""
+    def __init__(self):
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value!r}" for key, value in vars(self).items() if key != 'timestamp')
+        return f"{type(self).__name__}({fields})"
+
+
+class SignalReceived(Event):
+    """Sinal de aposta recebido do Telegram."""
+    def __init__(self, bet_data):
+        super().__init__()
+        self.bet_data = bet_data
+
+
+class BetQueued(Event):
+    """Aposta adicionada à fila de apostas pendentes."""
+    def __init__(self, bet_data):
+        super().__init__()
+        self.bet_data = bet_data
+
+
+class BetPlaced(Event):
+    """Aposta realizada com sucesso."""
+    def __init__(self, bet_data, status="Sucesso"):
+        super().__init__()
+        self.bet_data = bet_data
+        self.status = status
+
+
+class BetFailed(Event):
+    """Aposta não realizada (erro na execução ou corrida já iniciada)."""
+    def __init__(self, bet_data, status="Erro"):
+        super().__init__()
+        self.bet_data = bet_data
+        self.status = status
+
+
+class NotificationSent(Event):
+    """Notificação do resultado de uma aposta enviada pelo Telegram."""
+    def __init__(self, message, success=True):
+        super().__init__()
+        self.message = message
+        self.success = success
+
+
+class Subscription:
+    """
+    Assinatura de um tipo de evento no EventBus, com sua própria fila limitada.
+
+    Os eventos publicados entram na fila e são entregues ao handler por drain, na
+    thread que o chamar. A função wakeup é chamada quando a fila deixa de estar vazia
+    (uma vez por rajada de eventos) e deve agendar drain na thread do assinante
+    (ver QtEventPump e asyncio_wakeup).
+    """
+    def __init__(self, event_types, handler, max_size=1000, overflow='drop_oldest', name=None,
+                 wakeup=None, batch_size=100, block_timeout=5.0, drain_thread=None):
+        """
+        Inicializa a assinatura.
+
+        Args:
+            event_types (type or tuple): Classes de evento entregues ao handler
+            handler (callable): Função que recebe cada evento
+            max_size (int): Número máximo de eventos na fila
+            overflow (str): Política com a fila cheia (ver OVERFLOW_POLICIES)
+            name (str, optional): Nome da assinatura nas métricas (padrão: nome do handler)
+            wakeup (callable, optional): Função chamada com a assinatura quando chegam eventos
+            batch_size (int): Eventos entregues por chamada de drain agendada por wakeup
+            block_timeout (float): Espera máxima, em segundos, da política 'block'
+                (None: aguarda sem limite e nenhum evento é descartado)
+            drain_thread (int, optional): Identificador da thread que entrega os eventos, se já
+                conhecida (quem publica nessa thread esvazia a fila em vez de aguardar)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de estouro desconhecida: {overflow}")
+
+        self.event_types = event_types
+        self.handler = handler
+        self.max_size = max_size
+        self.overflow = overflow
+        self.name = name or getattr(handler, '__name__', repr(handler))
+        self.wakeup = wakeup
+        self.batch_size = batch_size
+        self.block_timeout = block_timeout
+        self.error_callback = print
+
+        self.queue = deque()
+        self.condition = threading.Condition()
+        # Thread que entrega os eventos (informada ou conhecida após o primeiro drain)
+        self.drain_thread = drain_thread
+
+        # Métricas
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.max_depth = 0
+
+    def accepts(self, event):
+        """Verifica se o evento é de um dos tipos assinados."""
+        return isinstance(event, self.event_types)
+
+    def put(self, event):
+        """
+        Coloca um evento na fila, aplicando a política de estouro.
+
+        Returns:
+            bool: True se o evento entrou na fila, False se foi descartado
+        """
+        with self.condition:
+            self.published += 1
+
+            if len(self.queue) >= self.max_size:
+                if self.overflow == 'drop_newest':
+                    self.dropped += 1
+                    return False
+
+                if self.overflow == 'drop_oldest':
+                    self.queue.popleft()
+                    self.dropped += 1
+
+                elif threading.get_ident() == self.drain_thread:
+                    # Quem publica é a própria thread de entrega: esperar travaria a
+                    # entrega, então a fila é esvaziada aqui mesmo
+                    self.condition.release()
+                    try:
+                        self.drain()
+                    finally:
+                        self.condition.acquire()
+
+                else:
+                    self.blocked += 1
+                    if self.block_timeout is None:
+                        self.condition.wait_for(lambda: len(self.queue) < self.max_size)
+                    else:
+                        deadline = time.monotonic() + self.block_timeout
+                        while len(self.queue) >= self.max_size:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                self.dropped += 1
+                                return False
+                            self.condition.wait(remaining)
+
+            self.queue.append(event)
+            self.max_depth = max(self.max_depth, len(self.queue))
+            wake = len(self.queue) == 1
+
+        # Agenda a entrega fora do lock
+        if wake and self.wakeup:
+            self.wakeup(self)
+        return True
+
+    def drain(self, max_events=None):
+        """
+        Entrega ao handler os eventos da fila, na thread atual.
+
+        Args:
+            max_events (int, optional): Número máximo de eventos entregues (padrão: todos).
+                Se sobrarem eventos, wakeup é chamada de novo para o próximo lote.
+
+        Returns:
+            int: Número de eventos entregues
+        """
+        self.drain_thread = threading.get_ident()
+        delivered = 0
+
+        while max_events is None or delivered < max_events:
+            with self.condition:
+                if not self.queue:
+                    break
+                event = self.queue.popleft()
+                self.condition.notify_all()
+
+            try:
+                self.handler(event)
+            except Exception as e:
+                self.error_callback(f"Erro ao processar evento {type(event).__name__} em {self.name}: {str(e)}")
+            delivered += 1
+
+        with self.condition:
+            self.delivered += delivered
+            pending = bool(self.queue)
+
+        if pending and max_events is not None and self.wakeup:
+            self.wakeup(self)
+        return delivered
+
+    def drain_batch(self):
+        """Entrega um lote de batch_size eventos (usado pelas funções wakeup)."""
+        return self.drain(self.batch_size)
+
+    def depth(self):
+        """Retorna o número de eventos na fila."""
+        with self.condition:
+            return len(self.queue)
+
+    def metrics(self):
+        """
+        Retorna as métricas da fila.
+
+        Returns:
+            dict: 'depth' (eventos na fila), 'max_depth' (maior profundidade já atingida),
+                'max_size', 'published', 'delivered', 'dropped' e 'blocked' (publicações
+                que aguardaram espaço na fila)
+        """
+        with self.condition:
+            return {
+                'depth': len(self.queue),
+                'max_depth': self.max_depth,
+                'max_size': self.max_size,
+                'published': self.published,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'blocked': self.blocked
+            }
+
+
+class EventBus:
+    """
+    Barramento de eventos interno, sem dependência do Qt.
+
+    Cada assinante tem uma fila limitada com sua política de estouro: uma rajada de
+    eventos fica contida na fila do assinante (e é descartada ou segura quem publica,
+    conforme a política) em vez de se acumular na fila de eventos da interface.
+    A interface gráfica entrega os eventos pelo QtEventPump e o daemon, pelo loop
+    asyncio (ver asyncio_wakeup).
+    """
+    def __init__(self, error_callback=print):
+        """
+        Inicializa o barramento.
+
+        Args:
+            error_callback (callable): Função chamada com as mensagens de erro dos handlers
+        """
+        self.error_callback = error_callback
+        self.subscriptions = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, event_types, handler, **options):
+        """
+        Assina um ou mais tipos de evento.
+
+        Args:
+            event_types (type or tuple): Classes de evento entregues ao handler
+            handler (callable): Função que recebe cada evento
+            **options: max_size, overflow, name, wakeup, batch_size, block_timeout e drain_thread
+                (ver Subscription)
+
+        Returns:
+            Subscription: Assinatura criada
+        """
+        subscription = Subscription(event_types, handler, **options)
+        subscription.error_callback = self.error_callback
+        with self.lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove uma assinatura (os eventos ainda na fila são descartados)."""
+        with self.lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def publish(self, event):
+        """
+        Publica um evento para todos os assinantes do seu tipo.
+
+        Args:
+            event (Event): Evento publicado
+
+        Returns:
+            int: Número de assinaturas em cuja fila o evento entrou
+        """
+        with self.lock:
+            subscriptions = [subscription for subscription in self.subscriptions if subscription.accepts(event)]
+        return sum(subscription.put(event) for subscription in subscriptions)
+
+    def drain_all(self):
+        """
+        Entrega na thread atual os eventos de todas as filas.
+
+        Returns:
+            int: Número de eventos entregues
+        """
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        return sum(subscription.drain() for subscription in subscriptions)
+
+    def metrics(self):
+        """
+        Retorna as métricas das filas de todos os assinantes.
+
+        Returns:
+            dict: Nome da assinatura -> métricas (ver Subscription.metrics)
+        """
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        return {subscription.name: subscription.metrics() for subscription in subscriptions}
+
+
+def asyncio_wakeup(loop):
+    """
+    Cria uma função wakeup que entrega os eventos no loop asyncio informado.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): Loop em que os handlers são executados
+
+    Returns:
+        callable: Função para o parâmetro wakeup de EventBus.subscribe
+    """
+    return lambda subscription: loop.call_soon_threadsafe(subscription.drain_batch)
+
+
+def format_metrics(metrics):
+    """
+    Formata as métricas das filas para o log.
+
+    Args:
+        metrics (dict): Métricas retornadas por EventBus.metrics
+
+    Returns:
+        str: Uma linha por assinatura (ex.: 'sinais: 0/500 na fila, máx. 12, 40 entregues, 0 descartados')
+    """
+    lines = ["Filas de eventos:"]
+    for name, queue in metrics.items():
+        lines.append(f"  {name}: {queue['depth']}/{queue['max_size']} na fila, máx. {queue['max_depth']}, "
+                     f"{queue['delivered']} entregues, {queue['dropped']} descartados")
+    return "\n".join(lines)
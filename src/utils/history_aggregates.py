@@ -0,0 +1,509 @@
+import os
+import sys
+import json
+import heapq
+import bisect
+import itertools
+from datetime import datetime
+
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.rpa.bet_scheduler import parse_off_time
+from src.utils.latency_tracer import stage_durations
+from src.utils.quantile_sketch import TDigest
+
+# Métricas com sketches de quantis por dia e por canal
+QUANTILE_METRICS = ['latency', 'odds', 'time_to_off']
+
+# Percentis exibidos de cada métrica
+QUANTILE_PERCENTILES = (50, 90, 99)
+
+# Campos do registro pelos quais as apostas são agrupadas (corrida, cavalo e tipo de aposta)
+GROUP_FIELDS = ['race_name', 'horse', 'bet_type']
+
+# Versão do formato gravado por DailyAggregates.save (arquivos de outra versão são recalculados)
+AGGREGATES_VERSION = 2
+
+
+def bet_metrics(bet):
+    """
+    Extrai de um registro do histórico os valores das métricas com sketches de quantis.
+
+    Args:
+        bet (dict): Registro do histórico
+
+    Returns:
+        dict: Métrica -> valor ('latency': duração total do rastro em ms; 'odds';
+            'time_to_off': segundos entre o registro da aposta e a largada)
+    """
+    metrics = {}
+
+    latency = stage_durations(bet.get('trace') or {}).get('total')
+    if latency is not None:
+        metrics['latency'] = latency
+
+    try:
+        metrics['odds'] = float(str(bet['odds']).replace(',', '.'))
+    except (KeyError, ValueError):
+        pass
+
+    if bet.get('off_time'):
+        placed_at = datetime.fromisoformat(bet['timestamp'])
+        off_timestamp = parse_off_time(bet['off_time'], placed_at)
+        if off_timestamp is not None:
+            metrics['time_to_off'] = off_timestamp - placed_at.timestamp()
+
+    return metrics
+
+
+class DailyAggregates:
+    """
+    Totais do histórico de apostas agregados por dia.
+    Cada dia guarda o número de apostas, sucessos, erros, a soma das odds, as corridas
+    e cavalos distintos, os mesmos totais por corrida, cavalo e tipo de aposta e um
+    sketch de quantis (TDigest) por métrica e por canal.
+    Qualquer período (inclusive intervalos de datas personalizados) é obtido somando
+    os dias do intervalo, sem percorrer o histórico.
+
+    Os agregados podem ser gravados em um arquivo ao lado do histórico (ver save e
+    load_or_build): na próxima abertura, apenas as apostas novas são somadas.
+    """
+    def __init__(self):
+        # Dia (AAAA-MM-DD) -> totais do dia
+        self.buckets = {}
+        # Dias com apostas, em ordem crescente
+        self.days = []
+        # Versão do formato, número de registros do histórico somados e identificação do último
+        self.version = AGGREGATES_VERSION
+        self.records = 0
+        self.last_record = None
+        # Sketches e totais por grupo somados de cada mês (AAAA-MM), calculados sob demanda
+        self.month_sketches = {}
+        self.month_groups = {}
+
+    @classmethod
+    def from_history(cls, history):
+        """
+        Cria os agregados a partir de registros do histórico.
+
+        Args:
+            history (sequence): Registros do histórico
+
+        Returns:
+            DailyAggregates: Agregados por dia
+        """
+        aggregates = cls()
+        for bet in history:
+            aggregates.add(bet)
+        return aggregates
+
+    def add(self, bet):
+        """
+        Acrescenta uma aposta aos totais do seu dia.
+
+        Args:
+            bet (dict): Registro do histórico
+        """
+        day = bet['timestamp'].split(' ')[0]
+        bucket = self.buckets.get(day)
+        if bucket is None:
+            bucket = {'count': 0, 'success': 0, 'error': 0, 'odds_sum': 0.0, 'races': set(), 'horses': set(),
+                      'groups': {field: {} for field in GROUP_FIELDS}, 'sketches': {}}
+            self.buckets[day] = bucket
+            bisect.insort(self.days, day)
+
+        self.records += 1
+        self.last_record = self.record_id(bet)
+        self.month_sketches.pop(day[:7], None)
+        self.month_groups.pop(day[:7], None)
+
+        bucket['count'] += 1
+
+        # Contagem por status
+        success = 'Sucesso' in bet['status']
+        if success:
+            bucket['success'] += 1
+        elif 'Erro' in bet['status']:
+            bucket['error'] += 1
+
+        # Odds
+        try:
+            odds = float(str(bet['odds']).replace(',', '.'))
+        except (KeyError, ValueError):
+            odds = 0.0
+        bucket['odds_sum'] += odds
+
+        # Corridas e cavalos distintos
+        bucket['races'].add(bet.get('race_name', ''))
+        bucket['horses'].add(bet.get('horse', ''))
+
+        # Totais por corrida, cavalo e tipo de aposta
+        for field in GROUP_FIELDS:
+            by_key = bucket['groups'][field]
+            key = str(bet.get(field, '')).strip()
+            totals = by_key.get(key)
+            if totals is None:
+                totals = by_key[key] = {'count': 0, 'success': 0, 'odds_sum': 0.0}
+            totals['count'] += 1
+            totals['success'] += success
+            totals['odds_sum'] += odds
+
+        # Sketches de quantis por métrica e por canal
+        channel = bet.get('channel', '')
+        for metric, value in bet_metrics(bet).items():
+            by_channel = bucket['sketches'].setdefault(metric, {})
+            sketch = by_channel.get(channel)
+            if sketch is None:
+                sketch = by_channel[channel] = TDigest()
+            sketch.add(value)
+
+    def window(self, start_day=None, end_day=None, max_days=7):
+        """
+        Soma os totais dos dias de um intervalo.
+
+        Args:
+            start_day (str, optional): Primeiro dia (AAAA-MM-DD); sem limite se None
+            end_day (str, optional): Último dia (AAAA-MM-DD); sem limite se None
+            max_days (int): Número de dias mais recentes nas séries do gráfico de barras
+
+        Returns:
+            dict: Estatísticas do período, no formato usado pelo StatisticsWidget
+        """
+        first = bisect.bisect_left(self.days, start_day) if start_day else 0
+        last = bisect.bisect_right(self.days, end_day) if end_day else len(self.days)
+        days = self.days[first:last]
+
+        stats = {
+            'total': 0,
+            'success': 0,
+            'error': 0,
+            'success_rate': 0,
+            'daily_bets': {},
+            'avg_odds': 0,
+            'total_odds': 0,
+            'races': set(),
+            'horses': set()
+        }
+        for day in days:
+            bucket = self.buckets[day]
+            stats['total'] += bucket['count']
+            stats['success'] += bucket['success']
+            stats['error'] += bucket['error']
+            stats['total_odds'] += bucket['odds_sum']
+            stats['daily_bets'][day] = bucket['count']
+            stats['races'] |= bucket['races']
+            stats['horses'] |= bucket['horses']
+
+        # Calcula médias e taxas
+        if stats['total'] > 0:
+            stats['success_rate'] = round((stats['success'] / stats['total']) * 100, 2)
+            stats['avg_odds'] = round(stats['total_odds'] / stats['total'], 2)
+
+        # Dias mais recentes para o gráfico de barras
+        stats['sorted_days'] = days[-max_days:]
+        stats['daily_counts'] = [stats['daily_bets'][day] for day in stats['sorted_days']]
+
+        # Totais por corrida, cavalo e tipo de aposta (ver top_groups)
+        stats['groups'] = self.period_groups(days)
+
+        # Percentis de cada métrica, por canal e no total
+        channel_sketches = self.period_sketches(days)
+        stats['channel_quantiles'] = {
+            metric: {channel: summarize_sketch(sketch) for channel, sketch in by_channel.items()}
+            for metric, by_channel in channel_sketches.items()
+        }
+        stats['quantiles'] = {
+            metric: summarize_sketch(self.total_sketch(by_channel))
+            for metric, by_channel in channel_sketches.items()
+        }
+
+        return stats
+
+    def period_sketches(self, days):
+        """
+        Soma os sketches de quantis dos dias informados, por métrica e por canal.
+        Meses com todos os seus dias no período usam a soma do mês, calculada uma
+        única vez, em vez de somar os dias um a um.
+
+        Args:
+            days (list): Dias do período, em ordem crescente
+
+        Returns:
+            dict: Métrica -> canal -> TDigest
+        """
+        sketches = {}
+        for month, month_days, complete in self.month_spans(days):
+            if complete:
+                merge_sketches(sketches, self.month_sketch(month, month_days))
+            else:
+                for day in month_days:
+                    merge_sketches(sketches, self.buckets[day]['sketches'])
+        return sketches
+
+    def period_groups(self, days):
+        """
+        Soma os totais por corrida, cavalo e tipo de aposta dos dias informados,
+        usando a soma de cada mês completo, como em period_sketches.
+
+        Args:
+            days (list): Dias do período, em ordem crescente
+
+        Returns:
+            dict: Campo (ver GROUP_FIELDS) -> valor -> totais ('count', 'success', 'odds_sum')
+        """
+        groups = {field: {} for field in GROUP_FIELDS}
+        for month, month_days, complete in self.month_spans(days):
+            if complete:
+                merge_groups(groups, self.month_group(month, month_days))
+            else:
+                for day in month_days:
+                    merge_groups(groups, self.buckets[day]['groups'])
+        return groups
+
+    def month_spans(self, days):
+        """
+        Divide os dias de um período por mês.
+
+        Yields:
+            tuple: (mês AAAA-MM, dias do período no mês, True se o período contém todos os dias do mês)
+        """
+        for month, month_days in itertools.groupby(days, key=lambda day: day[:7]):
+            month_days = list(month_days)
+            first = bisect.bisect_left(self.days, month)
+            last = bisect.bisect_left(self.days, month + '~')
+            yield month, month_days, len(month_days) == last - first
+
+    def month_sketch(self, month, days):
+        """Retorna (calculando na primeira vez) os sketches somados dos dias de um mês."""
+        if month not in self.month_sketches:
+            sketches = {}
+            for day in days:
+                merge_sketches(sketches, self.buckets[day]['sketches'])
+            for by_channel in sketches.values():
+                for sketch in by_channel.values():
+                    sketch.compress()
+            self.month_sketches[month] = sketches
+        return self.month_sketches[month]
+
+    def month_group(self, month, days):
+        """Retorna (calculando na primeira vez) os totais por grupo somados dos dias de um mês."""
+        if month not in self.month_groups:
+            groups = {field: {} for field in GROUP_FIELDS}
+            for day in days:
+                merge_groups(groups, self.buckets[day]['groups'])
+            self.month_groups[month] = groups
+        return self.month_groups[month]
+
+    @staticmethod
+    def total_sketch(by_channel):
+        """Soma os sketches de todos os canais de uma métrica."""
+        total = TDigest()
+        for sketch in by_channel.values():
+            total.merge(sketch)
+        return total
+
+    @staticmethod
+    def record_id(bet):
+        """Identifica um registro do histórico, para conferir se os agregados gravados ainda valem."""
+        return [bet.get('timestamp'), bet.get('idempotency_key'), bet.get('horse')]
+
+    def to_dict(self):
+        """
+        Converte os agregados em um dicionário serializável em JSON.
+
+        Returns:
+            dict: Versão do formato, registros somados, identificação do último e totais por dia
+        """
+        buckets = {}
+        for day, bucket in self.buckets.items():
+            buckets[day] = dict(bucket)
+            buckets[day]['races'] = sorted(bucket['races'])
+            buckets[day]['horses'] = sorted(bucket['horses'])
+            buckets[day]['sketches'] = {
+                metric: {channel: sketch.to_dict() for channel, sketch in by_channel.items()}
+                for metric, by_channel in bucket['sketches'].items()
+            }
+        return {'version': self.version, 'records': self.records, 'last_record': self.last_record,
+                'buckets': buckets}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Recria os agregados a partir de to_dict.
+
+        Args:
+            data (dict): Dicionário retornado por to_dict
+
+        Returns:
+            DailyAggregates: Agregados recriados
+        """
+        aggregates = cls()
+        aggregates.version = data.get('version')
+        aggregates.records = data['records']
+        aggregates.last_record = data['last_record']
+        for day, bucket in data['buckets'].items():
+            bucket['races'] = set(bucket['races'])
+            bucket['horses'] = set(bucket['horses'])
+            bucket['sketches'] = {
+                metric: {channel: TDigest.from_dict(sketch) for channel, sketch in by_channel.items()}
+                for metric, by_channel in bucket['sketches'].items()
+            }
+            aggregates.buckets[day] = bucket
+        aggregates.days = sorted(aggregates.buckets)
+        return aggregates
+
+    def save(self, file_path):
+        """
+        Grava os agregados em arquivo.
+
+        Args:
+            file_path (str): Caminho do arquivo
+
+        Returns:
+            bool: True se os agregados foram gravados com sucesso, False caso contrário
+        """
+        try:
+            # Grava em um arquivo temporário e substitui o anterior de uma só vez
+            temp_path = file_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(self.to_dict(), f)
+            os.replace(temp_path, file_path)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar agregados do histórico: {str(e)}")
+            return False
+
+    @classmethod
+    def load_or_build(cls, history, file_path):
+        """
+        Obtém os agregados do histórico reaproveitando os gravados em arquivo.
+
+        Se o arquivo corresponde ao início do histórico, apenas os registros seguintes
+        são somados; caso contrário (histórico limpo ou alterado, ou arquivo de outra
+        versão), os agregados são recalculados. O arquivo é regravado quando houver registros novos.
+
+        Args:
+            history (sequence): Registros do histórico
+            file_path (str): Caminho do arquivo de agregados
+
+        Returns:
+            DailyAggregates: Agregados de todo o histórico
+        """
+        aggregates = None
+        try:
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    aggregates = cls.from_dict(json.load(f))
+        except Exception as e:
+            print(f"Erro ao carregar agregados do histórico: {str(e)}")
+
+        # Os agregados gravados precisam estar no formato atual e corresponder aos
+        # primeiros registros do histórico
+        if aggregates is not None and aggregates.version != AGGREGATES_VERSION:
+            aggregates = None
+        if aggregates is not None:
+            records = aggregates.records
+            if records > len(history) or (records and cls.record_id(history[records - 1]) != aggregates.last_record):
+                aggregates = None
+
+        if aggregates is None:
+            aggregates = cls()
+        start = aggregates.records
+
+        for bet in history[start:]:
+            aggregates.add(bet)
+
+        if aggregates.records != start or not os.path.exists(file_path):
+            aggregates.save(file_path)
+
+        return aggregates
+
+
+def merge_sketches(target, sketches):
+    """
+    Soma sketches de quantis organizados por métrica e por canal.
+
+    Args:
+        target (dict): Métrica -> canal -> TDigest (alterado no lugar)
+        sketches (dict): Sketches a somar, na mesma organização
+
+    Returns:
+        dict: target
+    """
+    for metric, by_channel in sketches.items():
+        target_channels = target.setdefault(metric, {})
+        for channel, sketch in by_channel.items():
+            if channel not in target_channels:
+                target_channels[channel] = TDigest()
+            target_channels[channel].merge(sketch)
+    return target
+
+
+def summarize_sketch(sketch, percentiles=QUANTILE_PERCENTILES):
+    """
+    Calcula os percentis de um sketch.
+
+    Returns:
+        dict: {'count': n, percentil: valor}
+    """
+    summary = {'count': len(sketch)}
+    for p in percentiles:
+        summary[p] = sketch.percentile(p)
+    return summary
+
+
+def merge_groups(target, groups):
+    """
+    Soma totais por corrida, cavalo e tipo de aposta.
+
+    Args:
+        target (dict): Campo -> valor -> totais (alterado no lugar)
+        groups (dict): Totais a somar, na mesma organização
+
+    Returns:
+        dict: target
+    """
+    for field, by_key in groups.items():
+        target_keys = target.setdefault(field, {})
+        for key, totals in by_key.items():
+            target_totals = target_keys.get(key)
+            if target_totals is None:
+                target_keys[key] = dict(totals)
+            else:
+                target_totals['count'] += totals['count']
+                target_totals['success'] += totals['success']
+                target_totals['odds_sum'] += totals['odds_sum']
+    return target
+
+
+def top_groups(by_key, n=10, order='count', min_bets=1):
+    """
+    Seleciona os grupos (corridas, cavalos ou tipos de aposta) com mais apostas
+    ou com maior taxa de sucesso, sem ordenar todos os grupos.
+
+    Args:
+        by_key (dict): Valor -> totais, como em window()['groups'][campo]
+        n (int): Número de grupos retornados
+        order (str): 'count' (número de apostas) ou 'success_rate' (taxa de sucesso;
+            empates são decididos pelo número de apostas)
+        min_bets (int): Número mínimo de apostas para o grupo ser considerado
+
+    Returns:
+        list: Até n dicionários com 'name', 'count', 'success', 'success_rate' (%) e 'avg_odds'
+    """
+    if order == 'success_rate':
+        sort_key = lambda item: (item[1]['success'] / item[1]['count'], item[1]['count'])
+    else:
+        sort_key = lambda item: (item[1]['count'], item[1]['success'])
+
+    candidates = (item for item in by_key.items() if item[1]['count'] >= min_bets)
+    return [
+        {
+            'name': name,
+            'count': totals['count'],
+            'success': totals['success'],
+            'success_rate': round(totals['success'] / totals['count'] * 100, 2),
+            'avg_odds': round(totals['odds_sum'] / totals['count'], 2)
+        }
+        for name, totals in heapq.nlargest(n, candidates, key=sort_key)
+    ]
@@ -0,0 +1,41 @@
+import sys
+import hashlib
+
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.rpa.market_cache import normalize_name
+
+
+def selection_hash(bet_data):
+    """
+    Calcula o hash da seleção de uma aposta (corrida, número, cavalo e tipo).
+
+    Args:
+        bet_data (dict): Dados da aposta
+
+    Returns:
+        str: Hash hexadecimal de 16 caracteres
+    """
+    selection = '|'.join([
+        normalize_name(bet_data.get('race_name')),
+        str(bet_data.get('race_number', '')).strip(),
+        normalize_name(bet_data.get('horse')),
+        normalize_name(bet_data.get('bet_type'))
+    ])
+    return hashlib.sha1(selection.encode('utf-8')).hexdigest()[:16]
+
+
+def make_idempotency_key(message_id, bet_data, chat_id=None):
+    """
+    Gera a chave de idempotência de uma aposta a partir do ID da mensagem e da seleção.
+    A mesma mensagem gera sempre a mesma chave, inclusive após reinícios.
+
+    Args:
+        message_id (int): ID da mensagem do Telegram
+        bet_data (dict): Dados da aposta
+        chat_id (str, optional): ID do chat de origem
+
+    Returns:
+        str: Chave de idempotência
+    """
+    return f"{chat_id or ''}:{message_id}:{selection_hash(bet_data)}"
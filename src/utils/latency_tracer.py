@@ -0,0 +1,161 @@
+import sys
+import time
+
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.utils.quantile_sketch import TDigest
+
+# Etapas do caminho de uma aposta, na ordem em que ocorrem
+STAGES = ['telegram', 'handle_message', 'parsed', 'process_bet', 'login', 'placed', 'status_update']
+
+# Descrição da duração que termina em cada etapa
+STAGE_LABELS = {
+    'handle_message': 'Telegram → recebimento',
+    'parsed': 'Análise da mensagem',
+    'process_bet': 'Fila de execução',
+    'login': 'Login',
+    'placed': 'Realização da aposta',
+    'status_update': 'Atualização de status',
+    'total': 'Total'
+}
+
+
+def mark_stage(bet_data, stage, timestamp=None):
+    """
+    Registra o instante (relógio monotônico) em que a aposta atingiu uma etapa.
+
+    Args:
+        bet_data (dict): Dados da aposta; o rastro é mantido em bet_data['trace']
+        stage (str): Nome da etapa (ver STAGES)
+        timestamp (float, optional): Instante monotônico (padrão: agora)
+    """
+    bet_data.setdefault('trace', {})[stage] = time.monotonic() if timestamp is None else timestamp
+
+
+def monotonic_from_wall(wall_timestamp):
+    """
+    Converte um timestamp de relógio de parede (ex.: data da mensagem do Telegram)
+    para a escala do relógio monotônico.
+    """
+    return time.monotonic() - (time.time() - wall_timestamp)
+
+
+def trace_offsets(trace):
+    """
+    Converte um rastro de instantes monotônicos em deslocamentos, em milissegundos,
+    a partir da primeira etapa registrada. É o formato gravado no histórico.
+
+    Args:
+        trace (dict): Etapa -> instante monotônico
+
+    Returns:
+        dict: Etapa -> milissegundos desde a primeira etapa
+    """
+    if not trace:
+        return {}
+
+    origin = min(trace.values())
+    return {stage: round((value - origin) * 1000, 3) for stage, value in trace.items()}
+
+
+def stage_durations(offsets):
+    """
+    Calcula a duração de cada etapa a partir dos deslocamentos gravados.
+    A duração de uma etapa é o tempo desde a etapa anterior presente no rastro.
+
+    Args:
+        offsets (dict): Etapa -> milissegundos desde a primeira etapa
+
+    Returns:
+        dict: Etapa -> duração em milissegundos, incluindo 'total'
+    """
+    durations = {}
+    present = [stage for stage in STAGES if stage in offsets]
+
+    for previous, stage in zip(present, present[1:]):
+        durations[stage] = offsets[stage] - offsets[previous]
+
+    if len(present) > 1:
+        durations['total'] = offsets[present[-1]] - offsets[present[0]]
+
+    return durations
+
+
+def percentile(sorted_values, p):
+    """
+    Calcula um percentil por interpolação linear.
+
+    Args:
+        sorted_values (list): Valores em ordem crescente
+        p (float): Percentil entre 0 e 100
+
+    Returns:
+        float: Valor do percentil ou None se a lista estiver vazia
+    """
+    if not sorted_values:
+        return None
+
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def add_trace_samples(samples, offsets):
+    """
+    Acrescenta as durações de um rastro aos sketches de quantis de cada etapa.
+
+    Args:
+        samples (dict): Etapa -> TDigest das durações (alterado no lugar)
+        offsets (dict): Rastro gravado no histórico (etapa -> milissegundos)
+    """
+    for stage, duration in stage_durations(offsets or {}).items():
+        if stage not in samples:
+            samples[stage] = TDigest()
+        samples[stage].add(duration)
+
+
+def summarize_samples(samples, percentiles=(50, 95, 99)):
+    """
+    Calcula os percentis dos sketches de cada etapa.
+
+    Returns:
+        dict: Etapa -> {'count': n, percentil: valor em ms}
+    """
+    result = {}
+    for stage, sketch in samples.items():
+        result[stage] = {'count': len(sketch)}
+        for p in percentiles:
+            result[stage][p] = sketch.percentile(p)
+    return result
+
+
+def collect_samples(history):
+    """
+    Reúne as durações de cada etapa sobre o histórico de apostas, em sketches de
+    quantis de memória constante.
+
+    Args:
+        history (sequence): Registros do histórico com o campo 'trace'
+
+    Returns:
+        dict: Etapa -> TDigest das durações em ms
+    """
+    samples = {}
+    for bet in history:
+        add_trace_samples(samples, bet.get('trace'))
+    return samples
+
+
+def latency_percentiles(history, percentiles=(50, 95, 99)):
+    """
+    Calcula os percentis de latência por etapa sobre o histórico de apostas.
+
+    Args:
+        history (list): Registros do histórico com o campo 'trace'
+        percentiles (tuple): Percentis a calcular
+
+    Returns:
+        dict: Etapa -> {'count': n, percentil: valor em ms}
+    """
+    return summarize_samples(collect_samples(history), percentiles)
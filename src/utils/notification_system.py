@@ -14,9 +14,9 @@ class NotificationSystem:
     Sistema de notificações para o Bot de Apostas Automatizado.
     Implementa notificações via toast (notificações do sistema) e ícone na bandeja do sistema.
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, config_manager=None):
         self.parent = parent
-        self.config_manager = ConfigManager()
+        self.config_manager = config_manager or ConfigManager()
         
         # Verifica se o sistema suporta notificações na bandeja
         self.tray_supported = QSystemTrayIcon.isSystemTrayAvailable()
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import uuid
+import threading
+
+# Campos dos dados da aposta que não são gravados no log (o rastro de latência usa o
+# relógio monotônico, que não vale após um reinício)
+EXCLUDED_FIELDS = ('trace',)
+
+
+class PendingBetLog:
+    """
+    Log de escrita antecipada (write-ahead log) das apostas aceitas e ainda não executadas.
+
+    Cada aposta aceita é gravada no arquivo (uma linha JSON, com fsync) assim que é
+    recebida, antes de entrar na fila, e marcada como concluída quando seu resultado é
+    gravado no histórico (ou quando é descartada como duplicada).
+    Após uma falha, recover retorna as apostas aceitas e não concluídas, para que voltem
+    à fila. O arquivo é separado do histórico.
+
+    A cada checkpoint_every registros, o arquivo é reescrito apenas com as apostas
+    pendentes (checkpoint): o log não cresce com as apostas concluídas e a recuperação
+    lê poucas linhas, qualquer que seja o tempo de execução.
+    """
+    def __init__(self, file_path, checkpoint_every=500, max_age=900, sync=True, clock=time.time):
+        """
+        Inicializa o log.
+
+        Args:
+            file_path (str): Caminho do arquivo do log
+            checkpoint_every (int): Número de registros gravados entre dois checkpoints
+            max_age (float): Idade máxima, em segundos, das apostas sem horário de largada retomadas
+            sync (bool): Força a gravação em disco (fsync) a cada registro
+            clock (callable): Relógio usado para comparar os prazos
+        """
+        self.file_path = file_path
+        self.checkpoint_every = checkpoint_every
+        self.max_age = max_age
+        self.sync = sync
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        # Apostas pendentes, por identificador, e registros gravados desde o último checkpoint
+        self.pending = {}
+        self.records = 0
+        self.file = None
+
+    @staticmethod
+    def entry_id(bet_data):
+        """
+        Retorna (criando na primeira chamada) o identificador da aposta no log.
+        Cada sinal recebido tem seu próprio identificador, mesmo as mensagens repetidas.
+        """
+        if not bet_data.get('pending_id'):
+            bet_data['pending_id'] = uuid.uuid4().hex
+        return bet_data['pending_id']
+
+    def append(self, bet_data):
+        """
+        Grava uma aposta aceita.
+
+        Args:
+            bet_data (dict): Dados da aposta (com o prazo já calculado pelo BetScheduler)
+        """
+        entry_id = self.entry_id(bet_data)
+        record = {
+            'op': 'add',
+            'id': entry_id,
+            'accepted_at': self.clock(),
+            'bet': {key: value for key, value in bet_data.items() if key not in EXCLUDED_FIELDS}
+        }
+        with self.lock:
+            self.pending[entry_id] = record
+            self.write(record)
+
+    def mark_done(self, bet_data):
+        """
+        Marca uma aposta como concluída (realizada, com erro ou expirada).
+
+        Args:
+            bet_data (dict): Dados da aposta gravada por append
+        """
+        entry_id = bet_data.get('pending_id')
+        with self.lock:
+            if entry_id not in self.pending:
+                return
+            del self.pending[entry_id]
+            self.write({'op': 'done', 'id': entry_id})
+
+    def write(self, record):
+        """Grava um registro no final do log. Deve ser chamado com o lock adquirido."""
+        try:
+            if self.file is None:
+                self.file = open(self.file_path, 'a', encoding='utf-8')
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.file.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())
+
+            self.records += 1
+            if self.records >= self.checkpoint_every:
+                self.checkpoint()
+        except Exception as e:
+            print(f"Erro ao gravar o log de apostas pendentes: {str(e)}")
+
+    def checkpoint(self):
+        """
+        Reescreve o log apenas com as apostas pendentes.
+        Deve ser chamado com o lock adquirido.
+        """
+        try:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+            # Grava em um arquivo temporário e substitui o log de uma só vez
+            temp_path = self.file_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in self.pending.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                if self.sync:
+                    os.fsync(f.fileno())
+            os.replace(temp_path, self.file_path)
+            self.records = 0
+        except Exception as e:
+            print(f"Erro ao gravar o checkpoint do log de apostas pendentes: {str(e)}")
+
+    def recover(self, skip_keys=()):
+        """
+        Lê o log e retorna as apostas aceitas e não concluídas.
+        Em seguida, grava um checkpoint apenas com as apostas retomadas.
+
+        As apostas com idempotency_key em skip_keys (já gravadas no histórico) são
+        consideradas concluídas: a falha ocorreu depois da gravação do resultado. Das
+        apostas com a mesma idempotency_key (mensagem repetida gravada antes de ser
+        descartada), apenas a primeira é retomada.
+        Uma falha entre a realização da aposta e a gravação do histórico é coberta
+        pela chave de idempotência enviada ao site.
+
+        Args:
+            skip_keys (set): Chaves de idempotência já registradas no histórico
+
+        Returns:
+            tuple: (apostas retomadas, apostas cujo prazo já passou), na ordem de aceitação
+        """
+        pending = {}
+        try:
+            if os.path.exists(self.file_path):
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # Linha incompleta, gravada no momento da falha
+                            continue
+                        if record['op'] == 'add':
+                            pending[record['id']] = record
+                        else:
+                            pending.pop(record['id'], None)
+        except Exception as e:
+            print(f"Erro ao ler o log de apostas pendentes: {str(e)}")
+
+        now = self.clock()
+        resumed = []
+        expired = []
+        seen_keys = set(skip_keys)
+        with self.lock:
+            self.pending = {}
+            for entry_id, record in pending.items():
+                bet_data = record['bet']
+                idempotency_key = bet_data.get('idempotency_key')
+                if idempotency_key in seen_keys:
+                    continue
+                if idempotency_key:
+                    seen_keys.add(idempotency_key)
+
+                deadline = bet_data.get('deadline')
+                if deadline is None:
+                    too_late = now - record['accepted_at'] > self.max_age
+                else:
+                    too_late = deadline <= now
+
+                if too_late:
+                    expired.append(bet_data)
+                else:
+                    self.pending[entry_id] = record
+                    resumed.append(bet_data)
+
+            self.checkpoint()
+
+        return resumed, expired
+
+    def clear(self):
+        """Descarta todas as apostas pendentes."""
+        with self.lock:
+            self.pending = {}
+            self.checkpoint()
+
+    def close(self):
+        """Fecha o arquivo do log."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __len__(self):
+        return len(self.pending)
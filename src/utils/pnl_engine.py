@@ -0,0 +1,317 @@
+import sys
+import numpy as np
+
+# Importa os módulos do projeto
+sys.path.append('/home/ubuntu/BotApostasAutomatizado')
+from src.utils.bet_history_manager import SETTLEMENT_RESULTS
+
+# Tipos de aposta reconhecidos, na ordem dos códigos usados nos vetores
+BET_TYPES = ['Win', 'Place', 'E/W']
+
+# Grafias aceitas para cada tipo de aposta (em maiúsculas, sem espaços)
+BET_TYPE_ALIASES = {
+    'WIN': 0,
+    'PLACE': 1,
+    'E/W': 2,
+    'EW': 2,
+    'EACHWAY': 2
+}
+
+# Código de cada resultado de liquidação (índice em SETTLEMENT_RESULTS)
+RESULT_CODES = {result: code for code, result in enumerate(SETTLEMENT_RESULTS)}
+WON, PLACED, LOST, VOID = (RESULT_CODES[result] for result in ('won', 'placed', 'lost', 'void'))
+
+
+def bet_type_code(bet_type):
+    """
+    Converte o tipo de aposta do sinal no código usado pelo motor.
+
+    Args:
+        bet_type (str): Tipo informado na mensagem (ex.: 'Win', 'E/W', 'Each Way')
+
+    Returns:
+        int: Índice em BET_TYPES ou -1 se o tipo não for reconhecido
+    """
+    return BET_TYPE_ALIASES.get(str(bet_type).upper().replace(' ', '').replace('-', ''), -1)
+
+
+def parse_amount(value, default=0.0):
+    """Converte valores como '2,50' ou '2.50' em float, retornando o padrão se inválido."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return default
+    try:
+        return float(str(value).replace(',', '.'))
+    except (TypeError, ValueError):
+        return default
+
+
+class PnlEngine:
+    """
+    Motor de lucro e prejuízo (P&L) das apostas liquidadas.
+
+    Os registros são convertidos uma única vez em vetores NumPy, em ordem cronológica.
+    Cada relatório (ROI, taxa de acerto, drawdown e os resultados por canal e por tipo
+    de aposta) é calculado sobre esses vetores, sem laços em Python por aposta.
+
+    Nas apostas E/W o stake é o valor de cada parte: o total apostado é o dobro do
+    stake e a parte 'place' paga a fração place_fraction das odds.
+    """
+    def __init__(self, timestamps, stakes, odds, results, bet_types, channels, channel_names,
+                 explicit_returns, place_fraction=0.25):
+        """
+        Inicializa o motor com os vetores das apostas liquidadas.
+        Use PnlEngine.from_history para criá-lo a partir do histórico.
+
+        Args:
+            timestamps (ndarray): Data/hora das apostas (AAAA-MM-DD HH:MM:SS), em ordem crescente
+            stakes (ndarray): Stake de cada aposta
+            odds (ndarray): Odds de cada aposta
+            results (ndarray): Código do resultado (índice em SETTLEMENT_RESULTS)
+            bet_types (ndarray): Código do tipo de aposta (índice em BET_TYPES)
+            channels (ndarray): Código do canal (índice em channel_names)
+            channel_names (list): Canais de origem das apostas
+            explicit_returns (ndarray): Retorno informado na liquidação (NaN se ausente)
+            place_fraction (float): Fração das odds paga pela parte 'place' das apostas E/W
+        """
+        self.timestamps = timestamps
+        self.results = results
+        self.bet_types = bet_types
+        self.channels = channels
+        self.channel_names = channel_names
+
+        each_way = bet_types == BET_TYPES.index('E/W')
+        won = results == WON
+        placed = won | (results == PLACED)
+        void = results == VOID
+
+        # Valor apostado: as apostas anuladas não contam
+        self.staked = np.where(void, 0.0, np.where(each_way, 2 * stakes, stakes))
+
+        # Retorno calculado pelas odds de cada tipo de aposta
+        place_odds = 1 + (odds - 1) * place_fraction
+        win_part = np.where(won, stakes * odds, 0.0)
+        returns = np.where(
+            bet_types == BET_TYPES.index('Place'),
+            np.where(placed, stakes * odds, 0.0),
+            win_part + np.where(each_way & placed, stakes * place_odds, 0.0)
+        )
+
+        # O retorno informado na liquidação prevalece sobre o calculado
+        returns = np.where(np.isnan(explicit_returns), returns, explicit_returns)
+        self.returns = np.where(void, 0.0, returns)
+        self.profit = self.returns - self.staked
+
+        # Acerto: vitória, ou colocação em apostas Place
+        self.counted = ~void
+        self.hits = won | (placed & (bet_types == BET_TYPES.index('Place')))
+
+    @classmethod
+    def from_history(cls, history, place_fraction=0.25):
+        """
+        Cria o motor a partir dos registros do histórico.
+        Apenas apostas realizadas com sucesso e com resultado de liquidação são consideradas.
+
+        Args:
+            history (sequence): Registros do histórico
+            place_fraction (float): Fração das odds paga pela parte 'place' das apostas E/W
+
+        Returns:
+            PnlEngine: Motor com as apostas liquidadas
+        """
+        rows = []
+        bet_type_codes = {}
+        for bet in history:
+            result = RESULT_CODES.get(bet.get('result'))
+            if result is None or 'Sucesso' not in bet.get('status', ''):
+                continue
+
+            # Poucos tipos distintos: a conversão é feita uma vez por grafia
+            bet_type = bet_type_codes.get(bet.get('bet_type'))
+            if bet_type is None:
+                bet_type = bet_type_codes[bet.get('bet_type')] = bet_type_code(bet.get('bet_type', ''))
+            if bet_type < 0:
+                continue
+
+            rows.append((
+                bet['timestamp'],
+                parse_amount(bet.get('stake')),
+                parse_amount(bet.get('odds')),
+                result,
+                bet_type,
+                bet.get('channel', ''),
+                parse_amount(bet.get('returns'), np.nan)
+            ))
+
+        if rows:
+            timestamps, stakes, odds, results, bet_types, channels, explicit_returns = zip(*rows)
+        else:
+            timestamps = stakes = odds = results = bet_types = channels = explicit_returns = ()
+
+        # Ordem cronológica, necessária para o drawdown
+        timestamps = np.array(timestamps, dtype='U19')
+        order = np.argsort(timestamps, kind='stable')
+        channel_names, channel_codes = np.unique(np.array(channels, dtype=str), return_inverse=True)
+
+        return cls(
+            timestamps[order],
+            np.array(stakes, dtype=float)[order],
+            np.array(odds, dtype=float)[order],
+            np.array(results, dtype=int)[order],
+            np.array(bet_types, dtype=int)[order],
+            channel_codes.astype(int)[order],
+            channel_names.tolist(),
+            np.array(explicit_returns, dtype=float)[order],
+            place_fraction
+        )
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def period_slice(self, start_day=None, end_day=None):
+        """
+        Retorna o intervalo dos vetores com as apostas de um período.
+
+        Args:
+            start_day (str, optional): Primeiro dia (AAAA-MM-DD); sem limite se None
+            end_day (str, optional): Último dia (AAAA-MM-DD); sem limite se None
+
+        Returns:
+            slice: Intervalo correspondente nos vetores
+        """
+        first = np.searchsorted(self.timestamps, start_day, side='left') if start_day else 0
+        last = np.searchsorted(self.timestamps, end_day + '~', side='right') if end_day else len(self.timestamps)
+        return slice(int(first), int(last))
+
+    def report(self, start_day=None, end_day=None):
+        """
+        Calcula o resultado financeiro de um período.
+
+        Args:
+            start_day (str, optional): Primeiro dia (AAAA-MM-DD); sem limite se None
+            end_day (str, optional): Último dia (AAAA-MM-DD); sem limite se None
+
+        Returns:
+            dict: Totais do período ('bets', 'staked', 'returns', 'profit', 'roi',
+                'strike_rate', 'max_drawdown') e os mesmos totais por canal
+                ('by_channel') e por tipo de aposta ('by_type')
+        """
+        period = self.period_slice(start_day, end_day)
+        staked = self.staked[period]
+        returns = self.returns[period]
+        profit = self.profit[period]
+        counted = self.counted[period]
+        hits = self.hits[period] & counted
+
+        report = summarize(counted.sum(), hits.sum(), staked.sum(), returns.sum(), max_drawdown(profit))
+        report['by_channel'] = grouped_report(self.channels[period], len(self.channel_names), self.channel_names,
+                                              counted, hits, staked, returns, profit)
+        report['by_type'] = grouped_report(self.bet_types[period], len(BET_TYPES), BET_TYPES,
+                                           counted, hits, staked, returns, profit)
+        return report
+
+
+def summarize(bets, hits, staked, returns, drawdown):
+    """
+    Monta os totais de um grupo de apostas.
+
+    Returns:
+        dict: Apostas, valor apostado, retorno, lucro, ROI (%), taxa de acerto (%) e drawdown máximo
+    """
+    profit = returns - staked
+    return {
+        'bets': int(bets),
+        'staked': round(float(staked), 2),
+        'returns': round(float(returns), 2),
+        'profit': round(float(profit), 2),
+        'roi': round(float(profit / staked * 100), 2) if staked > 0 else 0,
+        'strike_rate': round(float(hits / bets * 100), 2) if bets > 0 else 0,
+        'max_drawdown': round(float(drawdown), 2)
+    }
+
+
+def max_drawdown(profit):
+    """
+    Calcula a maior queda do lucro acumulado em relação ao pico anterior.
+
+    Args:
+        profit (ndarray): Lucro de cada aposta, em ordem cronológica
+
+    Returns:
+        float: Drawdown máximo (valor positivo; 0 se o lucro acumulado nunca caiu)
+    """
+    if len(profit) == 0:
+        return 0.0
+
+    cumulative = np.cumsum(profit)
+    peak = np.maximum.accumulate(np.maximum(cumulative, 0))
+    return float((peak - cumulative).max())
+
+
+def grouped_report(codes, group_count, names, counted, hits, staked, returns, profit):
+    """
+    Calcula os totais de cada grupo (canal ou tipo de aposta) de uma só vez.
+
+    Args:
+        codes (ndarray): Código do grupo de cada aposta, em ordem cronológica
+        group_count (int): Número de grupos
+        names (list): Nome de cada grupo
+        counted, hits (ndarray): Máscaras das apostas contadas e dos acertos
+        staked, returns, profit (ndarray): Valores de cada aposta
+
+    Returns:
+        dict: Nome do grupo -> totais (ver summarize), apenas para grupos com apostas
+    """
+    bets = np.bincount(codes, weights=counted, minlength=group_count)
+    group_hits = np.bincount(codes, weights=hits, minlength=group_count)
+    group_staked = np.bincount(codes, weights=staked, minlength=group_count)
+    group_returns = np.bincount(codes, weights=returns, minlength=group_count)
+    drawdowns = grouped_max_drawdown(codes, group_count, profit)
+
+    return {
+        names[group]: summarize(bets[group], group_hits[group], group_staked[group], group_returns[group],
+                                drawdowns[group])
+        for group in np.flatnonzero(bets)
+    }
+
+
+def grouped_max_drawdown(codes, group_count, profit):
+    """
+    Calcula o drawdown máximo de cada grupo sem percorrer os grupos um a um.
+
+    As apostas são ordenadas por grupo (mantendo a ordem cronológica dentro de cada um)
+    e o lucro acumulado de cada grupo é deslocado por um múltiplo do código do grupo,
+    maior que qualquer variação possível. Assim um único maximum.accumulate calcula o
+    pico de todos os grupos, pois o pico de um grupo nunca alcança os valores do seguinte.
+
+    Args:
+        codes (ndarray): Código do grupo de cada aposta, em ordem cronológica
+        group_count (int): Número de grupos
+        profit (ndarray): Lucro de cada aposta
+
+    Returns:
+        ndarray: Drawdown máximo de cada grupo
+    """
+    drawdowns = np.zeros(group_count)
+    if len(profit) == 0:
+        return drawdowns
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    sorted_profit = profit[order]
+    cumulative = np.cumsum(sorted_profit)
+
+    # Lucro acumulado desde o início de cada grupo
+    positions = np.arange(len(sorted_codes))
+    first = np.ones(len(sorted_codes), dtype=bool)
+    first[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    group_start = np.maximum.accumulate(np.where(first, positions, 0))
+    group_cumulative = cumulative - cumulative[group_start] + sorted_profit[group_start]
+
+    # Pico de cada grupo (partindo de zero), com o deslocamento por grupo
+    offset = sorted_codes * (2 * np.abs(sorted_profit).sum() + 1)
+    peak = np.maximum.accumulate(np.maximum(group_cumulative, 0) + offset) - offset
+
+    np.maximum.at(drawdowns, sorted_codes, peak - group_cumulative)
+    return drawdowns
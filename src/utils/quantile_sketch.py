@@ -0,0 +1,197 @@
+import math
+import bisect
+
+
+class TDigest:
+    """
+    Sketch de quantis (t-digest) com memória constante.
+
+    Os valores são agrupados em centroides (média e peso). Os centroides das pontas da
+    distribuição ficam pequenos e os do meio, maiores, de modo que p50, p90 e p99 são
+    estimados com boa precisão mantendo cerca de `compression` centroides, qualquer que
+    seja o número de valores. Sketches de períodos ou canais diferentes podem ser somados
+    com merge.
+
+    Enquanto houver no máximo `compression` valores distintos, nenhum é agrupado e os
+    quantis são exatos (iguais aos de percentile, por interpolação linear).
+    """
+    def __init__(self, compression=200):
+        """
+        Inicializa o sketch.
+
+        Args:
+            compression (int): Número aproximado de centroides mantidos
+        """
+        self.compression = compression
+        self.centroids = []
+        self.buffer = []
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        # Sentido da próxima compressão (alternado para não acumular erro em uma das pontas)
+        self.reverse = False
+
+    def __len__(self):
+        return int(self.count)
+
+    def add(self, value, weight=1):
+        """
+        Acrescenta um valor ao sketch.
+
+        Args:
+            value (float): Valor
+            weight (float): Peso do valor
+        """
+        self.buffer.append([value, weight])
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        # Os novos valores são agrupados em lotes
+        if len(self.buffer) >= 5 * self.compression:
+            self.compress()
+
+    def merge(self, other):
+        """
+        Soma ao sketch os valores de outro sketch.
+
+        Args:
+            other (TDigest): Sketch a somar
+
+        Returns:
+            TDigest: O próprio sketch
+        """
+        if other.count:
+            self.buffer.extend([mean, weight] for mean, weight in other.centroids + other.buffer)
+            self.count += other.count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+            if len(self.buffer) >= 5 * self.compression:
+                self.compress()
+        return self
+
+    def scale(self, q):
+        """Função de escala k1: limita o tamanho dos centroides perto das pontas."""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def scale_inverse(self, k):
+        """Inversa da função de escala."""
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def compress(self):
+        """Agrupa os valores pendentes nos centroides."""
+        if not self.buffer:
+            return
+
+        points = sorted(self.centroids + self.buffer, reverse=self.reverse)
+        self.buffer = []
+
+        # Poucos valores: mantém cada um em seu centroide
+        if len(points) <= self.compression:
+            self.centroids = sorted(points)
+            return
+
+        # Percorre os pontos em ordem, juntando-os ao centroide atual enquanto o
+        # centroide não ultrapassar uma unidade da função de escala
+        centroids = []
+        current_mean, current_weight = points[0]
+        q_start = 0.0
+        q_limit = self.scale_inverse(self.scale(q_start) + 1)
+
+        for mean, weight in points[1:]:
+            if q_start + (current_weight + weight) / self.count <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                centroids.append([current_mean, current_weight])
+                q_start += current_weight / self.count
+                q_limit = self.scale_inverse(self.scale(q_start) + 1)
+                current_mean, current_weight = mean, weight
+
+        centroids.append([current_mean, current_weight])
+        if self.reverse:
+            centroids.reverse()
+        self.centroids = centroids
+        self.reverse = not self.reverse
+
+    def quantile(self, q):
+        """
+        Estima um quantil.
+
+        Cada centroide é posicionado no centro dos índices (0 a count - 1) dos valores que
+        representa e o quantil é interpolado entre os centroides vizinhos, como em
+        percentile sobre a lista ordenada.
+
+        Args:
+            q (float): Quantil entre 0 e 1
+
+        Returns:
+            float: Valor estimado ou None se o sketch estiver vazio
+        """
+        self.compress()
+        if not self.centroids:
+            return None
+
+        target = q * (self.count - 1)
+        positions = []
+        cumulative = 0
+        for mean, weight in self.centroids:
+            positions.append(cumulative + (weight - 1) / 2)
+            cumulative += weight
+
+        # Pontas: interpola com o mínimo e o máximo
+        if target <= positions[0]:
+            if positions[0] <= 0:
+                return self.centroids[0][0]
+            return self.min + (self.centroids[0][0] - self.min) * target / positions[0]
+        if target >= positions[-1]:
+            last = self.count - 1
+            if positions[-1] >= last:
+                return self.centroids[-1][0]
+            return self.centroids[-1][0] + (self.max - self.centroids[-1][0]) * (target - positions[-1]) / (last - positions[-1])
+
+        i = bisect.bisect_right(positions, target) - 1
+        left_mean, right_mean = self.centroids[i][0], self.centroids[i + 1][0]
+        return left_mean + (right_mean - left_mean) * (target - positions[i]) / (positions[i + 1] - positions[i])
+
+    def percentile(self, p):
+        """Estima um percentil (entre 0 e 100)."""
+        return self.quantile(p / 100)
+
+    def to_dict(self):
+        """
+        Converte o sketch em um dicionário serializável em JSON.
+
+        Returns:
+            dict: Compressão, contagem, mínimo, máximo e centroides
+        """
+        self.compress()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'centroids': self.centroids
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Recria um sketch a partir de to_dict.
+
+        Args:
+            data (dict): Dicionário retornado por to_dict
+
+        Returns:
+            TDigest: Sketch recriado
+        """
+        digest = cls(data['compression'])
+        digest.centroids = [list(centroid) for centroid in data['centroids']]
+        digest.count = data['count']
+        if digest.count:
+            digest.min = data['min']
+            digest.max = data['max']
+        return digest
@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import json
+from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 # Adiciona o diretório raiz ao path para importação dos módulos
@@ -10,6 +12,28 @@ sys.path.append('/home/ubuntu/BotApostasAutomatizado')
 from src.utils.config_manager import ConfigManager
 from src.utils.bet_history_manager import BetHistoryManager
 from src.telegram.telegram_bot import TelegramBot
+from src.rpa.market_cache import MarketCache
+from src.interface.history_table_model import HistoryTableModel
+from src.interface.log_view import LogView
+from src.interface.statistics_widget import StatisticsWidget
+from src.interface.statistics_worker import StatisticsRunner
+from src.interface.bet_worker import BetRunner
+from src.rpa.bet_scheduler import BetScheduler
+from src.utils.idempotency import make_idempotency_key
+from src.utils.history_aggregates import DailyAggregates, top_groups
+from src.utils.quantile_sketch import TDigest
+from src.utils.latency_tracer import mark_stage, trace_offsets, latency_percentiles
+from src.rpa.rpa_controller import RPAController
+from src.rpa.odds_cache import OddsCache, minimum_acceptable_odds
+from src.rpa.odds_refresher import OddsRefresher
+from src.rpa.mock_exchange import MockExchange, MockExchangeServer
+from src.benchmark import run_rpa_benchmark, parse_importtime
+from src.daemon import BotDaemon
+from src.pipeline import Pipeline, encode_signal, decode_signal, route_signal
+from src.utils.pending_log import PendingBetLog
+from src.utils.event_bus import EventBus, SignalReceived, BetQueued, BetPlaced, BetFailed, asyncio_wakeup
+from src.backtester import load_messages, load_results, prepare_signals, parameter_grid, run_backtest, simulate
+from src.rpa.retry_policy import RetryPolicy, CircuitBreaker, TransientRPAError, CircuitOpenError
 
 class TestBotApostasAutomatizado(unittest.TestCase):
     
@@ -17,19 +41,21 @@ class TestBotApostasAutomatizado(unittest.TestCase):
         # Configuração inicial para os testes
         self.test_config_path = '/tmp/test_config.json'
         self.test_history_path = '/tmp/test_history.json'
+        self.test_aggregates_path = '/tmp/test_history.aggregates.json'
+        self.test_pending_path = '/tmp/test_history.pending.jsonl'
         
         # Limpa arquivos de teste se existirem
-        if os.path.exists(self.test_config_path):
-            os.remove(self.test_config_path)
-        if os.path.exists(self.test_history_path):
-            os.remove(self.test_history_path)
+        for path in (self.test_config_path, self.test_history_path, self.test_aggregates_path,
+                     self.test_pending_path):
+            if os.path.exists(path):
+                os.remove(path)
     
     def tearDown(self):
         # Limpeza após os testes
-        if os.path.exists(self.test_config_path):
-            os.remove(self.test_config_path)
-        if os.path.exists(self.test_history_path):
-            os.remove(self.test_history_path)
+        for path in (self.test_config_path, self.test_history_path, self.test_aggregates_path,
+                     self.test_pending_path):
+            if os.path.exists(path):
+                os.remove(path)
     
     def test_config_manager(self):
         """Testa o gerenciador de configurações"""
@@ -132,6 +158,675 @@ class TestBotApostasAutomatizado(unittest.TestCase):
         self.assertEqual(stats['error'], 1)
         self.assertEqual(stats['success_rate'], 50.0)
     
+    def test_history_table_model(self):
+        """Testa o modelo paginado da tabela de histórico"""
+        history_manager = BetHistoryManager(self.test_history_path)
+        history_manager.history = [
+            {
+                'timestamp': f'2024-01-01 00:{i // 60:02d}:{i % 60:02d}',
+                'race_name': 'Ascot' if i % 2 else 'Newmarket',
+                'race_number': str(i % 8),
+                'horse': f'Cavalo {i}',
+                'odds': '2.00',
+                'status': 'Sucesso'
+            }
+            for i in range(1200)
+        ]
+        model = HistoryTableModel(history_manager)
+        
+        # Carrega apenas a primeira página, com os registros mais recentes primeiro
+        self.assertEqual(model.rowCount(), HistoryTableModel.PAGE_SIZE)
+        self.assertEqual(model.data(model.index(0, 3)), 'Cavalo 1199')
+        self.assertTrue(model.canFetchMore())
+        model.fetchMore()
+        model.fetchMore()
+        self.assertEqual(model.rowCount(), 1200)
+        self.assertFalse(model.canFetchMore())
+        
+        # Nova aposta entra no topo sem recarregar o modelo
+        self.assertTrue(history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Lovely Lucy', 'odds': '4.50'}, 'Erro'))
+        model.bet_appended()
+        self.assertEqual(model.rowCount(), 1201)
+        self.assertEqual(model.data(model.index(0, 3)), 'Lovely Lucy')
+        self.assertEqual(model.data(model.index(1, 3)), 'Cavalo 1199')
+        
+        # Filtros
+        model.set_filter(filter_race='ascot', filter_status='erro')
+        self.assertEqual(model.rowCount(), 1)
+        model.bet_appended({'race_name': 'Newmarket', 'horse': 'X', 'status': 'Erro'})
+        self.assertEqual(model.rowCount(), 1)
+        model.set_filter()
+        self.assertEqual(model.rowCount(), HistoryTableModel.PAGE_SIZE)
+    
+    def test_idempotency_keys(self):
+        """Testa a rejeição de apostas duplicadas pela chave de idempotência"""
+        bet_data = {
+            'race_name': 'Chelmsford City',
+            'race_number': '4',
+            'horse': 'Lovely Lucy',
+            'odds': '4.50',
+            'bet_type': 'E/W'
+        }
+        
+        # A chave é determinística e depende da mensagem e da seleção
+        key = make_idempotency_key(42, bet_data, '-100')
+        self.assertEqual(key, make_idempotency_key(42, dict(bet_data, horse='LOVELY LUCY', odds='5.00'), '-100'))
+        self.assertNotEqual(key, make_idempotency_key(43, bet_data, '-100'))
+        self.assertNotEqual(key, make_idempotency_key(42, dict(bet_data, horse='Thunder Strike'), '-100'))
+        
+        # O histórico rejeita a mesma chave, inclusive após recarregar o arquivo
+        history_manager = BetHistoryManager(self.test_history_path)
+        bet_data['idempotency_key'] = key
+        self.assertTrue(history_manager.add_bet(bet_data, 'Sucesso'))
+        self.assertFalse(history_manager.add_bet(bet_data, 'Sucesso'))
+        self.assertEqual(history_manager.get_history()[0]['idempotency_key'], key)
+        
+        reloaded_manager = BetHistoryManager(self.test_history_path)
+        self.assertTrue(reloaded_manager.has_idempotency_key(key))
+        self.assertFalse(reloaded_manager.add_bet(bet_data, 'Sucesso'))
+        self.assertEqual(len(reloaded_manager.get_history()), 1)
+    
+    def test_incremental_statistics(self):
+        """Testa a notificação de novas apostas e a atualização incremental das estatísticas"""
+        history_manager = BetHistoryManager(self.test_history_path)
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo A', 'odds': '2.00'}, 'Sucesso')
+        stats = history_manager.get_statistics()
+        
+        received = []
+        history_manager.subscribe(received.append)
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo B', 'odds': '3.00'}, 'Erro - Odds alteradas')
+        self.assertEqual([bet['horse'] for bet in received], ['Cavalo B'])
+        
+        # O resultado incremental coincide com o recálculo completo
+        BetHistoryManager.update_statistics(stats, received[0])
+        self.assertEqual(stats, history_manager.get_statistics())
+        
+        history_manager.unsubscribe(received.append)
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo C', 'odds': '2.50'}, 'Sucesso')
+        self.assertEqual(len(received), 1)
+    
+    def test_pnl_engine(self):
+        """Testa a importação de resultados e o cálculo de ROI, acerto e drawdown por canal e tipo"""
+        from src.utils.pnl_engine import PnlEngine
+        history_manager = BetHistoryManager(self.test_history_path)
+        bets = [
+            ('Ascot', 'Cavalo A', '3.00', 'Win', 10, 'canal-1'),
+            ('Ascot', 'Cavalo B', '5.00', 'E/W', 5, 'canal-1'),
+            ('York', 'Cavalo C', '2.00', 'Place', 10, 'canal-2'),
+            ('York', 'Cavalo D', '4.00', 'Win', 10, 'canal-2'),
+            ('Epsom', 'Cavalo E', '6.00', 'Win', 10, 'canal-1'),
+        ]
+        for race_name, horse, odds, bet_type, stake, channel in bets:
+            history_manager.add_bet({'race_name': race_name, 'race_number': '1', 'horse': horse, 'odds': odds,
+                                     'bet_type': bet_type, 'stake': stake, 'channel': channel,
+                                     'idempotency_key': horse}, 'Sucesso')
+        history_manager.add_bet({'race_name': 'Epsom', 'horse': 'Cavalo F', 'odds': '2.00', 'bet_type': 'Win',
+                                 'stake': 10}, 'Erro')
+        for i, record in enumerate(history_manager.history):
+            record['timestamp'] = f'2024-01-0{i + 1} 12:00:00'
+        
+        settled = []
+        history_manager.subscribe(settled.append, event='settle')
+        
+        # Resultados em CSV (pela seleção) e em JSON (pela chave de idempotência)
+        csv_path = '/tmp/test_settlements.csv'
+        with open(csv_path, 'w') as f:
+            f.write("race_name,race_number,horse,result,returns\n")
+            f.write("Ascot,1,Cavalo A,lost,\n")
+            f.write("Ascot,1,Cavalo B,placed,\n")
+            f.write("York,1,Cavalo X,won,\n")
+        json_path = '/tmp/test_settlements.json'
+        with open(json_path, 'w') as f:
+            json.dump([{'idempotency_key': 'Cavalo C', 'result': 'won'},
+                       {'idempotency_key': 'Cavalo D', 'result': 'won', 'returns': '38,50'},
+                       {'idempotency_key': 'Cavalo E', 'result': 'void'},
+                       {'idempotency_key': 'Cavalo A', 'result': 'anulada'}], f)
+        
+        snapshot = history_manager.snapshot()
+        self.assertEqual(history_manager.import_settlements(csv_path), 2)
+        self.assertEqual(history_manager.import_settlements(json_path), 3)
+        self.assertEqual(settled, [2, 3])
+        
+        # A cópia entregue antes da liquidação (em uso por outra thread) não é alterada
+        self.assertFalse(any('result' in bet for bet in snapshot))
+        self.assertEqual(BetHistoryManager(self.test_history_path).history[3]['returns'], 38.5)
+        os.remove(csv_path)
+        os.remove(json_path)
+        
+        # A: -10; B (E/W, só a parte place a 1/4 das odds): 5 * 2 = 10 apostado, 10 de retorno;
+        # C (Place): +10; D (retorno informado): +28,50; E anulada
+        report = PnlEngine.from_history(history_manager.snapshot()).report()
+        self.assertEqual(report['bets'], 4)
+        self.assertEqual(report['staked'], 40)
+        self.assertEqual(report['profit'], 28.5)
+        self.assertEqual(report['roi'], round(28.5 / 40 * 100, 2))
+        self.assertEqual(report['strike_rate'], 50)
+        self.assertEqual(report['max_drawdown'], 10)
+        self.assertEqual(report['by_channel']['canal-1']['profit'], -10)
+        self.assertEqual(report['by_channel']['canal-1']['max_drawdown'], 10)
+        self.assertEqual(report['by_channel']['canal-2']['profit'], 38.5)
+        self.assertEqual(report['by_channel']['canal-2']['max_drawdown'], 0)
+        self.assertEqual(report['by_type']['E/W']['staked'], 10)
+        self.assertEqual(report['by_type']['Place']['strike_rate'], 100)
+        self.assertNotIn('Win', PnlEngine.from_history(history_manager.snapshot()).report('2024-01-02', '2024-01-03')['by_type'])
+        
+        # Drawdown por grupo coincide com o cálculo aposta a aposta
+        random_history = [
+            {'timestamp': f'2024-02-{day % 28 + 1:02d} {day % 24:02d}:00:00', 'status': 'Sucesso',
+             'odds': str(1.5 + day % 7), 'stake': 1 + day % 3, 'bet_type': ['Win', 'Place', 'E/W'][day % 3],
+             'channel': f'canal-{day % 4}', 'result': ['won', 'lost', 'placed', 'lost', 'void'][day % 5]}
+            for day in range(500)
+        ]
+        engine = PnlEngine.from_history(random_history)
+        report = engine.report()
+        for channel, channel_report in report['by_channel'].items():
+            profits = [profit for profit, code in zip(engine.profit, engine.channels)
+                       if engine.channel_names[code] == channel]
+            cumulative, peak, drawdown = 0, 0, 0
+            for profit in profits:
+                cumulative += profit
+                peak = max(peak, cumulative)
+                drawdown = max(drawdown, peak - cumulative)
+            self.assertAlmostEqual(channel_report['max_drawdown'], round(drawdown, 2))
+            self.assertAlmostEqual(channel_report['profit'], round(sum(profits), 2))
+        
+        # Pela seleção, apenas apostas não liquidadas (e do dia informado) são consideradas
+        history_manager.clear_history()
+        for day in ('2024-03-01', '2024-06-01', '2024-06-02'):
+            history_manager.add_bet({'race_name': 'Ascot', 'race_number': '3', 'horse': 'Lucy', 'odds': '3.00',
+                                     'bet_type': 'Win', 'stake': 10}, 'Sucesso')
+            history_manager.history[-1]['timestamp'] = f'{day} 12:00:00'
+        csv_path = '/tmp/test_settlements.csv'
+        with open(csv_path, 'w') as f:
+            f.write("race_name,race_number,horse,result,returns,date\n")
+            f.write("Ascot,3,Lucy,won,,2024-03-01\n")
+            f.write("Ascot,3,Lucy,won,abc,2024-06-01\n")
+            f.write("Ascot,3,Lucy,won,,01/06/2024\n")
+        self.assertEqual(history_manager.import_settlements(csv_path), 1)
+        self.assertEqual([bet.get('result') for bet in history_manager.history], ['won', None, None])
+        
+        # Sem data: as apostas já liquidadas não são alteradas
+        with open(csv_path, 'w') as f:
+            f.write("race_name,race_number,horse,result\n")
+            f.write("Ascot,3,Lucy,lost\n")
+        self.assertEqual(history_manager.import_settlements(csv_path), 2)
+        saved = BetHistoryManager(self.test_history_path).history
+        self.assertEqual([bet.get('result') for bet in saved], ['won', 'lost', 'lost'])
+        self.assertEqual(history_manager.import_settlements(csv_path), 0)
+        os.remove(csv_path)
+    
+    def test_shared_history_store(self):
+        """Testa a instância única do histórico, as escritas concorrentes e as notificações"""
+        import threading
+        shared = BetHistoryManager.shared(self.test_history_path)
+        self.assertIs(shared, BetHistoryManager.shared(os.path.join('/tmp', '.', 'test_history.json')))
+        
+        appended = []
+        cleared = []
+        shared.subscribe(appended.append)
+        shared.subscribe(lambda: cleared.append(True), event='clear')
+        
+        # Escritas simultâneas de várias threads
+        def add_bets(worker):
+            for i in range(25):
+                shared.add_bet({'race_name': 'Ascot', 'horse': f'Cavalo {worker}-{i}', 'odds': '2.00',
+                                'idempotency_key': f'{worker}:{i}'}, 'Sucesso')
+        
+        threads = [threading.Thread(target=add_bets, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(appended), 100)
+        self.assertEqual(len(shared.snapshot()), 100)
+        self.assertEqual(len(BetHistoryManager(self.test_history_path).get_history()), 100)
+        
+        self.assertTrue(shared.clear_history())
+        self.assertEqual(cleared, [True])
+        self.assertEqual(shared.snapshot(), ())
+        BetHistoryManager._instances.clear()
+    
+    def test_quantile_sketch(self):
+        """Testa os sketches de quantis, sua soma entre períodos e a gravação dos agregados"""
+        import random
+        import bisect
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 0.8) for _ in range(20000)]
+        exact = sorted(values)
+        
+        # Estimativas com erro de posição abaixo de 0,2 ponto percentual, com memória
+        # limitada, também após somar partes
+        whole = TDigest()
+        parts = [TDigest() for _ in range(10)]
+        for i, value in enumerate(values):
+            whole.add(value)
+            parts[i % 10].add(value)
+        merged = TDigest()
+        for part in parts:
+            merged.merge(part)
+        for sketch in (whole, merged, TDigest.from_dict(json.loads(json.dumps(whole.to_dict())))):
+            self.assertEqual(len(sketch), 20000)
+            self.assertLessEqual(len(sketch.centroids), sketch.compression)
+            for p in (50, 90, 99):
+                rank = bisect.bisect_left(exact, sketch.percentile(p)) / len(exact)
+                self.assertAlmostEqual(rank, p / 100, delta=0.002)
+        
+        # Poucos valores: quantis exatos
+        small = TDigest()
+        for value in (5, 1, 4, 2, 3):
+            small.add(value)
+        self.assertEqual([small.percentile(p) for p in (0, 50, 90, 100)], [1, 3, 4.6, 5])
+        
+        # Percentis por métrica e por canal nos agregados por dia
+        history_manager = BetHistoryManager(self.test_history_path)
+        for i in range(40):
+            bet_data = {'race_name': 'Ascot', 'horse': f'Cavalo {i}', 'odds': str(2 + i % 4),
+                        'channel': f'canal-{i % 2}', 'off_time': '23:59'}
+            mark_stage(bet_data, 'telegram', 0)
+            mark_stage(bet_data, 'status_update', (i + 1) / 1000)
+            history_manager.add_bet(bet_data, 'Sucesso')
+        stats = DailyAggregates.from_history(history_manager.snapshot()).window()
+        self.assertEqual(stats['quantiles']['latency']['count'], 40)
+        self.assertAlmostEqual(stats['quantiles']['latency'][50], 20.5, places=3)
+        self.assertEqual(stats['quantiles']['odds'][99], 5)
+        self.assertEqual(stats['channel_quantiles']['odds']['canal-1'][50], 4)
+        self.assertEqual(stats['quantiles']['time_to_off']['count'], 40)
+        
+        # Os agregados gravados são reaproveitados e completados com os registros novos
+        aggregates_path = history_manager.aggregates_file_path
+        self.assertEqual(aggregates_path, self.test_aggregates_path)
+        DailyAggregates.load_or_build(history_manager.snapshot()[:30], aggregates_path)
+        with patch.object(DailyAggregates, 'add', autospec=True, side_effect=DailyAggregates.add) as add:
+            aggregates = DailyAggregates.load_or_build(history_manager.snapshot(), aggregates_path)
+        self.assertEqual(add.call_count, 10)
+        self.assertEqual(aggregates.window()['quantiles'], stats['quantiles'])
+        
+        # Histórico limpo: os agregados gravados não valem mais
+        history_manager.clear_history()
+        history_manager.add_bet({'race_name': 'York', 'horse': 'Novo', 'odds': '3.00'}, 'Sucesso')
+        self.assertEqual(DailyAggregates.load_or_build(history_manager.snapshot(), aggregates_path).window()['total'], 1)
+    
+    def test_log_view_capacity(self):
+        """Testa o limite de linhas e o agrupamento das inclusões na área de log"""
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        
+        logger = MagicMock()
+        log_view = LogView(capacity=5, logger=logger)
+        for i in range(12):
+            log_view.append(f"linha {i}")
+        
+        # Nada é exibido até a atualização agrupada
+        self.assertEqual(log_view.toPlainText(), '')
+        self.assertTrue(log_view.flush_timer.isActive())
+        
+        log_view.flush()
+        self.assertEqual(log_view.toPlainText().splitlines(), [f"linha {i}" for i in range(7, 12)])
+        
+        log_view.append("linha 12")
+        log_view.flush()
+        self.assertEqual(log_view.blockCount(), 5)
+        self.assertEqual(log_view.toPlainText().splitlines()[-1], "linha 12")
+        
+        # O arquivo de log recebe todas as linhas
+        self.assertEqual(logger.info.call_count, 13)
+    
+    def test_statistics_widget_reuses_charts(self):
+        """Testa a atualização dos gráficos sem recriá-los e sem redesenhos desnecessários"""
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        
+        history_manager = BetHistoryManager(self.test_history_path)
+        history_manager.history = [
+            {'timestamp': f'2024-01-{day:02d} 10:00:00', 'race_name': 'Ascot', 'horse': 'Cavalo',
+             'odds': '2.00', 'status': 'Sucesso' if day % 3 else 'Erro'}
+            for day in range(1, 11) for _ in range(day)
+        ]
+        widget = StatisticsWidget(history_manager=history_manager)
+        widget.update_statistics()
+        self.wait_statistics(widget.statistics_runner)
+        bars = list(widget.bars)
+        
+        # Apenas os 7 últimos dias, nas mesmas barras
+        self.assertEqual([bar.get_height() for bar in widget.bars], list(range(4, 11)))
+        self.assertEqual(widget.pie_pct_texts[1].get_text(), '32.7%')
+        
+        # Sem mudança nos dados não há redesenho
+        widget.show()
+        widget.pie_canvas.draw_idle = MagicMock()
+        widget.bar_canvas.draw_idle = MagicMock()
+        widget.update_statistics()
+        self.wait_statistics(widget.statistics_runner)
+        widget.pie_canvas.draw_idle.assert_not_called()
+        widget.bar_canvas.draw_idle.assert_not_called()
+        
+        # Uma nova aposta atualiza as barras existentes
+        history_manager.subscribe(widget.on_bet_added)
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo', 'odds': '2.00'}, 'Sucesso')
+        self.assertEqual(list(widget.bars), bars)
+        self.assertEqual([bar.get_height() for bar in widget.bars], list(range(5, 11)) + [1])
+        widget.pie_canvas.draw_idle.assert_called_once()
+        widget.bar_canvas.draw_idle.assert_called_once()
+        widget.close()
+    
+    def test_statistics_refresh_on_change(self):
+        """Testa o recálculo das estatísticas apenas quando o histórico muda e o widget está visível"""
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        
+        history_manager = BetHistoryManager(self.test_history_path)
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo A', 'odds': '2.00'}, 'Sucesso')
+        widget = StatisticsWidget(history_manager=history_manager)
+        history_manager.subscribe(widget.on_bet_added)
+        widget.update_statistics = MagicMock(wraps=widget.update_statistics)
+        
+        # Oculto, nada é calculado
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo B', 'odds': '2.00'}, 'Erro')
+        widget.update_statistics.assert_not_called()
+        
+        # Ao ser exibido, recalcula uma única vez
+        widget.show()
+        self.wait_statistics(widget.statistics_runner)
+        self.assertEqual(widget.update_statistics.call_count, 1)
+        self.assertEqual(widget.stats['total'], 2)
+        
+        # Sem mudanças, não recalcula
+        widget.refresh_statistics()
+        self.assertEqual(widget.update_statistics.call_count, 1)
+        
+        # Novas apostas com o widget visível são somadas sem recálculo
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo C', 'odds': '2.00'}, 'Sucesso')
+        self.assertEqual(widget.stats['total'], 3)
+        self.assertEqual(widget.update_statistics.call_count, 1)
+        
+        # Alterações fora das notificações esperam o fim do intervalo mínimo
+        history_manager.clear_history()
+        widget.refresh_statistics()
+        self.assertEqual(widget.update_statistics.call_count, 1)
+        self.assertTrue(widget.refresh_pending)
+        widget.refresh_timer.stop()
+        widget.on_refresh_timer()
+        self.wait_statistics(widget.statistics_runner)
+        self.assertEqual(widget.update_statistics.call_count, 2)
+        self.assertEqual(widget.stats['total'], 0)
+        
+        # Erros do cálculo em segundo plano são emitidos pelo widget
+        errors = []
+        widget.error.connect(errors.append)
+        widget.statistics_runner.request(lambda history: 1 / 0, history_manager.history)
+        self.wait_statistics(widget.statistics_runner)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('Erro ao calcular estatísticas', errors[0])
+        widget.close()
+    
+    def test_daily_aggregates(self):
+        """Testa os totais por dia e a soma de períodos, inclusive intervalos personalizados"""
+        history = [
+            {'timestamp': f'2024-01-{day:02d} 10:00:00', 'race_name': f'Corrida {day % 3}',
+             'horse': f'Cavalo {day % 4}', 'odds': '2,50' if day % 2 else '3.00',
+             'status': 'Sucesso' if day % 3 else 'Erro - Odds alteradas'}
+            for day in range(1, 21) for _ in range(day)
+        ]
+        aggregates = DailyAggregates.from_history(history)
+        self.assertEqual(len(aggregates.days), 20)
+        
+        # Intervalo personalizado: do dia 5 ao dia 9
+        stats = aggregates.window('2024-01-05', '2024-01-09')
+        selected = [bet for bet in history if '2024-01-05' <= bet['timestamp'][:10] <= '2024-01-09']
+        self.assertEqual(stats['total'], len(selected))
+        self.assertEqual(stats['success'], sum(1 for bet in selected if bet['status'] == 'Sucesso'))
+        self.assertEqual(stats['races'], {bet['race_name'] for bet in selected})
+        self.assertEqual(stats['horses'], {bet['horse'] for bet in selected})
+        self.assertEqual(stats['sorted_days'], ['2024-01-05', '2024-01-06', '2024-01-07', '2024-01-08', '2024-01-09'])
+        
+        # Todo o histórico, com as 7 barras mais recentes e a odds média
+        stats = aggregates.window()
+        self.assertEqual(stats['total'], 210)
+        self.assertEqual(stats['daily_counts'], list(range(14, 21)))
+        expected_avg = sum(float(bet['odds'].replace(',', '.')) for bet in history) / 210
+        self.assertEqual(stats['avg_odds'], round(expected_avg, 2))
+        
+        # Novas apostas entram no dia correspondente
+        aggregates.add({'timestamp': '2024-01-07 12:00:00', 'race_name': 'Nova', 'horse': 'Novo',
+                        'odds': '2.00', 'status': 'Sucesso'})
+        self.assertEqual(aggregates.window('2024-01-07', '2024-01-07')['total'], 8)
+        self.assertEqual(aggregates.window(end_day='2023-12-31')['total'], 0)
+        
+        # A troca de período no widget não recalcula o histórico
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        history_manager = BetHistoryManager(self.test_history_path)
+        history_manager.history = history
+        widget = StatisticsWidget(history_manager=history_manager)
+        widget.update_statistics()
+        self.wait_statistics(widget.statistics_runner)
+        widget.update_statistics = MagicMock()
+        widget.period_combo.setCurrentIndex(4)
+        widget.start_date_edit.setDate(widget.start_date_edit.date().fromString('2024-01-05', 'yyyy-MM-dd'))
+        widget.end_date_edit.setDate(widget.end_date_edit.date().fromString('2024-01-09', 'yyyy-MM-dd'))
+        self.assertEqual(widget.stats['total'], len(selected))
+        widget.update_statistics.assert_not_called()
+    
+    def test_group_aggregates(self):
+        """Testa os totais por corrida, cavalo e tipo de aposta e o ranking dos grupos"""
+        history = [
+            {'timestamp': f'2024-{1 + i % 2:02d}-{1 + i % 28:02d} 10:00:00', 'race_name': f'Hipódromo {i % 3}',
+             'horse': f'Cavalo {i % 7}', 'bet_type': 'Win' if i % 4 else 'Place', 'odds': f'{2 + i % 5}.00',
+             'status': 'Sucesso' if i % 7 != 3 and i % 5 else 'Erro - Odds alteradas'}
+            for i in range(300)
+        ]
+        history.sort(key=lambda bet: bet['timestamp'])
+        aggregates = DailyAggregates.from_history(history)
+        
+        # Períodos com meses completos e parciais conferem com a contagem direta
+        for start_day, end_day in ((None, None), ('2024-01-10', '2024-02-05'), ('2024-02-01', None)):
+            groups = aggregates.window(start_day, end_day)['groups']
+            selected = [bet for bet in history
+                        if (not start_day or bet['timestamp'][:10] >= start_day)
+                        and (not end_day or bet['timestamp'][:10] <= end_day)]
+            for horse in {bet['horse'] for bet in selected}:
+                bets = [bet for bet in selected if bet['horse'] == horse]
+                self.assertEqual(groups['horse'][horse]['count'], len(bets))
+                self.assertEqual(groups['horse'][horse]['success'], sum('Sucesso' in bet['status'] for bet in bets))
+            self.assertEqual(sum(totals['count'] for totals in groups['race_name'].values()), len(selected))
+        
+        # Ranking por número de apostas e por taxa de sucesso
+        groups = aggregates.window()['groups']
+        by_count = top_groups(groups['bet_type'], n=1)
+        self.assertEqual(by_count[0]['name'], 'Win')
+        self.assertEqual(by_count[0]['count'], 225)
+        by_rate = top_groups(groups['horse'], n=3, order='success_rate', min_bets=5)
+        self.assertEqual(len(by_rate), 3)
+        self.assertNotIn('Cavalo 3', [row['name'] for row in by_rate])
+        self.assertEqual([row['success_rate'] for row in by_rate],
+                         sorted((row['success_rate'] for row in by_rate), reverse=True))
+        
+        # Apostas novas entram nos grupos, inclusive nos totais do mês já calculados
+        aggregates.add({'timestamp': '2024-01-05 12:00:00', 'race_name': 'Hipódromo 0', 'horse': 'Novo',
+                        'bet_type': 'Win', 'odds': '4.00', 'status': 'Sucesso'})
+        groups = aggregates.window()['groups']
+        self.assertEqual(groups['horse']['Novo'], {'count': 1, 'success': 1, 'odds_sum': 4.0})
+        self.assertEqual(groups['bet_type']['Win']['count'], 226)
+        
+        # Agregados gravados em formato antigo são recalculados
+        with open(self.test_aggregates_path, 'w') as f:
+            json.dump({'records': len(history), 'last_record': DailyAggregates.record_id(history[-1]),
+                       'buckets': {}}, f)
+        rebuilt = DailyAggregates.load_or_build(history, self.test_aggregates_path)
+        self.assertEqual(rebuilt.window()['groups']['race_name']['Hipódromo 1']['count'], 100)
+        
+        # Tabela do painel estatístico
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        history_manager = BetHistoryManager(self.test_history_path)
+        history_manager.history = history
+        widget = StatisticsWidget(history_manager=history_manager)
+        widget.update_statistics()
+        self.wait_statistics(widget.statistics_runner)
+        widget.group_field_combo.setCurrentIndex(2)
+        self.assertEqual(widget.groups_table.rowCount(), 2)
+        self.assertEqual(widget.groups_table.item(0, 0).text(), 'Win')
+        self.assertEqual(widget.groups_table.horizontalHeaderItem(0).text(), 'Tipo de Aposta')
+    
+    def wait_statistics(self, runner):
+        """Aguarda o cálculo em segundo plano e entrega os sinais pendentes"""
+        from PyQt5.QtWidgets import QApplication
+        runner.thread_pool.waitForDone()
+        QApplication.processEvents()
+    
+    def test_statistics_runner(self):
+        """Testa o cálculo de estatísticas em segundo plano e o cancelamento de solicitações antigas"""
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        
+        history_manager = BetHistoryManager(self.test_history_path)
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo A', 'odds': '2.00'}, 'Sucesso')
+        
+        runner = StatisticsRunner()
+        results = []
+        runner.finished.connect(results.append)
+        
+        # O cálculo usa uma cópia: apostas adicionadas depois não a alteram
+        runner.request(history_manager.get_statistics, history_manager.history)
+        self.assertTrue(runner.is_busy())
+        history_manager.add_bet({'race_name': 'Ascot', 'horse': 'Cavalo B', 'odds': '2.00'}, 'Erro')
+        self.wait_statistics(runner)
+        self.assertEqual([stats['total'] for stats in results], [1])
+        self.assertFalse(runner.is_busy())
+        
+        # Só o resultado da solicitação mais recente é entregue
+        results.clear()
+        runner.request(lambda history: 'antigo', history_manager.history)
+        runner.request(history_manager.get_statistics, history_manager.history)
+        self.wait_statistics(runner)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['total'], 2)
+    
+    def test_bet_runner(self):
+        """Testa a execução das apostas fora da thread da interface"""
+        import threading
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+        
+        runner = BetRunner()
+        results = []
+        runner.finished.connect(lambda bet_data, success: results.append((bet_data['horse'], success)))
+        errors = []
+        runner.error.connect(errors.append)
+        
+        # A execução (com a espera entre tentativas) não bloqueia a thread da interface
+        release = threading.Event()
+        threads = []
+        def execute(bet_data, pending_bets):
+            threads.append(threading.get_ident())
+            release.wait(5)
+            return len(pending_bets) == 1
+        
+        runner.request(execute, {'horse': 'Cavalo A'}, [{'horse': 'Cavalo B'}])
+        self.assertTrue(runner.is_busy())
+        app.processEvents()
+        self.assertEqual(results, [])
+        release.set()
+        
+        # O resultado é entregue na thread da interface
+        runner.wait()
+        app.processEvents()
+        self.assertEqual(results, [('Cavalo A', True)])
+        self.assertNotEqual(threads, [threading.get_ident()])
+        self.assertFalse(runner.is_busy())
+        
+        # Uma exceção na execução vira um resultado de erro
+        def failing(bet_data):
+            raise RuntimeError("falha")
+        runner.request(failing, {'horse': 'Cavalo C'})
+        runner.wait()
+        app.processEvents()
+        self.assertEqual(results[-1], ('Cavalo C', False))
+        self.assertTrue(errors)
+    
+    def test_backtester(self):
+        """Testa o backtest de sinais gravados com regras de stake, filtros de odds e duplicidade"""
+        def message(message_id, date, horse, odds, bet_type='Win'):
+            return {'id': message_id, 'date': date, 'channel': 'canal-1',
+                    'text': f"🏇 Nome da Corrida: Ascot\n📍 Número da Corrida: 1\n🐎 Cavalo: {horse}\n"
+                            f"💸 Odds: @ {odds}\n🎯 Tipo: {bet_type}\n"}
+        
+        messages_path = '/tmp/test_messages.json'
+        with open(messages_path, 'w') as f:
+            json.dump({'id': 'canal-1', 'messages': [
+                message(1, '2024-01-01T12:00:00', 'Cavalo A', '3.00'),
+                message(1, '2024-01-01T12:00:00', 'Cavalo A', '3.00'),   # mensagem repetida
+                message(2, '2024-01-01T12:05:00', 'Cavalo A', '3.20'),   # mesmo cavalo, nova mensagem
+                message(3, '2024-01-01T13:00:00', 'Cavalo B', '6.00', 'E/W'),
+                message(4, '2024-01-02T12:00:00', 'Cavalo C', '2.00'),
+                message(5, '2024-01-02T13:00:00', 'Cavalo D', '9.00'),   # sem resultado
+                {'id': 6, 'date': '2024-01-02T14:00:00', 'text': [{'type': 'bold', 'text': 'Bom dia!'}]}
+            ]}, f)
+        messages = load_messages(messages_path)
+        os.remove(messages_path)
+        self.assertEqual(messages[0]['date'], '2024-01-01 12:00:00')
+        self.assertEqual(messages[-1]['text'], 'Bom dia!')
+        
+        results_path = '/tmp/test_results.csv'
+        with open(results_path, 'w') as f:
+            f.write("race_name,race_number,horse,result,date\n")
+            f.write("Ascot,1,Cavalo A,won,\n")
+            f.write("Ascot,1,Cavalo B,placed,2024-01-01\n")
+            f.write("Ascot,1,Cavalo C,lost,2024-01-02\n")
+            f.write("Ascot,1,Cavalo D,won,2024-01-01\n")   # outro dia: não vale para o sinal de 02/01
+        results = load_results(results_path)
+        os.remove(results_path)
+        self.assertEqual(results[('2024-01-02', ('ascot', '1', 'cavalo c'))], 'lost')
+        prepared = prepare_signals(messages, results)
+        self.assertEqual((len(prepared['odds']), prepared['unsettled'], prepared['ignored']), (5, 1, 1))
+        
+        grid = parameter_grid(staking=('fixed', 'percent'), stake=(0.1,), min_odds=(1.01, 2.5),
+                              dedup=('none', 'message', 'selection'))
+        rows = run_backtest(prepared, grid, workers=2)
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows, sorted(rows, key=lambda row: (row['roi'], row['profit']), reverse=True))
+        
+        # O pool de processos retorna o mesmo que a simulação no próprio processo
+        for row in rows:
+            params = {key: row[key] for key in grid[0]}
+            self.assertEqual(row, simulate(params, prepared))
+        
+        fixed = {(row['dedup'], row['min_odds']): row for row in rows if row['staking'] == 'fixed'}
+        self.assertEqual(fixed[('none', 1.01)]['bets'], 5)
+        self.assertEqual(fixed[('message', 1.01)]['bets'], 4)
+        self.assertEqual(fixed[('selection', 1.01)]['bets'], 3)
+        self.assertEqual(fixed[('selection', 2.5)]['bets'], 2)
+        
+        # Sem duplicidade, com odds >= 2,5: A (3,00) vence e B (E/W a 6,00) coloca-se
+        self.assertAlmostEqual(fixed[('selection', 2.5)]['profit'], 0.1 * 2 + (0.1 * 2.25 - 0.2), delta=0.01)
+        
+        # Stake proporcional: a banca evolui aposta a aposta
+        percent = next(row for row in rows if row['staking'] == 'percent' and row['dedup'] == 'selection'
+                       and row['min_odds'] == 2.5)
+        bank = 100.0
+        for unit_profit in (2.0, 2.25 - 2):
+            bank += 0.1 * bank * unit_profit
+        self.assertAlmostEqual(percent['final_bank'], round(bank, 2))
+    
+    def test_startup_lazy_imports(self):
+        """Testa que as dependências pesadas não são importadas na inicialização"""
+        import subprocess
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = (
+            f"import sys; sys.path.insert(0, {root!r}); import src.main, src.demo; "
+            "print(sorted(m for m in ('matplotlib', 'numpy', 'telegram', 'requests') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                                capture_output=True, text=True, cwd=root)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertEqual(result.stdout.strip(), '[]')
+        
+        # A saída do -X importtime é lida pelo benchmark de inicialização
+        imports = parse_importtime(result.stderr)
+        self.assertIn('src.main', imports)
+        self.assertIn('src.interface.main_window', imports)
+    
     @patch('telegram.ext.Application')
     def test_telegram_bot_parse_message(self, mock_application):
         """Testa o parsing de mensagens do Telegram"""
@@ -161,6 +856,20 @@ class TestBotApostasAutomatizado(unittest.TestCase):
         self.assertEqual(result['horse'], 'Lovely Lucy')
         self.assertEqual(result['odds'], '4.50')
         self.assertEqual(result['bet_type'], 'E/W')
+        self.assertNotIn('stake', result)
+        
+        # O stake é o primeiro número da linha
+        result = bot.parse_bet_message(valid_message + "💰 Stake: 2 unidades\n")
+        self.assertEqual(result['stake'], 2.0)
+        result = bot.parse_bet_message(valid_message + "💰 Stake: R$ 2,5\n")
+        self.assertEqual(result['stake'], 2.5)
+        
+        # Um stake inválido não descarta a aposta: o stake padrão é usado
+        result = bot.parse_bet_message(valid_message + "💰 Stake: padrão\n")
+        self.assertIsNotNone(result)
+        self.assertEqual(result['horse'], 'Lovely Lucy')
+        self.assertNotIn('stake', result)
+        bot.error_callback.assert_called_once()
         
         # Testa o parsing de uma mensagem inválida
         invalid_message = "Esta mensagem não contém dados de aposta"
@@ -169,5 +878,587 @@ class TestBotApostasAutomatizado(unittest.TestCase):
         # Verifica se o parsing retornou None para mensagem inválida
         self.assertIsNone(result)
 
+    def test_market_cache(self):
+        """Testa o cache de mercados"""
+        now = [0.0]
+        cache = MarketCache(ttl=60, clock=lambda: now[0])
+        
+        # Carrega a programação do dia
+        race_card = [{
+            'race_name': 'Chelmsford City',
+            'race_number': '4',
+            'market_id': '1.234',
+            'locator': '/corridas/chelmsford/4',
+            'runners': [
+                {'horse': 'Lovely Lucy', 'selection_id': 101},
+                {'horse': 'Thunder Strike', 'selection_id': 102}
+            ]
+        }]
+        self.assertEqual(cache.load_race_card(race_card), 2)
+        
+        # Verifica a busca com nomes normalizados
+        entry = cache.lookup('  chelmsford city ', 4, 'LOVELY  LUCY')
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry['selection_id'], 101)
+        self.assertEqual(entry['market_id'], '1.234')
+        self.assertEqual(entry['locator'], '/corridas/chelmsford/4')
+        self.assertIsNone(cache.lookup('Chelmsford City', '5', 'Lovely Lucy'))
+        
+        # Verifica a expiração das entradas
+        now[0] = 61.0
+        self.assertIsNone(cache.lookup('Chelmsford City', '4', 'Lovely Lucy'))
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_bet_scheduler(self):
+        """Testa o escalonamento das apostas por prazo de largada"""
+        now = [1000.0]
+        expired = []
+        scheduler = BetScheduler(min_lead_time=5, expired_callback=expired.append, clock=lambda: now[0])
+        
+        # Adiciona apostas fora da ordem de prazo
+        late_bet = {'horse': 'Golden Arrow', 'deadline': 4600.0}
+        no_deadline_bet = {'horse': 'Silver Bullet', 'deadline': None}
+        urgent_bet = {'horse': 'Lovely Lucy', 'deadline': 1060.0}
+        expired_bet = {'horse': 'Thunder Strike', 'deadline': 990.0}
+        for bet in (late_bet, no_deadline_bet, urgent_bet, expired_bet):
+            scheduler.push(bet)
+        
+        # Verifica a ordem de execução e o descarte das apostas vencidas
+        self.assertIs(scheduler.pop_next(), urgent_bet)
+        self.assertEqual(expired, [expired_bet])
+        self.assertIs(scheduler.pop_next(), late_bet)
+        self.assertIs(scheduler.pop_next(), no_deadline_bet)
+        self.assertIsNone(scheduler.pop_next())
+        
+        # Verifica o cálculo do prazo a partir do horário de largada
+        now[0] = datetime(2024, 5, 1, 12, 0).timestamp()
+        deadline = scheduler.push({'horse': 'Lovely Lucy', 'off_time': '14:30'})
+        self.assertEqual(deadline, datetime(2024, 5, 1, 14, 30).timestamp() - 5)
+        self.assertEqual(scheduler.pop_next()['horse'], 'Lovely Lucy')
+        
+        # Corrida depois da meia-noite anunciada antes dela: a largada é no dia seguinte
+        now[0] = datetime(2024, 5, 1, 23, 50).timestamp()
+        deadline = scheduler.push({'horse': 'Golden Arrow', 'off_time': '00:15'})
+        self.assertEqual(deadline, datetime(2024, 5, 2, 0, 15).timestamp() - 5)
+        self.assertEqual(scheduler.pop_next()['horse'], 'Golden Arrow')
+        
+        # Corrida que acabou de largar continua no mesmo dia (e é descartada)
+        deadline = scheduler.push({'horse': 'Thunder Strike', 'off_time': '23:40'})
+        self.assertEqual(deadline, datetime(2024, 5, 1, 23, 40).timestamp() - 5)
+        self.assertIsNone(scheduler.pop_next())
+        self.assertEqual(expired[-1]['horse'], 'Thunder Strike')
+
+    def test_retry_policy_and_circuit_breaker(self):
+        """Testa as novas tentativas com backoff e o disjuntor"""
+        now = [0.0]
+        sleeps = []
+        
+        def fake_sleep(delay):
+            sleeps.append(delay)
+            now[0] += delay
+        
+        states = []
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, state_callback=states.append, clock=lambda: now[0])
+        policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=10, jitter=0, sleep=fake_sleep, clock=lambda: now[0])
+        
+        # Sucesso após uma falha transitória
+        attempts = []
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise TransientRPAError("timeout")
+            return 'ok'
+        self.assertEqual(policy.run(flaky, breaker=breaker), 'ok')
+        self.assertEqual(sleeps, [1])
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        
+        # Sem nova tentativa quando a espera ultrapassa o prazo
+        def failing():
+            raise TransientRPAError("timeout")
+        with self.assertRaises(TransientRPAError):
+            policy.run(failing, deadline=now[0] + 0.5)
+        self.assertEqual(sleeps, [1])
+        
+        # Falhas consecutivas abrem o circuito
+        with self.assertRaises(TransientRPAError):
+            policy.run(failing, breaker=breaker)
+        self.assertEqual(sleeps, [1, 1, 2])
+        with self.assertRaises(CircuitOpenError):
+            policy.run(failing, breaker=breaker)
+        self.assertEqual(states, [CircuitBreaker.OPEN])
+        
+        # Após o tempo de espera uma única tentativa de teste é liberada
+        now[0] += 30
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        with self.assertRaises(CircuitOpenError):
+            policy.run(lambda: 'ok', breaker=breaker)
+        
+        # Um erro não transitório libera o teste para a próxima tentativa
+        breaker.release_probe()
+        def rejected():
+            raise ValueError("aposta recusada")
+        with self.assertRaises(ValueError):
+            policy.run(rejected, breaker=breaker)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        
+        # O sucesso do teste fecha o circuito
+        self.assertEqual(policy.run(lambda: 'ok', breaker=breaker), 'ok')
+        self.assertEqual(states, [CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN, CircuitBreaker.CLOSED])
+        self.assertTrue(breaker.allow_request())
+        self.assertTrue(breaker.allow_request())
+
+    def test_latency_tracer(self):
+        """Testa o rastreamento de latência por etapa"""
+        history = []
+        for i in range(1, 101):
+            bet_data = {}
+            mark_stage(bet_data, 'telegram', 10.0)
+            mark_stage(bet_data, 'handle_message', 10.0 + i / 1000)
+            mark_stage(bet_data, 'parsed', 10.0 + i / 1000 + 0.001)
+            mark_stage(bet_data, 'status_update', 10.5)
+            history.append({'trace': trace_offsets(bet_data['trace'])})
+        
+        # Verifica os deslocamentos gravados no histórico
+        self.assertEqual(history[0]['trace']['telegram'], 0)
+        self.assertEqual(history[0]['trace']['status_update'], 500)
+        
+        # Verifica os percentis por etapa
+        stats = latency_percentiles(history)
+        self.assertEqual(stats['handle_message']['count'], 100)
+        self.assertAlmostEqual(stats['handle_message'][50], 50.5, places=3)
+        self.assertAlmostEqual(stats['handle_message'][99], 99.01, places=3)
+        self.assertAlmostEqual(stats['parsed'][95], 1.0, places=3)
+        self.assertAlmostEqual(stats['total'][50], 500, places=3)
+
+    def test_rpa_controller_http_engine(self):
+        """Testa o modo HTTP do controlador RPA contra a simulação local da Bolsa de Apostas"""
+        exchange = MockExchange(markets=[{
+            'race_name': 'Chelmsford City',
+            'race_number': '4',
+            'market_id': '1.234',
+            'runners': [{'horse': 'Lovely Lucy', 'selection_id': 101, 'odds': 4.5}]
+        }])
+        
+        with MockExchangeServer(exchange) as server:
+            controller = RPAController(username='user', password='pass')
+            self.assertTrue(controller.configure_engine('http', exchange_url=server.url))
+            self.assertEqual(controller.engine, 'http')
+            
+            # Pré-carrega os mercados e realiza a aposta
+            self.assertEqual(controller.prefetch_markets(), 1)
+            bet_data = {
+                'race_name': 'Chelmsford City',
+                'race_number': '4',
+                'horse': 'Lovely Lucy',
+                'odds': '4.50',
+                'bet_type': 'E/W'
+            }
+            self.assertTrue(controller.process_bet(bet_data))
+            self.assertEqual(exchange.bets[-1]['selection_id'], 101)
+            
+            # Cavalo inexistente na programação e odds acima das oferecidas
+            statuses = []
+            controller.bet_status_update.connect(statuses.append)
+            self.assertFalse(controller.process_bet(dict(bet_data, horse='Thunder Strike')))
+            self.assertTrue(statuses[-1]['status'].startswith('Erro'))
+            self.assertFalse(controller.process_bet(dict(bet_data, odds='5.00')))
+            self.assertEqual(statuses[-1]['status'], 'Erro - Odds alteradas')
+            
+            # Sem URL configurada o controlador permanece no modo navegador
+            self.assertFalse(controller.configure_engine('http'))
+            self.assertEqual(controller.engine, 'browser')
+    
+    def test_event_bus(self):
+        """Testa as filas limitadas do barramento de eventos, suas políticas de estouro e métricas"""
+        import time
+        import asyncio
+        import threading
+        bus = EventBus()
+        received = []
+        
+        # Cada assinante recebe apenas os tipos assinados, na ordem de publicação
+        results = bus.subscribe((BetPlaced, BetFailed), received.append, name='resultados', max_size=3)
+        latest = bus.subscribe(BetQueued, received.append, name='fila', max_size=1)
+        newest = bus.subscribe(BetQueued, received.append, name='descarta novos', max_size=2, overflow='drop_newest')
+        for i in range(5):
+            bus.publish(BetPlaced({'horse': f'Cavalo {i}'}) if i % 2 else BetFailed({'horse': f'Cavalo {i}'}))
+            bus.publish(BetQueued({'horse': f'Cavalo {i}'}))
+        self.assertEqual(bus.publish(SignalReceived({})), 0)
+        
+        # drop_oldest mantém os mais recentes; drop_newest, os primeiros
+        metrics = bus.metrics()
+        self.assertEqual(metrics['resultados'], {'depth': 3, 'max_depth': 3, 'max_size': 3, 'published': 5,
+                                                 'delivered': 0, 'dropped': 2, 'blocked': 0})
+        self.assertEqual(results.drain(), 3)
+        self.assertEqual([event.bet_data['horse'] for event in received], ['Cavalo 2', 'Cavalo 3', 'Cavalo 4'])
+        received.clear()
+        latest.drain()
+        newest.drain()
+        self.assertEqual([event.bet_data['horse'] for event in received], ['Cavalo 4', 'Cavalo 0', 'Cavalo 1'])
+        self.assertEqual(bus.metrics()['descarta novos']['dropped'], 3)
+        
+        # Erros de um handler não interrompem a entrega
+        errors = []
+        bus.error_callback = errors.append
+        failing = bus.subscribe(SignalReceived, lambda event: 1 / 0, name='falha')
+        bus.publish(SignalReceived({}))
+        bus.publish(SignalReceived({}))
+        self.assertEqual(failing.drain(), 2)
+        self.assertEqual(len(errors), 2)
+        
+        # block: quem publica em outra thread aguarda espaço na fila
+        blocking = bus.subscribe(SignalReceived, received.append, name='sinais', max_size=2, overflow='block')
+        blocking.drain()
+        publisher = threading.Thread(target=lambda: [bus.publish(SignalReceived({'i': i})) for i in range(5)])
+        publisher.start()
+        while blocking.metrics()['blocked'] == 0:
+            time.sleep(0.01)
+        self.assertEqual(blocking.depth(), 2)
+        while publisher.is_alive() or blocking.depth():
+            blocking.drain(1)
+        self.assertEqual(blocking.metrics()['dropped'], 0)
+        self.assertEqual(blocking.metrics()['delivered'], 5)
+        
+        # Na própria thread de entrega, a fila cheia é esvaziada por quem publica
+        for i in range(3):
+            bus.publish(SignalReceived({'i': i}))
+        self.assertEqual(blocking.metrics()['delivered'], 7)
+        self.assertEqual(blocking.depth(), 1)
+        
+        # Com tempo limite, o evento é descartado quando a fila continua cheia
+        signal_bus = EventBus()
+        limited = signal_bus.subscribe(SignalReceived, received.append, max_size=1, overflow='block',
+                                       block_timeout=0.05)
+        self.assertEqual(signal_bus.publish(SignalReceived({'i': 0})), 1)
+        outcome = []
+        sender = threading.Thread(target=lambda: outcome.append(signal_bus.publish(SignalReceived({'i': 1}))))
+        sender.start()
+        sender.join()
+        self.assertEqual(outcome, [0])
+        self.assertEqual(limited.metrics()['dropped'], 1)
+        signal_bus.unsubscribe(limited)
+        
+        # Sem tempo limite, nada é descartado; na thread de entrega informada, a fila é
+        # esvaziada por quem publica mesmo antes do primeiro drain
+        unlimited = signal_bus.subscribe(SignalReceived, received.append, max_size=1, overflow='block',
+                                         block_timeout=None, drain_thread=threading.get_ident())
+        for i in range(3):
+            self.assertEqual(signal_bus.publish(SignalReceived({'i': i})), 1)
+        self.assertEqual(unlimited.metrics()['delivered'], 2)
+        self.assertEqual(unlimited.metrics()['dropped'], 0)
+        
+        # O worker do Telegram registra o sinal que não entrou na fila
+        from src.telegram.telegram_worker import TelegramWorker
+        worker = TelegramWorker('token', 'chat', event_bus=EventBus())
+        worker_errors = []
+        worker_logs = []
+        worker.error_message.connect(worker_errors.append)
+        worker.log_message.connect(worker_logs.append)
+        worker.message_callback({'race_name': 'Ascot', 'race_number': '1', 'horse': 'Cavalo A'})
+        self.assertIn('Sinal descartado', worker_errors[0])
+        self.assertEqual(worker_logs, [])
+        
+        # Entrega em lotes no loop asyncio: uma rajada gera um único agendamento
+        async def deliver_in_loop():
+            loop_bus = EventBus()
+            delivered = []
+            subscription = loop_bus.subscribe(SignalReceived, delivered.append, batch_size=10,
+                                              wakeup=asyncio_wakeup(asyncio.get_running_loop()))
+            for i in range(25):
+                loop_bus.publish(SignalReceived({'i': i}))
+            await asyncio.sleep(0)
+            first_batch = len(delivered)
+            for _ in range(3):
+                await asyncio.sleep(0)
+            return first_batch, [event.bet_data['i'] for event in delivered]
+        
+        first_batch, delivered = asyncio.run(deliver_in_loop())
+        self.assertEqual(first_batch, 10)
+        self.assertEqual(delivered, list(range(25)))
+        
+        # Na interface, os eventos são entregues pelo loop do Qt, mesmo publicados na própria thread
+        from PyQt5.QtWidgets import QApplication
+        from src.interface.event_pump import QtEventPump
+        app = QApplication.instance() or QApplication([])
+        pump = QtEventPump(EventBus())
+        delivered = []
+        pump.subscribe(BetQueued, delivered.append)
+        pump.event_bus.publish(BetQueued({}))
+        self.assertEqual(delivered, [])
+        QApplication.processEvents()
+        self.assertEqual(len(delivered), 1)
+    
+    def test_pipeline(self):
+        """Testa a execução das apostas em processos separados, com mensagens compactas entre eles"""
+        bet_data = {'race_name': 'Ascot', 'race_number': '1', 'horse': 'Cavalo A', 'odds': '3.00',
+                    'bet_type': 'Win', 'idempotency_key': 'canal:1:abc', 'trace': {'parsed': 10.5}}
+        self.assertEqual(decode_signal(encode_signal(bet_data)), bet_data)
+        self.assertEqual(route_signal(bet_data, 3), route_signal(dict(bet_data, odds='4.00'), 3))
+        
+        horses = ['Cavalo A', 'Cavalo B', 'Cavalo C', 'Cavalo D']
+        exchange = MockExchange(markets=[{
+            'race_name': 'Ascot',
+            'race_number': '1',
+            'market_id': '1.100',
+            'runners': [{'horse': horse, 'selection_id': 100 + i, 'odds': 3.0} for i, horse in enumerate(horses)]
+        }])
+        
+        # Mensagens gravadas no lugar do Telegram, com uma mensagem repetida
+        messages_path = '/tmp/test_pipeline_messages.jsonl'
+        with open(messages_path, 'w') as f:
+            for message_id, horse in enumerate(horses + horses[:1]):
+                text = (f"🏇 Nome da Corrida: Ascot\n📍 Número da Corrida: 1\n🐎 Cavalo: {horse}\n"
+                        f"💸 Odds: @ 3.00\n🎯 Tipo: Win\n")
+                f.write(json.dumps({'id': message_id % 4, 'date': '2024-01-01T12:00:00', 'channel': 'canal-1',
+                                    'text': text}) + "\n")
+        
+        with MockExchangeServer(exchange) as server:
+            config_manager = ConfigManager(self.test_config_path)
+            config_manager.set_betting_config('user', 'pass')
+            config_manager.set_rpa_config(engine='http', exchange_url=server.url)
+            config_manager.save_config()
+            
+            pipeline = Pipeline(self.test_config_path, self.test_history_path, workers=2, replay=messages_path)
+            logs = []
+            pipeline.log_callback = pipeline.error_callback = logs.append
+            pipeline.start()
+            self.assertEqual(pipeline.run_monitor(), 0)
+        os.remove(messages_path)
+        
+        # Cada aposta foi realizada uma única vez e gravada pelo processo principal, com seu rastro
+        self.assertEqual(sorted(bet['selection_id'] for bet in exchange.bets), [100, 101, 102, 103])
+        history = pipeline.history_manager.get_history()
+        self.assertEqual(sorted(bet['horse'] for bet in history), horses)
+        self.assertTrue(all(bet['status'] == 'Sucesso' and 'placed' in bet['trace'] for bet in history))
+        self.assertTrue(any('duplicada' in log for log in logs))
+        self.assertFalse(any(process.is_alive() for process in pipeline.processes))
+        BetHistoryManager._instances.clear()
+    
+    def test_pending_bet_log(self):
+        """Testa a recuperação das apostas aceitas e não executadas após uma falha"""
+        import time
+        
+        now = [1000.0]
+        pending_log = PendingBetLog(self.test_pending_path, checkpoint_every=100, sync=False, clock=lambda: now[0])
+        bets = [
+            {'race_name': 'Ascot', 'horse': 'Cavalo A', 'idempotency_key': 'canal:1:a', 'deadline': 2000.0,
+             'trace': {'parsed': 1.0}},
+            {'race_name': 'Ascot', 'horse': 'Cavalo B', 'idempotency_key': 'canal:2:b', 'deadline': 2000.0},
+            {'race_name': 'Ascot', 'horse': 'Cavalo C', 'idempotency_key': 'canal:3:c', 'deadline': 1500.0},
+            {'race_name': 'Ascot', 'horse': 'Cavalo D', 'deadline': None},
+            {'race_name': 'Ascot', 'horse': 'Cavalo E', 'idempotency_key': 'canal:5:e', 'deadline': 2000.0}
+        ]
+        for bet_data in bets:
+            pending_log.append(bet_data)
+        pending_log.mark_done(bets[1])
+        self.assertEqual(len(pending_log), 4)
+        
+        # Falha: o arquivo termina com uma linha incompleta
+        pending_log.close()
+        with open(self.test_pending_path, 'a') as f:
+            f.write('{"op": "done", "id": "canal:1')
+        
+        # Após o reinício, a aposta concluída e a já gravada no histórico não voltam;
+        # a corrida C já largou e a aposta D, sem horário de largada, passou da idade máxima
+        now[0] = 1600.0
+        recovered = PendingBetLog(self.test_pending_path, max_age=300, sync=False, clock=lambda: now[0])
+        resumed, expired = recovered.recover(skip_keys={'canal:5:e'})
+        self.assertEqual([bet['horse'] for bet in resumed], ['Cavalo A'])
+        self.assertEqual(sorted(bet['horse'] for bet in expired), ['Cavalo C', 'Cavalo D'])
+        self.assertNotIn('trace', resumed[0])
+        
+        # A recuperação grava um checkpoint apenas com as apostas retomadas
+        with open(self.test_pending_path) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        recovered.mark_done(resumed[0])
+        recovered.close()
+        self.assertEqual(PendingBetLog(self.test_pending_path).recover(), ([], []))
+        
+        # Os checkpoints periódicos limitam o tamanho do log e o tempo de recuperação
+        long_log = PendingBetLog(self.test_pending_path, checkpoint_every=1000, sync=False)
+        for i in range(20000):
+            bet_data = {'race_name': 'Ascot', 'horse': f'Cavalo {i}', 'idempotency_key': f'canal:{i}'}
+            long_log.append(bet_data)
+            if i % 100:
+                long_log.mark_done(bet_data)
+        long_log.close()
+        with open(self.test_pending_path) as f:
+            self.assertLess(len(f.readlines()), 1000 + 200)
+        
+        started = time.perf_counter()
+        resumed, expired = PendingBetLog(self.test_pending_path, max_age=float('inf')).recover()
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(len(resumed), 200)
+        self.assertEqual(expired, [])
+        
+        # O daemon retoma as apostas do log e as marca como concluídas após a execução
+        exchange = MockExchange(markets=[{
+            'race_name': 'Ascot',
+            'race_number': '1',
+            'market_id': '1.100',
+            'runners': [{'horse': 'Cavalo A', 'selection_id': 100, 'odds': 3.0}]
+        }])
+        os.remove(self.test_pending_path)
+        
+        import asyncio
+        with MockExchangeServer(exchange) as server:
+            config_manager = ConfigManager(self.test_config_path)
+            config_manager.set_betting_config('user', 'pass')
+            config_manager.set_rpa_config(engine='http', exchange_url=server.url)
+            
+            # Sinais (um deles repetido) gravados na recepção e ainda na fila 'sinais' no momento da falha
+            crashed = BotDaemon(config_manager, BetHistoryManager(self.test_history_path))
+            crashed.event_bus.subscribe(SignalReceived, lambda event: None, name='sinais')
+            signal = {'race_name': 'Ascot', 'race_number': '1', 'horse': 'Cavalo A', 'odds': '3.00',
+                      'bet_type': 'Win', 'idempotency_key': 'canal:1:a'}
+            crashed.receive_signal(dict(signal))
+            crashed.receive_signal(dict(signal))
+            self.assertEqual(len(crashed.pending_log), 2)
+            self.assertEqual(len(crashed.bet_scheduler), 0)
+            crashed.pending_log.close()
+            crashed.worker.shutdown()
+            crashed.executor.http_client.close()
+            
+            daemon = BotDaemon(config_manager, BetHistoryManager(self.test_history_path))
+            
+            async def resume():
+                daemon.bet_available = asyncio.Event()
+                daemon.resume_pending_bets()
+                await daemon.process_pending()
+            
+            asyncio.run(resume())
+            daemon.worker.shutdown()
+            daemon.executor.http_client.close()
+            daemon.pending_log.close()
+        
+        self.assertEqual([bet['selection_id'] for bet in exchange.bets], [100])
+        self.assertEqual(len(daemon.pending_log), 0)
+        self.assertEqual(PendingBetLog(self.test_pending_path).recover(), ([], []))
+    
+    def test_headless_daemon(self):
+        """Testa a execução de apostas pelo daemon sem interface gráfica"""
+        import asyncio
+        import subprocess
+        
+        # O daemon não depende do Qt
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = f"import sys; sys.path.insert(0, {root!r}); import src.daemon; print(any(m.startswith('PyQt5') for m in sys.modules))"
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=root)
+        self.assertEqual(result.stdout.strip(), 'False', result.stderr[-2000:])
+        
+        exchange = MockExchange(markets=[{
+            'race_name': 'Chelmsford City',
+            'race_number': '4',
+            'market_id': '1.234',
+            'runners': [{'horse': 'Lovely Lucy', 'selection_id': 101, 'odds': 4.5}]
+        }])
+        
+        with MockExchangeServer(exchange) as server:
+            config_manager = ConfigManager(self.test_config_path)
+            config_manager.set_betting_config('user', 'pass')
+            config_manager.set_rpa_config(engine='http', exchange_url=server.url)
+            history_manager = BetHistoryManager(self.test_history_path)
+            daemon = BotDaemon(config_manager, history_manager)
+            self.assertEqual(daemon.executor.engine, 'http')
+            
+            bet_data = {
+                'race_name': 'Chelmsford City',
+                'race_number': '4',
+                'horse': 'Lovely Lucy',
+                'odds': '4.50',
+                'bet_type': 'Win',
+                'idempotency_key': ':1:abc'
+            }
+            daemon.enqueue_bet(bet_data)
+            daemon.enqueue_bet(dict(bet_data))
+            self.assertEqual(len(daemon.bet_scheduler), 1)
+            
+            asyncio.run(daemon.process_pending())
+            
+            # O motivo da rejeição é gravado no histórico
+            drifted = dict(bet_data, odds='9.00', idempotency_key=':2:def')
+            daemon.executor.refresh_odds([drifted])
+            daemon.enqueue_bet(drifted)
+            asyncio.run(daemon.process_pending())
+            
+            # Repetição recebida enquanto a original era executada: não é gravada nem notificada
+            published = []
+            daemon.event_bus.publish = published.append
+            daemon.bet_scheduler.push(dict(bet_data))
+            asyncio.run(daemon.process_pending())
+            self.assertEqual(published, [])
+            daemon.worker.shutdown()
+            daemon.executor.http_client.close()
+        
+        self.assertEqual(len(exchange.bets), 1)
+        self.assertEqual([bet['status'] for bet in history_manager.get_history()], ['Sucesso', 'Erro - Odds alteradas'])
+    
+    def test_odds_staleness_guard(self):
+        """Testa a rejeição local de apostas com odds desatualizadas"""
+        now = [0.0]
+        cache = OddsCache(max_age=10, clock=lambda: now[0])
+        cache.update('1.234', {101: '4.50', '102': 3})
+        self.assertEqual(cache.get('1.234', '101'), 4.5)
+        self.assertEqual(cache.get('1.234', 102), 3.0)
+        now[0] = 10.0
+        self.assertIsNone(cache.get('1.234', 101))
+        self.assertAlmostEqual(minimum_acceptable_odds(4.0, max_odds_drop=0.1), 3.6)
+        self.assertEqual(minimum_acceptable_odds(1.05, max_odds_drop=0.1, min_odds=1.01), 1.01)
+        
+        exchange = MockExchange(markets=[{
+            'race_name': 'Ascot',
+            'race_number': '2',
+            'market_id': '1.555',
+            'runners': [{'horse': 'Thunder Strike', 'selection_id': 201, 'odds': 2.5}]
+        }])
+        
+        with MockExchangeServer(exchange) as server:
+            controller = RPAController(username='user', password='pass', max_odds_drop=0.1)
+            controller.configure_engine('http', exchange_url=server.url)
+            controller.prefetch_markets()
+            
+            # Odds do sinal muito acima das atuais: rejeitada sem chegar ao site
+            bet_data = {'race_name': 'Ascot', 'race_number': '2', 'horse': 'Thunder Strike', 'odds': '3.00', 'bet_type': 'Win'}
+            self.assertEqual(controller.refresh_odds([bet_data]), 1)
+            self.assertFalse(controller.process_bet(bet_data))
+            self.assertEqual(exchange.bets, [])
+            self.assertEqual(bet_data['status'], 'Erro - Odds alteradas')
+            
+            # Odds atuais dentro do limite aceito: a aposta segue para o site
+            self.assertEqual(controller.refresh_odds([bet_data]), 0)
+            self.assertTrue(controller.process_bet(dict(bet_data, odds='2.50')))
+            self.assertEqual(len(exchange.bets), 1)
+            
+            # As odds das apostas pendentes são atualizadas em segundo plano
+            import time
+            controller.odds_cache.invalidate()
+            refresher = OddsRefresher(controller, interval=0.01)
+            self.assertEqual(refresher.refresh_once(), 0)
+            refresher.watch([bet_data])
+            refresher.start()
+            for _ in range(200):
+                if not controller.odds_cache.is_stale('1.555'):
+                    break
+                time.sleep(0.01)
+            refresher.stop()
+            self.assertEqual(controller.odds_cache.get('1.555', 201), 2.5)
+            
+            # A aposta é rejeitada pelas odds do cache, sem chegar ao site
+            self.assertFalse(controller.process_bet(bet_data))
+            self.assertEqual(len(exchange.bets), 1)
+    
+    def test_rpa_benchmark(self):
+        """Testa o benchmark de RPA contra a simulação com erros transitórios"""
+        result = run_rpa_benchmark(bets=30, error_rate=0.1, retry_attempts=5, retry_base_delay=0)
+        
+        self.assertEqual(result['engine'], 'http')
+        self.assertEqual(result['bets'], 30)
+        self.assertEqual(result['success'] + sum(result['failures'].values()), 30)
+        self.assertGreater(result['success'], 0)
+        self.assertGreater(result['throughput'], 0)
+        self.assertLessEqual(result['latency_ms'][50], result['latency_ms'][99])
+
 if __name__ == '__main__':
     unittest.main()